@@ -0,0 +1,68 @@
+"""Benchmark goal path queries on an oscillating goal history.
+
+Every cycle adds one goal transition and asks for the goal path, as
+``run_metabo_cycle`` does. The previous implementation – a fresh
+``nx.topological_sort`` with a DFS fallback on cycles – is reproduced for
+comparison. Run with ``python benchmarks/bench_goal_index.py``.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import List
+
+import networkx as nx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from memory.goal_index import GoalIndex
+
+
+def legacy_goal_path(graph: nx.DiGraph) -> List:
+    try:
+        return list(nx.topological_sort(graph))
+    except nx.NetworkXUnfeasible:
+        return list(nx.dfs_preorder_nodes(graph, next(iter(graph.nodes()))))
+
+
+def transitions(n: int, goals: int, seed: int = 1) -> List[tuple]:
+    """Mostly new goals with occasional returns to an earlier one."""
+    rng = random.Random(seed)
+    current, edges = 0, []
+    for step in range(1, n + 1):
+        nxt = rng.randrange(min(step, goals)) if rng.random() < 0.2 else step % goals
+        if nxt != current:
+            edges.append((current, nxt))
+        current = nxt
+    return edges
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, nargs="+", default=[1_000, 5_000])
+    parser.add_argument("--goals", type=int, default=2_000)
+    args = parser.parse_args()
+
+    print(f"{'cycles':>7} {'index ms':>9} {'legacy ms':>10}")
+    for n in args.cycles:
+        edges = transitions(n, args.goals)
+        start = time.perf_counter()
+        index = GoalIndex()
+        for u, v in edges:
+            index.add_edge(u, v)
+            index.order()
+        new_t = time.perf_counter() - start
+
+        start = time.perf_counter()
+        graph = nx.DiGraph()
+        for u, v in edges:
+            graph.add_edge(u, v)
+            legacy_goal_path(graph)
+        old_t = time.perf_counter() - start
+        print(f"{n:7d} {new_t * 1000:9.1f} {old_t * 1000:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
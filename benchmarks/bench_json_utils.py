@@ -0,0 +1,88 @@
+"""Benchmark ``parse_json_safe`` on adversarial inputs of 100 KB and more.
+
+The previous fallback, a greedy ``re.search(r"\\{.*\\}|\\[.*\\]", text, re.S)``,
+is reproduced for comparison. It backtracks quadratically on unbalanced
+input, so it is only timed up to ``--legacy-max`` bytes. Run with
+``python benchmarks/bench_json_utils.py``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from typing import Any, Callable, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.json_utils import parse_json_safe
+
+
+def legacy_parse_json_safe(text: str) -> Optional[Any]:
+    stripped = text.strip()
+    try:
+        return json.loads(stripped)
+    except json.JSONDecodeError:
+        match = re.search(r"\{.*\}|\[.*\]", stripped, re.S)
+        if match:
+            try:
+                return json.loads(match.group(0))
+            except json.JSONDecodeError:
+                return None
+    return None
+
+
+def _payload(n: int) -> str:
+    return json.dumps({"triplets": [["Musik", "ist", f"Kunst {i}"] for i in range(n)]})
+
+
+def workloads(size: int) -> dict:
+    obj = '{"goal": "Musik verstehen"}'
+    return {
+        "unclosed braces": "{" * size,
+        "deep nesting": "[" * (size // 2) + "]" * (size // 2),
+        "prose braces, JSON at end": ("Text {kein json} " * (size // 17)) + obj,
+        "two objects with prose": _payload(size // 40) + " und außerdem " + _payload(size // 40),
+        "quotes in prose": ('Er sagte "hallo" ' * (size // 17)) + obj,
+        "valid JSON in prose": "Antwort: " + _payload(size // 32) + " Ende.",
+    }
+
+
+def timed(func: Callable[[str], Any], text: str, repeat: int) -> tuple:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            result = func(text)
+        except RecursionError:
+            result = "RecursionError"
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--legacy-max", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sizes = sorted({*args.sizes, args.legacy_max})
+    print(f"{'workload':28} {'bytes':>9} {'scanner ms':>11} {'legacy ms':>10}  found")
+    for size in sizes:
+        for name, text in workloads(size).items():
+            new_t, new_r = timed(parse_json_safe, text, args.repeat)
+            if size <= args.legacy_max:
+                old_t, old_r = timed(legacy_parse_json_safe, text, args.repeat)
+                old = f"{old_t * 1000:10.1f}"
+                found = f"{new_r is not None}/{old_r if isinstance(old_r, str) else old_r is not None}"
+            else:
+                old = f"{'-':>10}"
+                found = f"{new_r is not None}"
+            print(f"{name:28} {len(text):9d} {new_t * 1000:11.1f} {old}  {found}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Micro-benchmark of the single-pass triple scanner against the old cascade.
+
+The legacy implementation (``json.loads`` -> ``ast.literal_eval`` -> greedy
+regex -> both parsers again -> unquoted split) is reproduced below for
+comparison. Run with ``python benchmarks/bench_triplet_parser.py``.
+"""
+from __future__ import annotations
+
+import ast
+import json
+import os
+import re
+import sys
+import timeit
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from parsing.triplet_parser_llm import _parse_response
+
+
+def _legacy_parse_unquoted(text: str) -> List[Tuple[str, str, str]] | None:
+    """Attempt to parse a list of triples without quoted strings."""
+    import re
+
+    txt = text.strip()
+    if not (txt.startswith("[") and txt.endswith("]")):
+        return None
+    inner = txt[1:-1].strip()
+    # split triples separated by brackets, parentheses, commas or newlines
+    segments = re.split(r"\]\s*,\s*\[|\]\s*\n\s*\[|\)\s*,\s*\(|\],\s*\(|\),\s*\[", inner)
+    triples: List[Tuple[str, str, str]] = []
+    for seg in segments:
+        seg = seg.strip().strip("[]()")
+        if not seg:
+            continue
+        parts = [p.strip(" '\"") for p in seg.split(',')]
+        if len(parts) != 3:
+            return None
+        triples.append(tuple(parts))
+    return triples
+
+
+def _legacy_parse_response(content: str) -> List[Tuple[str, str, str]] | None:
+    """Parse a raw string from the LLM into a list of triples."""
+    text = content.strip()
+    if text.startswith("```") and text.endswith("```"):
+        lines = text.splitlines()
+        if len(lines) >= 3:
+            text = "\n".join(lines[1:-1])
+    # Try JSON first, then Python literal evaluation
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        try:
+            data = ast.literal_eval(text)
+        except Exception:
+            import re
+
+            match = re.search(r"\[.*\]", text, re.S)
+            if match:
+                snippet = match.group(0)
+                for parser in (json.loads, ast.literal_eval):
+                    try:
+                        data = parser(snippet)
+                        break
+                    except Exception:
+                        data = None
+                if data is None:
+                    data = _legacy_parse_unquoted(snippet)
+            else:
+                data = _legacy_parse_unquoted(text)
+            if data is None:
+                return None
+    if isinstance(data, list):
+        triples: List[Tuple[str, str, str]] = []
+        for item in data:
+            if (
+                isinstance(item, (list, tuple))
+                and len(item) == 3
+            ):
+                triples.append(
+                    (str(item[0]).strip(), str(item[1]).strip(), str(item[2]).strip())
+                )
+        return triples
+    return None
+
+
+def workloads() -> dict:
+    triples = [(f"Subjekt {i}", "bedeutet", f"Objekt Nummer {i}") for i in range(500)]
+    unquoted = "\n".join(f"[{s}, {p}, {o}]" for s, p, o in triples)
+    return {
+        "JSON (500 Tripel)": json.dumps(triples, ensure_ascii=False),
+        "Python-Tupel (500)": repr(triples),
+        "unquotiert, zeilenweise (500)": unquoted,
+        "Prosa + Liste (500)": "Hier die Tripel:\n" + repr(triples) + "\nViel Erfolg!",
+        "abgeschnitten (500)": repr(triples)[:-40],
+        # adversarial: long whitespace runs and many quote characters
+        "Leerzeichen-Läufe (2000)": "[" + " " * 2000 + "x" + " " * 2000 + "]",
+        "Apostrophe (40000)": "[" + "a'" * 40000 + "]",
+    }
+
+
+def main() -> None:
+    print(f"{'Eingabe':<32} {'Kaskade':>12} {'Scanner':>12}  Tripel alt/neu")
+    for label, text in workloads().items():
+        old = min(timeit.repeat(lambda: _legacy_parse_response(text), number=5, repeat=5)) / 5
+        new = min(timeit.repeat(lambda: _parse_response(text), number=5, repeat=5)) / 5
+        n_old = len(_legacy_parse_response(text) or [])
+        n_new = len(_parse_response(text) or [])
+        print(f"{label:<32} {old * 1000:9.2f} ms {new * 1000:9.2f} ms  {n_old}/{n_new}")
+
+
+if __name__ == "__main__":
+    main()
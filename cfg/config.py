@@ -27,6 +27,14 @@ PROMPTS = {
         "Gib nur eine Liste von Tripeln im Format [('Subjekt', 'Prädikat', 'Objekt')] "
         "zurück. Kein Kommentar, keine Erklärungen."
     ),
+    'triplet_batch_system': (
+        "Extrahiere aus jedem der folgenden deutschen Texte alle bedeutungsvollen "
+        "Aussagen als Tripel (Subjekt, Prädikat, Objekt). Jeder Text beginnt mit "
+        "einer Kennung wie [3]. Gib ausschließlich ein JSON-Objekt zurück, das jede "
+        "Kennung auf eine Liste von Tripeln abbildet, z. B. "
+        "{\"3\": [[\"Subjekt\", \"Prädikat\", \"Objekt\"]]}. "
+        "Kein Kommentar, keine Erklärungen."
+    ),
     'goal_detector_system': (
         "Du bist ein Zielerkennungsmodul im KI-System MetaboMind. "
         "Analysiere die aktuelle und vorherige Konversation, um zu erkennen, "
@@ -52,3 +60,110 @@ TEMPERATURES = {
     'subgoal': 0.3,
     'generate_next_input': 0.7,
 }
+
+ENTROPY = {
+    # 'exact', 'approx' or 'auto' (approximate once the graph exceeds the threshold)
+    'mode': 'exact',
+    'approx_threshold': 100_000,
+    'epsilon': 0.05,
+    'delta': 0.05,
+    # 'global' or 'goal' (k-hop neighbourhood of the active goal's nodes)
+    'scope': 'global',
+    'ego_hops': 2,
+}
+
+GOAL_DECISION = {
+    # share of the goal's content words in the input that keeps the goal
+    'lexical_keep': 0.5,
+    # embedding similarity of input and goal: keep above, shift below
+    'embedding_keep': 0.8,
+    'embedding_shift': 0.5,
+    # an input taken over as goal is cut to this many words
+    'max_goal_words': 8,
+    # proposed goals at least this similar to a known goal reuse its node:
+    # cosine of model embeddings, or offline of hashed character trigrams of
+    # the goals' content words
+    'dedup_embeddings': True,
+    'dedup_similarity': 0.9,
+    'dedup_trigram_similarity': 0.85,
+}
+
+PLANNING = {
+    # a cached plan is reused while the reflection's content words overlap
+    # with the plan's context at least this much (Jaccard)
+    'cache_similarity': 0.5,
+    # run a mini-cycle for every planned subgoal and activate the one whose
+    # triples reduce the entropy most
+    'explore_subgoals': False,
+    'explore_workers': 4,
+}
+
+ASSIST = {
+    # generate the next goal-driven input in the background after each
+    # cycle so the 'assist' intent does not wait for the LLM; costs one
+    # request per cycle even if the input is never used
+    'prefetch_next_input': False,
+}
+
+SUBGOAL_SCORING = {
+    # weights of similarity to the goal, share of words already in the
+    # graph and expected entropy change in the subgoal ranking
+    'relevance': 0.5,
+    'overlap': 0.3,
+    'novelty': 0.2,
+    # one embedding request per ranking instead of local trigram vectors
+    'embeddings': False,
+}
+
+EXTRACTION = {
+    # approximate input tokens per batched extraction request
+    'batch_token_budget': 3000,
+    # extra rounds for batch items whose output could not be parsed
+    'batch_retries': 1,
+    # inputs longer than this are split into sentence-aligned chunks
+    'chunk_chars': 1500,
+    # trailing sentences repeated at the start of the next chunk
+    'chunk_overlap': 1,
+    # concurrent requests for the chunks of one input
+    'chunk_workers': 4,
+    # rule-based triples are used without an LLM call from this confidence on
+    'local_confidence': 0.8,
+}
+
+TAKT = {
+    # seconds between background takts: start value and bounds
+    'interval': 60.0,
+    'min_interval': 15.0,
+    'max_interval': 900.0,
+    # |ΔE| below 'calm_delta' lengthens the interval by 'backoff',
+    # above 'busy_delta' shortens it by 'speedup'
+    'calm_delta': 0.05,
+    'busy_delta': 0.15,
+    'backoff': 2.0,
+    'speedup': 0.5,
+    # LLM requests background takts may make per hour
+    'llm_calls_per_hour': 30,
+    # gated takts reflect only once the summed |ΔE| since the last
+    # reflection reaches this value (or the emotion label changes)
+    'reflect_threshold': 0.1,
+    # assumed LLM requests of a reflecting takt before one was measured
+    'calls_per_reflection': 2,
+}
+
+MULTI_GOAL = {
+    # persisted list of concurrently active goals
+    'path': 'memory/goals.json',
+    # goal cycles whose LLM stages run at the same time
+    'concurrency': 4,
+    # entropy reductions remembered per goal
+    'history': 5,
+    # score bonus per round a goal has been waiting, so no goal starves
+    'aging': 0.05,
+}
+
+PIPELINE = {
+    # stages of one cycle that may run at the same time
+    'workers': 4,
+    # seconds per stage name after which its fallback is used
+    'timeouts': {},
+}
@@ -0,0 +1,209 @@
+"""Bulk ingestion of text corpora into the IntentionGraph.
+
+Usage::
+
+    python -m control.corpus_ingestion corpus/ --workers 8
+
+Documents are streamed from a directory, split into sentence-aligned chunks
+and sent to the batched triplet extraction with bounded concurrency. Triples
+are deduplicated and inserted in large transactions; after every transaction
+the graph is saved and the processed documents are checkpointed, so an
+interrupted run resumes where it stopped.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from memory.intention_graph import IntentionGraph
+from memory.memory_manager import get_memory_manager
+from parsing.text_chunker import chunk_text
+from parsing.triplet_extractor import dedupe_triplets
+from parsing.triplet_parser_llm import extract_triplets_batch
+
+logger = logging.getLogger(__name__)
+
+Triple = Tuple[str, str, str]
+
+
+class IngestionCheckpoint:
+    """JSON file recording which documents are already in the graph."""
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {}
+        self.documents: Dict[str, int] = data.get("documents", {})
+        self.triples: int = data.get("triples", 0)
+        self.seconds: float = data.get("seconds", 0.0)
+
+    def save(self) -> None:
+        """Write the checkpoint atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        data = {"documents": self.documents, "triples": self.triples, "seconds": self.seconds}
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(self.path)
+
+
+def iter_documents(directory: str, patterns: Iterable[str] = ("*.txt", "*.md")) -> List[Path]:
+    """Return all matching files below ``directory`` in a stable order."""
+    root = Path(directory)
+    return sorted({p for pattern in patterns for p in root.rglob(pattern) if p.is_file()})
+
+
+def _extract_document(
+    path: Path,
+    max_chars: int,
+    extractor: Callable[[List[str]], List[List[Triple]]],
+) -> List[Triple]:
+    text = path.read_text(encoding="utf-8", errors="replace")
+    chunks = chunk_text(text, max_chars=max_chars)
+    triples = [t for per_chunk in extractor(chunks) for t in per_chunk]
+    return dedupe_triplets(triples)
+
+
+def _in_graph(graph, triple: Triple) -> bool:
+    subj, rel, obj = triple
+    if not graph.has_edge(subj, obj):
+        return False
+    return any(data.get("relation") == rel for data in graph[subj][obj].values())
+
+
+def ingest_corpus(
+    directory: str,
+    graph: IntentionGraph | None = None,
+    *,
+    checkpoint_path: str = "data/ingest_checkpoint.json",
+    workers: int = 4,
+    transaction_size: int = 5000,
+    max_chars: int = 1500,
+    patterns: Iterable[str] = ("*.txt", "*.md"),
+    extractor: Callable[[List[str]], List[List[Triple]]] = partial(
+        extract_triplets_batch, raise_on_failure=True
+    ),
+) -> Dict[str, float]:
+    """Ingest all documents of ``directory`` and return a throughput report.
+
+    ``extractor`` receives the chunks of one document and returns one triple
+    list per chunk; it must raise if a chunk could not be extracted, since
+    documents are checkpointed whenever it returns. At most ``2 * workers``
+    documents are in flight at once.
+    """
+    if graph is None:
+        graph = get_memory_manager().graph
+    root = Path(directory)
+    checkpoint = IngestionCheckpoint(checkpoint_path)
+    pending = [
+        p for p in iter_documents(directory, patterns)
+        if p.relative_to(root).as_posix() not in checkpoint.documents
+    ]
+    logger.info("%d documents to ingest (%d done before)", len(pending), len(checkpoint.documents))
+
+    start = time.perf_counter()
+    last_commit = start
+    buffer: List[Triple] = []
+    buffered: set = set()
+    buffer_docs: Dict[str, int] = {}
+    n_docs = 0
+    n_triples = 0
+
+    def commit() -> None:
+        nonlocal n_docs, n_triples, last_commit
+        if not buffer_docs:
+            return
+        if buffer:
+            graph.add_triplets(buffer)
+            graph.save_graph()
+        now = time.perf_counter()
+        checkpoint.documents.update(buffer_docs)
+        checkpoint.triples += len(buffer)
+        checkpoint.seconds += now - last_commit
+        checkpoint.save()
+        last_commit = now
+        n_docs += len(buffer_docs)
+        n_triples += len(buffer)
+        logger.info("committed %d documents, %d triples", len(buffer_docs), len(buffer))
+        buffer.clear()
+        buffered.clear()
+        buffer_docs.clear()
+
+    graph.begin_cycle()
+    remaining = iter(pending)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        in_flight = {}
+
+        def submit_next() -> None:
+            path = next(remaining, None)
+            if path is not None:
+                in_flight[pool.submit(_extract_document, path, max_chars, extractor)] = path
+
+        for _ in range(2 * workers):
+            submit_next()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = in_flight.pop(future)
+                submit_next()
+                try:
+                    triples = future.result()
+                except Exception as exc:
+                    # not checkpointed, so the next run retries the document
+                    logger.warning("extraction failed for %s: %s", path, exc)
+                    continue
+                new = [
+                    t for t in triples
+                    if t not in buffered and not _in_graph(graph.graph, t)
+                ]
+                buffer.extend(new)
+                buffered.update(new)
+                buffer_docs[path.relative_to(root).as_posix()] = len(new)
+                if len(buffer) >= transaction_size:
+                    commit()
+    commit()
+
+    seconds = time.perf_counter() - start
+    return {
+        "documents": n_docs,
+        "triples": n_triples,
+        "seconds": seconds,
+        "documents_per_sec": n_docs / seconds if seconds else 0.0,
+        "triples_per_sec": n_triples / seconds if seconds else 0.0,
+    }
+
+
+def main(argv: List[str] | None = None) -> None:
+    """Entry point for ``python -m control.corpus_ingestion``."""
+    parser = argparse.ArgumentParser(description="Korpus in den IntentionGraph laden")
+    parser.add_argument("directory", help="Verzeichnis mit .txt/.md-Dokumenten")
+    parser.add_argument("--checkpoint", default="data/ingest_checkpoint.json")
+    parser.add_argument("--workers", type=int, default=4, help="parallele LLM-Anfragen")
+    parser.add_argument("--transaction", type=int, default=5000, help="Tripel pro Transaktion")
+    parser.add_argument("--chunk-chars", type=int, default=1500)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    report = ingest_corpus(
+        args.directory,
+        checkpoint_path=args.checkpoint,
+        workers=args.workers,
+        transaction_size=args.transaction,
+        max_chars=args.chunk_chars,
+    )
+    print(
+        f"{report['documents']} Dokumente, {report['triples']} Tripel in "
+        f"{report['seconds']:.1f}s ({report['documents_per_sec']:.2f} Dok/s, "
+        f"{report['triples_per_sec']:.1f} Tripel/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
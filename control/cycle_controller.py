@@ -3,6 +3,7 @@ from __future__ import annotations
 import logging
 from typing import Dict
 
+from cfg.config import ASSIST
 from control.metabo_cycle import run_metabo_cycle
 from goals.goal_manager import get_active_goal, set_goal
 from memory.recall_context import recall_context
@@ -11,6 +12,21 @@ from utils import intent_detector
 logger = logging.getLogger(__name__)
 
 
+def _prefetch_next_input() -> int:
+    """Speculatively prepare the input of the next 'assist' cycle.
+
+    Returns the number of LLM requests started (generating an input is one).
+    """
+    try:
+        from goals import goal_executor
+        pending = goal_executor.pending_prefetch()
+        future = goal_executor.prefetch_next()
+    except Exception as exc:
+        logger.warning("prefetching next input failed: %s", exc)
+        return 0
+    return int(future is not None and future is not pending)
+
+
 def run_cycle(user_input: str) -> Dict[str, object]:
     """Coordinate goal pursuit, user intention and memory access."""
     intent = intent_detector.classify(user_input)
@@ -44,6 +60,9 @@ def run_cycle(user_input: str) -> Dict[str, object]:
     if recalled:
         result["context_recall"] = recalled
     goal = result.get("goal", get_active_goal())
+    llm_calls = result.get("llm_calls", 0)
+    if ASSIST['prefetch_next_input']:
+        llm_calls += _prefetch_next_input()
 
     return {
         "antwort": result.get("reflection", ""),
@@ -51,4 +70,5 @@ def run_cycle(user_input: str) -> Dict[str, object]:
         "emotion": {"label": result.get("emotion", "neutral"), "delta": result.get("delta", 0.0)},
         "ziel": goal,
         "triplets": result.get("triplets", []),
+        "llm_calls": llm_calls,
     }
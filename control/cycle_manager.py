@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import logging
 import os
+import time
 from typing import List, Tuple, Optional
 
 from goals import goal_engine
@@ -8,10 +10,15 @@ from memory.memory_manager import get_memory_manager
 
 from logs.logger import MetaboLogger
 
+from parsing.rule_extractor import FAST_PATH, extract_triplets_local, try_local_extraction
 from parsing.triplet_parser_llm import extract_triplets_via_llm
 
 from reflection.reflection_engine import generate_reflection, run_llm_task
 
+from control.pipeline import Pipeline, Stage
+
+logger = logging.getLogger(__name__)
+
 
 class CycleManager:
     """Manages Metabo cycles including graph updates and reflections."""
@@ -23,70 +30,98 @@ class CycleManager:
         self.logger = logger
         self.logs: List[str] = []
         self.current_goal = goal_engine.get_current_goal()
-
+        self.pipeline = self._build_pipeline()
 
     def _extract_triplets(self, text: str) -> List[Tuple[str, str, str]]:
-        """Naive fallback extraction of triples when no API key is available."""
-        words = text.split()
-        if len(words) >= 3:
-            return [(words[0], words[1], " ".join(words[2:]))]
-        return []
+        """Extract triples locally, asking the LLM only for complex input.
+
+        Without an API key the rule-based result is used whatever its
+        confidence.
+        """
+        if not self.api_key:
+            return extract_triplets_local(text).triplets
+        local = try_local_extraction(text)
+        if local is not None:
+            return local
+        started = time.perf_counter()
+        triplets = extract_triplets_via_llm(text)
+        FAST_PATH.record_llm(time.perf_counter() - started)
+        return triplets
 
     def _reflect(
         self,
-        user_input: str,
+        text: str,
         triplets: List[Tuple[str, str, str]],
     ) -> dict:
         """Use the reflection engine to analyse triplets and emotion."""
         return generate_reflection(
-            last_user_input=user_input,
+            last_user_input=text,
             goal=self.current_goal,
             last_reflection=self.memory.load_reflection(),
             triplets=triplets,
             api_key=self.api_key,
         )
 
-    def run_cycle(self, text: str) -> dict:
-        """Run a single Metabo cycle with the provided text and return results."""
-        self.cycle += 1
-
-        if self.api_key:
-            triplets = extract_triplets_via_llm(text)
-        else:
-            triplets = self._extract_triplets(text)
-
-        before, after = self.memory.store_triplets(triplets)
+    def _build_pipeline(self) -> Pipeline:
+        return Pipeline([
+            Stage("extraction", self._extract_triplets, inputs=("text",),
+                  outputs=("triplets",)),
+            Stage("graph_update", self._store, inputs=("triplets",),
+                  outputs=("entropy_before", "entropy_after", "emotion"), writes_graph=True),
+            # the goal is decided on the graph with this cycle's triples
+            Stage("goal_update", self._update_goal, inputs=("text", "triplets"),
+                  outputs=("new_goal",), after=("graph_update",)),
+            # the transition writes the goal graph the entropy stage reads
+            Stage("goal_switch", self._switch_goal, inputs=("new_goal",),
+                  outputs=("goal_update", "goal_reflection"), after=("graph_update",),
+                  writes_graph=True),
+            Stage("reflection", self._reflect, inputs=("text", "triplets"),
+                  outputs=("reflection",), after=("goal_switch",)),
+            Stage("logging", self._log,
+                  inputs=("text", "triplets", "reflection", "entropy_before",
+                          "entropy_after", "emotion"),
+                  outputs=("log_entry",)),
+        ])
+
+    def _store(self, triplets: List[Tuple[str, str, str]]) -> dict:
+        before, after = self.memory.store_triplets(triplets, self.current_goal)
         emo = self.memory.save_emotion(before, after)
+        return {"entropy_before": before, "entropy_after": after, "emotion": emo}
 
+    def _update_goal(self, text: str, triplets: List[Tuple[str, str, str]]) -> str:
         new_goal = goal_engine.update_goal(
             user_input=text,
             last_reflection=self.memory.load_reflection(),
             triplets=triplets,
         )
+        return self.memory.graph.resolve_goal(new_goal)
+
+    def _switch_goal(self, new_goal: str) -> dict:
+        """Record a goal change and reflect on it."""
+        if new_goal == self.current_goal:
+            return {"goal_update": "", "goal_reflection": ""}
+        if self.current_goal:
+            self.memory.graph.add_goal_transition(self.current_goal, new_goal)
+        else:
+            self.memory.graph.goal_graph.add_node(new_goal)
+            self.memory.graph._save_goal_graph()
+        goal_reflection = run_llm_task(
+            f"Reflektiere kurz den Zielwechsel von '{self.current_goal}' zu '{new_goal}'.",
+            api_key=self.api_key,
+        )
+        if goal_reflection:
+            self.memory.store_reflection(goal_reflection)
+        self.current_goal = new_goal
+        return {
+            "goal_update": f"Neues Ziel erkannt: {self.current_goal}",
+            "goal_reflection": goal_reflection,
+        }
 
-        goal_message = ""
-        goal_reflection = ""
-        if new_goal != self.current_goal:
-            if self.current_goal:
-                self.memory.graph.add_goal_transition(self.current_goal, new_goal)
-            else:
-                self.memory.graph.goal_graph.add_node(new_goal)
-                self.memory.graph._save_goal_graph()
-            goal_reflection = run_llm_task(
-                f"Reflektiere kurz den Zielwechsel von '{self.current_goal}' zu '{new_goal}'.",
-                api_key=self.api_key,
-            )
-            if goal_reflection:
-                self.memory.store_reflection(goal_reflection)
-            self.current_goal = new_goal
-            goal_message = f"Neues Ziel erkannt: {self.current_goal}"
-
-        reflection = self._reflect(text, triplets)
+    def _log(self, text, triplets, reflection, entropy_before, entropy_after, emotion) -> str:
         self.memory.store_reflection(reflection.get("reflection", ""))
-
         log_entry = (
-            f"Cycle{self.cycle}: ent_b={before:.3f} ent_a={after:.3f} "
-            f"emotion={emo['delta']:.3f}"
+            f"Cycle{self.cycle}: ent_b={entropy_before:.3f} ent_a={entropy_after:.3f} "
+            f"emotion={emotion['delta']:.3f}"
         )
         self.logs.append(log_entry)
 
@@ -95,24 +130,34 @@ class CycleManager:
                 input_text=text,
                 reflection=reflection["reflection"],
                 triplets=triplets,
-                ent_before=before,
-                ent_after=after,
-                emotion=emo["emotion"],
-                intensity=emo["intensity"],
+                ent_before=entropy_before,
+                ent_after=entropy_after,
+                emotion=emotion["emotion"],
+                intensity=emotion["intensity"],
             )
+        return log_entry
+
+    def run_cycle(self, text: str) -> dict:
+        """Run a single Metabo cycle with the provided text and return results."""
+        self.cycle += 1
+        self.memory.graph.begin_cycle()
+        values = self.pipeline.run(text=text)
+        logger.debug("extraction fast path: %s", FAST_PATH.report())
+        emo = values["emotion"]
+        reflection = values["reflection"]
 
         return {
             "cycle": self.cycle,
-            "entropy_before": before,
-            "entropy_after": after,
+            "entropy_before": values["entropy_before"],
+            "entropy_after": values["entropy_after"],
             "delta": emo["delta"],
             "emotion": emo["emotion"],
             "intensity": emo["intensity"],
             "reflection": reflection["reflection"],
             "explanation": reflection.get("explanation", ""),
-            "triplets": triplets,
-            "log_entry": log_entry,
+            "triplets": values["triplets"],
+            "log_entry": values["log_entry"],
             "goal": self.current_goal,
-            "goal_update": goal_message,
-            "goal_reflection": goal_reflection,
+            "goal_update": values["goal_update"],
+            "goal_reflection": values["goal_reflection"],
         }
@@ -1,135 +1,231 @@
 from __future__ import annotations
 
 import logging
+import time
 from typing import Dict
 
 from goals.goal_manager import GoalManager
-from goals.goal_updater import propose_goal, check_goal_shift
+from goals.goal_updater import GoalDecisionContext, is_new_topic  # noqa: F401 - re-exported
 from memory.memory_manager import get_memory_manager
 from memory.context_selector import load_context
-from parsing.triplet_parser_llm import extract_triplets_via_llm
+from parsing.rule_extractor import FAST_PATH, try_local_extraction
+from parsing.triplet_parser_llm import stream_triplets_via_llm
 from memory.recall_context import recall_context
 from reflection.reflection_engine import generate_reflection
 from logs.logger import MetaboLogger
 from reasoning.emotion import interpret_emotion
-from reasoning.entropy_analyzer import entropy_of_graph
+from utils.llm_client import track_llm_calls
+from goals.plan_cache import PlanCache
 from goals.subgoal_planner import decompose_goal
 from goals.subgoal_executor import execute_first_subgoal
-from difflib import SequenceMatcher
+from goals.subgoal_scorer import rank_subgoals
+from goals.subgoal_explorer import explore_subgoals, merge_explorations
+from cfg.config import PLANNING
+from control.pipeline import Pipeline, Stage
 
 logger = logging.getLogger(__name__)
 
 
-def is_new_topic(user_input: str, current_goal: str) -> bool:
-    """Return True if ``user_input`` appears unrelated to ``current_goal``."""
-    if not user_input or not current_goal:
-        return False
-    prefix = user_input.lower().strip()[:25]
-    return prefix not in current_goal.lower()
+def run_metabo_cycle(user_input: str) -> Dict[str, object]:
+    """Execute one MetaboMind cycle and return a structured result.
 
+    ``result["goal_context"]`` carries the cycle's goal decision for
+    :func:`goals.goal_updater.update_goal`; ``result["llm_calls"]`` counts
+    the LLM requests the cycle made.
+    """
+    with track_llm_calls() as calls:
+        result = _run_cycle(user_input, GoalDecisionContext(user_input))
+    result["llm_calls"] = calls.total
+    logger.debug("cycle LLM calls: %s", dict(calls.by_kind))
+    logger.debug("extraction fast path: %s", FAST_PATH.report())
+    return result
 
-def run_metabo_cycle(user_input: str) -> Dict[str, object]:
-    """Execute one MetaboMind cycle and return a structured result."""
+
+def _run_cycle(user_input: str, goal_context: GoalDecisionContext) -> Dict[str, object]:
     goal_mgr = GoalManager()
     memory = get_memory_manager()
-    log = MetaboLogger()
+    memory.graph.begin_cycle()
+    values = CYCLE_PIPELINE.run(
+        user_input=user_input,
+        goal_context=goal_context,
+        goal_mgr=goal_mgr,
+        memory=memory,
+        log=MetaboLogger(),
+    )
+    emotion = values["emotion"]
+    return {
+        "goal": values["goal"],
+        "input": user_input,
+        "subgoals": values["subgoals"],
+        "context": values["context"],
+        "reflection": values["reflection"],
+        "triplets": values["triplets"],
+        "entropy_before": values["entropy_before"],
+        "entropy_after": values["entropy_after"],
+        "emotion": emotion["emotion"],
+        "delta": emotion["delta"],
+        "goal_context": goal_context,
+    }
+
 
+# ----------------------------------------------------------------------
+# Stages. They look up the collaborators above at call time, so replacing
+# e.g. ``generate_reflection`` on this module affects the next cycle.
+
+
+def _decide_goal(goal_mgr, memory, goal_context, last_reflection):
     goal = goal_mgr.get_goal()
-    last_reflection = goal_mgr.load_reflection()
-
-    proposed = propose_goal(user_input)
-    if not proposed and is_new_topic(user_input, goal):
-        proposed = user_input.strip()
-
-    if proposed and check_goal_shift(goal, proposed):
-        if goal:
-            memory.graph.add_goal_transition(goal, proposed)
-        else:
-            memory.graph.goal_graph.add_node(proposed)
-            memory.graph._save_goal_graph()
-        goal_mgr.set_goal(proposed)
-        logger.info("Neues Ziel erkannt: %s -> %s", goal, proposed)
-        goal = proposed
-
-    try:
-        subgoals = decompose_goal(goal, last_reflection)
-    except Exception as exc:
-        logger.warning("subgoal planning failed: %s", exc)
-        subgoals = [goal]
-    goal = execute_first_subgoal(goal, subgoals)
-
-    graph_snapshot = memory.graph.snapshot()
-    entropy_before = entropy_of_graph(graph_snapshot)
-
-    try:
-        context_nodes = load_context(memory.graph.graph, goal)
-    except Exception as exc:
-        logger.warning("context selection failed: %s", exc)
-        context_nodes = []
-
-    try:
-        mem_facts = recall_context(scope="goal", limit=5)
-        fact_triplets = [
-            (d["subject"], d["predicate"], d["object"]) for d in mem_facts
-        ]
-    except Exception as exc:
-        logger.warning("context recall failed: %s", exc)
-        fact_triplets = []
-
-    try:
-        reflection_data = generate_reflection(
-            last_user_input=user_input,
-            goal=goal,
-            last_reflection=last_reflection,
-            triplets=fact_triplets,
-        )
-        reflection_text = reflection_data.get("reflection", "")
-    except Exception as exc:
-        logger.warning("reflection generation failed: %s", exc)
-        reflection_text = ""
-        reflection_data = {"reflection": "", "triplets": [], "explanation": ""}
-
-    try:
-        triplets = extract_triplets_via_llm(reflection_text)
-    except Exception as exc:
-        logger.warning("triplet extraction failed: %s", exc)
-        triplets = []
-
-    if triplets:
+    decision = goal_context.decide(goal, last_reflection)
+    # a paraphrase of a known goal reuses its node instead of shifting
+    new_goal = memory.graph.resolve_goal(decision.goal) if decision.changed else goal
+    if new_goal == goal:
+        # the stored goal is the subgoal the last cycle executed; plan for
+        # the goal it belongs to
+        return memory.graph.main_goal_of(goal)
+    if goal:
+        memory.graph.add_goal_transition(memory.graph.main_goal_of(goal), new_goal)
+    else:
+        memory.graph.goal_graph.add_node(new_goal)
+        memory.graph._save_goal_graph()
+    goal_mgr.set_goal(new_goal)
+    logger.info("Neues Ziel erkannt (%s): %s -> %s", decision.tier, goal, new_goal)
+    return new_goal
+
+
+def _plan(memory, main_goal, last_reflection):
+    return PlanCache(memory.graph).get_or_plan(main_goal, last_reflection, decompose_goal)
+
+
+def _rank(memory, main_goal, planned):
+    ranked = rank_subgoals(main_goal, planned, memory.graph.graph)
+    if not ranked:
+        return planned
+    logger.debug("Teilziel-Ranking: %s", [(r.subgoal, r.score) for r in ranked])
+    return [r.subgoal for r in ranked]
+
+
+def _explore(memory, main_goal, ranked_subgoals, last_reflection):
+    if not PLANNING['explore_subgoals'] or len(ranked_subgoals) < 2:
+        return {"subgoals": ranked_subgoals, "explorations": []}
+    # the triples are merged after entropy_after, so the cycle's entropy
+    # change only reflects its own extraction
+    explored = explore_subgoals(main_goal, ranked_subgoals, memory, last_reflection, merge=False)
+    return {"subgoals": [e.subgoal for e in explored], "explorations": explored}
+
+
+def _execute(memory, main_goal, subgoals):
+    goal = execute_first_subgoal(main_goal, subgoals)
+    memory.graph.set_active_subgoal(main_goal, goal)
+    return goal
+
+
+def _recall():
+    mem_facts = recall_context(scope="goal", limit=5)
+    return [(d["subject"], d["predicate"], d["object"]) for d in mem_facts]
+
+
+def _reflect(user_input, goal, last_reflection, fact_triplets, goal_context):
+    reflection_data = generate_reflection(
+        last_user_input=user_input,
+        goal=goal,
+        last_reflection=last_reflection,
+        triplets=fact_triplets,
+        goal_context=goal_context,
+    )
+    return reflection_data.get("reflection", "")
+
+
+def _extract(memory, reflection):
+    # simple sentences are handled by the local rules; otherwise insert each
+    # triple as soon as the streamed completion yields it
+    triplets = []
+    local = try_local_extraction(reflection)
+    if local is not None:
+        triplets = local
         try:
             memory.graph.add_triplets(triplets)
         except Exception as exc:
             logger.warning("graph update failed: %s", exc)
-
-    entropy_after = entropy_of_graph(memory.graph.snapshot())
-    emotion = interpret_emotion(entropy_before, entropy_after)
-
-
-
-    try:
-        log.log_cycle(
-            input_text=user_input,
-            reflection=reflection_text,
-            triplets=triplets,
-            ent_before=entropy_before,
-            ent_after=entropy_after,
-            emotion=emotion["emotion"],
-            intensity=emotion["intensity"],
-        )
-    except Exception as exc:
-        logger.warning("logging failed: %s", exc)
-
-    goal_mgr.save_reflection(reflection_text)
-
-    return {
-        "goal": goal,
-        "input": user_input,
-        "subgoals": subgoals,
-        "context": context_nodes,
-        "reflection": reflection_text,
-        "triplets": triplets,
-        "entropy_before": entropy_before,
-        "entropy_after": entropy_after,
-        "emotion": emotion["emotion"],
-        "delta": emotion["delta"],
-    }
+        return triplets
+    started = time.perf_counter()
+    failed = False
+    with track_llm_calls() as calls:
+        try:
+            for triple in stream_triplets_via_llm(reflection):
+                if not triplets:
+                    logger.debug("first triple after %.3fs", time.perf_counter() - started)
+                triplets.append(triple)
+                try:
+                    memory.graph.add_triplets([triple])
+                except Exception as exc:
+                    logger.warning("graph update failed: %s", exc)
+        except Exception as exc:
+            # keep the triples streamed before the failure
+            logger.warning("triplet extraction failed: %s", exc)
+            failed = True
+    # without client or after a failure there is no round trip to time
+    if calls.total and not failed:
+        FAST_PATH.record_llm(time.perf_counter() - started)
+    return triplets
+
+
+def _log(log, user_input, reflection, triplets, entropy_before, entropy_after, emotion):
+    log.log_cycle(
+        input_text=user_input,
+        reflection=reflection,
+        triplets=triplets,
+        ent_before=entropy_before,
+        ent_after=entropy_after,
+        emotion=emotion["emotion"],
+        intensity=emotion["intensity"],
+    )
+
+
+def _keep_planned(exc, main_goal, **_):
+    return [main_goal]
+
+
+def _keep_ranked(exc, ranked_subgoals, **_):
+    return {"subgoals": ranked_subgoals, "explorations": []}
+
+
+CYCLE_PIPELINE = Pipeline([
+    Stage("last_reflection", lambda goal_mgr: goal_mgr.load_reflection(),
+          inputs=("goal_mgr",), outputs=("last_reflection",)),
+    Stage("goal_decision", _decide_goal,
+          inputs=("goal_mgr", "memory", "goal_context", "last_reflection"),
+          outputs=("main_goal",), writes_graph=True),
+    Stage("planning", _plan, inputs=("memory", "main_goal", "last_reflection"),
+          outputs=("planned",), fallback=_keep_planned, writes_graph=True),
+    Stage("ranking", _rank, inputs=("memory", "main_goal", "planned"),
+          outputs=("ranked_subgoals",)),
+    Stage("exploration", _explore,
+          inputs=("memory", "main_goal", "ranked_subgoals", "last_reflection"),
+          outputs=("subgoals", "explorations"), fallback=_keep_ranked),
+    Stage("subgoal", _execute, inputs=("memory", "main_goal", "subgoals"), outputs=("goal",),
+          writes_graph=True),
+    Stage("entropy_before", lambda memory, goal: memory.calculate_entropy(goal),
+          inputs=("memory", "goal"), outputs=("entropy_before",)),
+    Stage("context", lambda memory, goal: load_context(memory.graph.graph, goal),
+          inputs=("memory", "goal"), outputs=("context",), fallback=[]),
+    # recall reads the goal stored by the subgoal stage
+    Stage("recall", _recall, outputs=("fact_triplets",), after=("subgoal",), fallback=[]),
+    Stage("reflection", _reflect,
+          inputs=("user_input", "goal", "last_reflection", "fact_triplets", "goal_context"),
+          outputs=("reflection",), fallback=""),
+    # the extraction writes to the graph the two stages before it read
+    Stage("extraction", _extract, inputs=("memory", "reflection"), outputs=("triplets",),
+          after=("entropy_before", "context"), writes_graph=True),
+    Stage("entropy_after", lambda memory, goal: memory.calculate_entropy(goal),
+          inputs=("memory", "goal"), outputs=("entropy_after",), after=("extraction",)),
+    Stage("exploration_merge", merge_explorations, inputs=("memory", "explorations"),
+          after=("entropy_after",), writes_graph=True),
+    Stage("emotion", lambda entropy_before, entropy_after: interpret_emotion(entropy_before, entropy_after),
+          inputs=("entropy_before", "entropy_after"), outputs=("emotion",)),
+    Stage("logging", _log,
+          inputs=("log", "user_input", "reflection", "triplets", "entropy_before",
+                  "entropy_after", "emotion"),
+          fallback=None),
+    Stage("save_reflection", lambda goal_mgr, reflection: goal_mgr.save_reflection(reflection),
+          inputs=("goal_mgr", "reflection"), after=("logging",)),
+])
@@ -0,0 +1,218 @@
+"""Declarative stage graph for the Metabo cycles.
+
+A :class:`Stage` wraps a function together with the names of the values it
+reads (``inputs``, passed as keyword arguments) and writes (``outputs``).
+:class:`Pipeline` derives the dependency graph from these names and runs
+every stage as soon as its inputs exist, independent stages concurrently on
+a thread pool. ``after`` names stages that must finish first without
+passing a value, e.g. "measure the entropy before the extraction writes to
+the graph".
+
+Per stage policies:
+
+- ``timeout``: seconds to wait for the stage (default
+  ``PIPELINE['timeouts'][name]``); a late stage is abandoned, its thread
+  finishes in the background and the result is dropped. Stages marked
+  ``writes_graph`` are never abandoned: their late writes would race the
+  following stages and the next cycle, so they take no timeout.
+- ``fallback``: value – or callable ``fallback(exc, **inputs)`` – used
+  instead of raising if the stage fails or times out.
+- ``cache_key``: callable ``cache_key(**inputs)``; stages with the same key
+  reuse the stored outputs of an earlier run of this stage object.
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence
+
+from cfg.config import PIPELINE
+
+logger = logging.getLogger(__name__)
+
+_NO_FALLBACK = object()
+
+
+class StageTimeout(TimeoutError):
+    """A stage without fallback exceeded its timeout."""
+
+
+class Stage:
+    """One step of a :class:`Pipeline`.
+
+    ``func(**inputs)`` returns the value of the single output, a mapping
+    with all outputs if there are several, or anything (ignored) if there
+    are none.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        inputs: Sequence[str] = (),
+        outputs: Sequence[str] = (),
+        after: Sequence[str] = (),
+        timeout: float | None = None,
+        fallback: Any = _NO_FALLBACK,
+        cache_key: Optional[Callable[..., Hashable]] = None,
+        cache_size: int = 128,
+        writes_graph: bool = False,
+    ) -> None:
+        if writes_graph and timeout is not None:
+            raise ValueError(f"stage {name!r} writes the graph and cannot time out")
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.after = tuple(after)
+        self.timeout = timeout
+        self.fallback = fallback
+        self.cache_key = cache_key
+        self.cache_size = cache_size
+        self.writes_graph = writes_graph
+        self._cache: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+
+    @property
+    def effective_timeout(self) -> float | None:
+        if self.timeout is not None:
+            return self.timeout
+        timeout = PIPELINE['timeouts'].get(self.name)
+        if timeout is not None and self.writes_graph:
+            logger.warning("[Pipeline] Stufe %s schreibt den Graphen, Timeout ignoriert", self.name)
+            return None
+        return timeout
+
+    def _as_outputs(self, value: Any) -> Dict[str, Any]:
+        if not self.outputs:
+            return {}
+        if len(self.outputs) == 1:
+            return {self.outputs[0]: value}
+        return {name: value[name] for name in self.outputs}
+
+    def run(self, **kwargs) -> Dict[str, Any]:
+        """Call the stage function (or reuse a cached result)."""
+        key = self.cache_key(**kwargs) if self.cache_key is not None else None
+        if key is not None and key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        outputs = self._as_outputs(self.func(**kwargs))
+        if key is not None:
+            self._cache[key] = outputs
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return outputs
+
+    def recover(self, exc: BaseException, **kwargs) -> Dict[str, Any]:
+        """Return the fallback outputs or re-raise ``exc``."""
+        if self.fallback is _NO_FALLBACK:
+            raise exc
+        logger.warning("[Pipeline] Stufe %s fehlgeschlagen: %s", self.name, exc)
+        value = self.fallback(exc, **kwargs) if callable(self.fallback) else self.fallback
+        return self._as_outputs(value)
+
+
+class Pipeline:
+    """Run :class:`Stage` objects in dependency order with maximum parallelism."""
+
+    def __init__(self, stages: Sequence[Stage], workers: int | None = None) -> None:
+        self.stages = list(stages)
+        self.workers = workers
+        self._producer: Dict[str, Stage] = {}
+        self._by_name: Dict[str, Stage] = {}
+        for stage in self.stages:
+            if stage.name in self._by_name:
+                raise ValueError(f"duplicate stage {stage.name!r}")
+            self._by_name[stage.name] = stage
+            for name in stage.outputs:
+                if name in self._producer:
+                    raise ValueError(f"value {name!r} produced by two stages")
+                self._producer[name] = stage
+        for stage in self.stages:
+            unknown = [name for name in stage.after if name not in self._by_name]
+            if unknown:
+                raise ValueError(f"stage {stage.name!r} waits for unknown stages {unknown}")
+        self._check_acyclic()
+
+    def _ready(self, stage: Stage, values: Dict[str, Any], finished: set) -> bool:
+        return all(n in values for n in stage.inputs) and all(n in finished for n in stage.after)
+
+    def _check_acyclic(self) -> None:
+        state: Dict[str, int] = {}
+
+        def visit(stage: Stage) -> None:
+            if state.get(stage.name) == 2:
+                return
+            if state.get(stage.name) == 1:
+                raise ValueError(f"stage {stage.name!r} depends on itself")
+            state[stage.name] = 1
+            for name in stage.inputs:
+                if name in self._producer:
+                    visit(self._producer[name])
+            for name in stage.after:
+                visit(self._by_name[name])
+            state[stage.name] = 2
+
+        for stage in self.stages:
+            visit(stage)
+
+    def run(self, **initial) -> Dict[str, Any]:
+        """Run all stages and return every value, ``initial`` included."""
+        values: Dict[str, Any] = dict(initial)
+        missing = {
+            name
+            for stage in self.stages
+            for name in stage.inputs
+            if name not in values and name not in self._producer
+        }
+        if missing:
+            raise ValueError(f"missing pipeline inputs: {sorted(missing)}")
+
+        pending: List[Stage] = list(self.stages)
+        running: Dict[Future, tuple] = {}
+        finished: set = set()
+        abandoned = False
+        workers = self.workers or PIPELINE['workers']
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stage")
+        try:
+            while pending or running:
+                for stage in [s for s in pending if self._ready(s, values, finished)]:
+                    pending.remove(stage)
+                    kwargs = {name: values[name] for name in stage.inputs}
+                    # copy per stage so context variables such as the LLM
+                    # call counter of the caller are visible in the worker
+                    future = pool.submit(contextvars.copy_context().run, stage.run, **kwargs)
+                    timeout = stage.effective_timeout
+                    deadline = time.monotonic() + timeout if timeout else None
+                    running[future] = (stage, kwargs, deadline)
+                if not running:
+                    blocked = ", ".join(s.name for s in pending)
+                    raise RuntimeError(f"stages cannot run: {blocked}")
+
+                deadlines = [d for _, _, d in running.values() if d is not None]
+                timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, kwargs, _ = running.pop(future)
+                    try:
+                        outputs = future.result()
+                    except Exception as exc:
+                        outputs = stage.recover(exc, **kwargs)
+                    values.update(outputs)
+                    finished.add(stage.name)
+                now = time.monotonic()
+                for future, (stage, kwargs, deadline) in list(running.items()):
+                    if deadline is not None and now >= deadline and not future.done():
+                        del running[future]
+                        abandoned = True
+                        exc = StageTimeout(
+                            f"stage {stage.name!r} exceeded {stage.effective_timeout}s"
+                        )
+                        values.update(stage.recover(exc, **kwargs))
+                        finished.add(stage.name)
+        finally:
+            # do not block on abandoned stages that are still running
+            pool.shutdown(wait=not abandoned, cancel_futures=True)
+        return values
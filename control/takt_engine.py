@@ -1,27 +1,110 @@
 from __future__ import annotations
 
-from typing import Dict
+from typing import Dict, List, Optional
 
+from cfg.config import TAKT
+from control.pipeline import Pipeline, Stage
 from goals import goal_engine
 from memory.memory_manager import get_memory_manager
 from reflection.reflection_engine import run_llm_task
+from utils.llm_client import track_llm_calls
 
 
-def run_metabotakt(api_key: str | None = None) -> Dict[str, object]:
-    """Execute a Metabotakt without user input."""
+class TaktGate:
+    """Decide which takts are worth an LLM reflection.
+
+    The absolute entropy changes of consecutive takts are summed; a takt
+    reflects once the sum reaches ``threshold`` or when its emotion label
+    differs from the previous takt's. The sum restarts after every
+    reflection.
+    """
+
+    def __init__(self, threshold: float | None = None) -> None:
+        self.threshold = TAKT['reflect_threshold'] if threshold is None else threshold
+        self.accumulated = 0.0
+        self.last_emotion: Optional[str] = None
+        self.passed = 0
+        self.held = 0
+        self.reflection_calls = 0
+
+    def should_reflect(self, delta: float, emotion: str) -> bool:
+        self.accumulated += abs(delta)
+        changed = self.last_emotion is not None and emotion != self.last_emotion
+        self.last_emotion = emotion
+        if changed or self.accumulated >= self.threshold:
+            self.accumulated = 0.0
+            self.passed += 1
+            return True
+        self.held += 1
+        return False
+
+    def record_calls(self, calls: int) -> None:
+        """Record the LLM requests a reflecting takt made."""
+        self.reflection_calls += calls
+
+    @property
+    def llm_calls_avoided(self) -> int:
+        """Held takts times the mean requests of a reflecting takt."""
+        if self.passed:
+            per_takt = self.reflection_calls / self.passed
+        else:
+            per_takt = TAKT['calls_per_reflection']
+        return round(self.held * per_takt)
+
+
+def run_metabotakt(api_key: str | None = None, gate: TaktGate | None = None) -> Dict[str, object]:
+    """Execute a Metabotakt without user input.
+
+    With a ``gate`` the reflection and goal update (the LLM part) only run
+    if the gate lets the takt's entropy change through; otherwise the
+    result has an empty reflection and ``"gated": True``.
+    """
     memory = get_memory_manager()
-    current_goal = goal_engine.get_current_goal()
+    # goal transitions of the takt are tagged with a cycle of their own
+    memory.graph.begin_cycle()
+    values = TAKT_PIPELINE.run(memory=memory, api_key=api_key, gate=gate)
+    emotion = values["emotion"]
+    outcome = values["outcome"]
+    result = {
+        "goal": outcome["goal"],
+        "goal_update": outcome["goal_update"],
+        "entropy": values["entropy"],
+        "delta": values["delta"],
+        "emotion": emotion["emotion"],
+        "intensity": emotion["intensity"],
+        "reflection": outcome["reflection"],
+    }
+    if gate is not None:
+        result["gated"] = outcome["gated"]
+    return result
+
+
+def _delta(memory, last_entropy: float, entropy: float) -> float:
+    memory.store_last_entropy(entropy)
+    return entropy - last_entropy
 
-    last_entropy = memory.load_last_entropy()
-    current_entropy = memory.calculate_entropy()
-    delta = current_entropy - last_entropy
-    memory.store_last_entropy(current_entropy)
 
-    emotion = memory.map_entropy_to_emotion(delta)
+def _gated_reflection(memory, goal, delta, emotion, api_key, gate) -> Dict[str, object]:
+    outcome: Dict[str, object] = {"goal": goal, "goal_update": "", "delta": delta, "reflection": ""}
+    if gate is None:
+        _reflect(memory, outcome, api_key)
+        return outcome
+    if not gate.should_reflect(delta, emotion["emotion"]):
+        outcome["gated"] = True
+        return outcome
+    with track_llm_calls() as calls:
+        _reflect(memory, outcome, api_key)
+    gate.record_calls(calls.total)
+    outcome["gated"] = False
+    return outcome
 
+
+def _reflect(memory, result: Dict[str, object], api_key: str | None) -> None:
+    """Reflect on the takt's entropy change and update the goal."""
+    current_goal = result["goal"]
     prompt = (
         f"Reflektiere den aktuellen Stand: Ziel war {current_goal}, "
-        f"\u0394E war {delta:+.2f}. Welche Bedeutung hat das?"
+        f"ΔE war {result['delta']:+.2f}. Welche Bedeutung hat das?"
     )
     reflection = run_llm_task(prompt, api_key=api_key)
     if reflection:
@@ -32,18 +115,48 @@ def run_metabotakt(api_key: str | None = None) -> Dict[str, object]:
         last_reflection=reflection,
         triplets=[],
     )
-    goal_update = ""
     if new_goal != current_goal:
         memory.graph.add_goal_transition(current_goal, new_goal)
-        current_goal = new_goal
-        goal_update = f"Neues Ziel erkannt: {new_goal}"
+        result["goal"] = new_goal
+        result["goal_update"] = f"Neues Ziel erkannt: {new_goal}"
+    result["reflection"] = reflection
+
 
+TAKT_PIPELINE = Pipeline([
+    Stage("goal", lambda: goal_engine.get_current_goal(), outputs=("goal",)),
+    Stage("last_entropy", lambda memory: memory.load_last_entropy(),
+          inputs=("memory",), outputs=("last_entropy",)),
+    Stage("entropy", lambda memory, goal: memory.calculate_entropy(goal),
+          inputs=("memory", "goal"), outputs=("entropy",)),
+    Stage("delta", _delta, inputs=("memory", "last_entropy", "entropy"), outputs=("delta",)),
+    Stage("emotion", lambda memory, delta: memory.map_entropy_to_emotion(delta),
+          inputs=("memory", "delta"), outputs=("emotion",)),
+    Stage("reflection", _gated_reflection,
+          inputs=("memory", "goal", "delta", "emotion", "api_key", "gate"),
+          outputs=("outcome",), writes_graph=True),
+])
+
+
+def run_metabotakt_batch(
+    count: int,
+    api_key: str | None = None,
+    threshold: float | None = None,
+    gate: TaktGate | None = None,
+) -> Dict[str, object]:
+    """Run ``count`` takts, reflecting only when the gate opens.
+
+    Returns the per-takt results under ``"takts"`` together with the final
+    goal, the number of reflecting takts and the LLM calls made and avoided.
+    """
+    gate = gate or TaktGate(threshold)
+    takts: List[Dict[str, object]] = []
+    with track_llm_calls() as calls:
+        for _ in range(count):
+            takts.append(run_metabotakt(api_key=api_key, gate=gate))
     return {
-        "goal": current_goal,
-        "goal_update": goal_update,
-        "entropy": current_entropy,
-        "delta": delta,
-        "emotion": emotion["emotion"],
-        "intensity": emotion["intensity"],
-        "reflection": reflection,
+        "goal": takts[-1]["goal"] if takts else goal_engine.get_current_goal(),
+        "takts": takts,
+        "reflections": sum(1 for t in takts if not t["gated"]),
+        "llm_calls": calls.total,
+        "llm_calls_avoided": gate.llm_calls_avoided,
     }
@@ -0,0 +1,214 @@
+"""Run Metabotakts in the background.
+
+:class:`TaktScheduler` executes :func:`control.takt_engine.run_metabotakt`
+on a daemon thread. The pause between takts follows the entropy: while the
+graph is stable (small |ΔE|) the interval grows up to
+``TAKT['max_interval']``, while it churns it shrinks down to
+``TAKT['min_interval']``. Takts never overlap a user cycle – wrap user
+cycles in :meth:`TaktScheduler.user_cycle` – and they are skipped while the
+LLM requests of the past hour would exceed ``TAKT['llm_calls_per_hour']``.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator, Optional, Tuple
+
+from cfg.config import TAKT
+from control import takt_engine
+from utils.llm_client import track_llm_calls
+
+logger = logging.getLogger(__name__)
+
+_HOUR = 3600.0
+
+
+class TaktScheduler:
+    """Background thread running takts at an entropy-adaptive interval.
+
+    Parameters
+    ----------
+    takt:
+        Callable run per takt. It receives ``api_key`` and must return a
+        dict with ``delta``. By default ``run_metabotakt`` runs behind a
+        :class:`~control.takt_engine.TaktGate`, so calm takts make no LLM
+        request.
+    on_result:
+        Called with every takt result from the scheduler thread. GUIs must
+        hand it over to their own thread (e.g. ``root.after``).
+    calls_per_hour:
+        LLM request budget of the background takts.
+    clock:
+        Monotonic time source, replaceable in tests.
+    """
+
+    def __init__(
+        self,
+        takt: Optional[Callable[..., Dict[str, object]]] = None,
+        *,
+        api_key: str | None = None,
+        on_result: Optional[Callable[[Dict[str, object]], None]] = None,
+        interval: float | None = None,
+        min_interval: float | None = None,
+        max_interval: float | None = None,
+        calls_per_hour: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.takt = takt
+        self.api_key = api_key
+        self.on_result = on_result
+        self.min_interval = TAKT['min_interval'] if min_interval is None else min_interval
+        self.max_interval = TAKT['max_interval'] if max_interval is None else max_interval
+        start = TAKT['interval'] if interval is None else interval
+        self.interval = min(max(start, self.min_interval), self.max_interval)
+        self.calls_per_hour = TAKT['llm_calls_per_hour'] if calls_per_hour is None else calls_per_hour
+        self.clock = clock
+        self.gate = takt_engine.TaktGate()
+
+        self.takts = 0
+        self.skipped = 0
+        # (time, LLM requests) per takt within the last hour
+        self._calls: Deque[Tuple[float, int]] = deque()
+        # expected requests of the next takt: the most any takt needed
+        self._expected_calls = 1
+
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._cond = threading.Condition()
+        self._user_cycles = 0
+        self._takt_running = False
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Control
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the scheduler thread (no-op if it is running)."""
+        if self.running:
+            return
+        # a fresh event per thread: a stopped thread still finishing its
+        # takt must not be revived by a quick restart
+        self._stop = threading.Event()
+        self._wake.clear()
+        self._thread = threading.Thread(
+            target=self._loop, args=(self._stop,), name="takt-scheduler", daemon=True
+        )
+        self._thread.start()
+        logger.info("[Takt] Hintergrundtakt gestartet (Intervall %.0fs)", self.interval)
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stop the scheduler; a running takt is finished first."""
+        self._stop.set()
+        self._wake.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+        logger.info("[Takt] Hintergrundtakt gestoppt")
+
+    def trigger(self) -> None:
+        """Run the next takt without waiting for the interval."""
+        self._wake.set()
+
+    @contextmanager
+    def user_cycle(self) -> Iterator[None]:
+        """Keep background takts out while the block runs.
+
+        A takt already in progress is finished before the block starts.
+        """
+        with self._cond:
+            self._user_cycles += 1
+            while self._takt_running:
+                self._cond.wait()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._user_cycles -= 1
+                self._cond.notify_all()
+
+    # ------------------------------------------------------------------
+    # Policy
+
+    def next_interval(self, delta: float) -> float:
+        """Return the pause after a takt with entropy change ``delta``."""
+        change = abs(delta)
+        interval = self.interval
+        if change < TAKT['calm_delta']:
+            interval *= TAKT['backoff']
+        elif change > TAKT['busy_delta']:
+            interval *= TAKT['speedup']
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def calls_last_hour(self) -> int:
+        horizon = self.clock() - _HOUR
+        while self._calls and self._calls[0][0] <= horizon:
+            self._calls.popleft()
+        return sum(calls for _, calls in self._calls)
+
+    def budget_allows(self) -> bool:
+        """True if another takt fits into the hourly LLM budget."""
+        return self.calls_last_hour() + self._expected_calls <= self.calls_per_hour
+
+    # ------------------------------------------------------------------
+    # Execution
+
+    def run_once(self) -> Optional[Dict[str, object]]:
+        """Run one takt now unless the budget is exhausted."""
+        if not self.budget_allows():
+            self.skipped += 1
+            logger.info(
+                "[Takt] LLM-Budget erschöpft (%d/%d pro Stunde), Takt ausgelassen",
+                self.calls_last_hour(), self.calls_per_hour,
+            )
+            return None
+        with track_llm_calls() as calls:
+            if self.takt is None:
+                result = takt_engine.run_metabotakt(api_key=self.api_key, gate=self.gate)
+            else:
+                result = self.takt(api_key=self.api_key)
+        self._calls.append((self.clock(), calls.total))
+        self._expected_calls = max(self._expected_calls, calls.total)
+        self.takts += 1
+        self.interval = self.next_interval(float(result.get("delta", 0.0)))
+        logger.info(
+            "[Takt] ΔE=%+.3f, %d LLM-Aufrufe, nächster Takt in %.0fs",
+            result.get("delta", 0.0), calls.total, self.interval,
+        )
+        return result
+
+    def _wait_for_user_cycles(self, stop: threading.Event) -> bool:
+        with self._cond:
+            while self._user_cycles and not stop.is_set():
+                self._cond.wait()
+            if stop.is_set():
+                return False
+            self._takt_running = True
+            return True
+
+    def _loop(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if stop.is_set() or not self._wait_for_user_cycles(stop):
+                break
+            try:
+                result = self.run_once()
+            except Exception as exc:  # pragma: no cover - keep the thread alive
+                logger.warning("[Takt] Hintergrundtakt fehlgeschlagen: %s", exc)
+                result = None
+                self.interval = self.max_interval
+            finally:
+                with self._cond:
+                    self._takt_running = False
+                    self._cond.notify_all()
+            if result is not None and self.on_result is not None:
+                self.on_result(result)
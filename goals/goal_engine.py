@@ -8,7 +8,7 @@ from typing import List, Tuple
 from goals.goal_manager import GoalManager
 from goals.goal_updater import update_goal as _llm_update_goal
 
-from utils.llm_client import get_client
+from utils.llm_client import get_client, record_llm_call
 from cfg.config import PROMPTS, MODELS, TEMPERATURES
 
 logger = logging.getLogger(__name__)
@@ -40,6 +40,7 @@ def generate_next_input(
     ]
 
     try:
+        record_llm_call("chat")
         if hasattr(client, "chat"):
             response = client.chat.completions.create(
                 model=model,
@@ -2,12 +2,84 @@
 
 from __future__ import annotations
 
+import contextvars
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Tuple
+
 from goals.goal_engine import generate_next_input
 from goals.goal_manager import get_active_goal, load_last_reflection
 
+logger = logging.getLogger(__name__)
+
+# speculative inputs used ('hit'), thrown away ('stale') and missing ('miss')
+PREFETCH_STATS: Counter = Counter()
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="next-input")
+_LOCK = threading.Lock()
+_PREFETCH: Optional[Tuple[Tuple[str, str], Future]] = None
+
+
+def prefetch_next(goal: str | None = None, reflection: str | None = None) -> Optional[Future]:
+    """Start generating the next statement for ``goal`` in the background.
+
+    Defaults to the active goal and the last reflection. The result is kept
+    for :func:`run_next` as long as neither of them changes; a pending
+    prefetch for an outdated pair is discarded. Nothing is started
+    without a goal.
+    """
+    global _PREFETCH
+    goal = get_active_goal() if goal is None else goal
+    reflection = load_last_reflection() if reflection is None else reflection
+    if not goal.strip():
+        return None
+    key = (goal, reflection)
+    with _LOCK:
+        if _PREFETCH is not None:
+            if _PREFETCH[0] == key:
+                return _PREFETCH[1]
+            _PREFETCH[1].cancel()
+            PREFETCH_STATS["stale"] += 1
+        future = _EXECUTOR.submit(
+            contextvars.copy_context().run, generate_next_input, goal, reflection
+        )
+        _PREFETCH = (key, future)
+    return future
+
+
+def pending_prefetch() -> Optional[Future]:
+    """Return the prefetch kept for :func:`run_next`, if any."""
+    with _LOCK:
+        return _PREFETCH[1] if _PREFETCH is not None else None
+
+
+def _take_prefetch(key: Tuple[str, str]) -> Optional[Future]:
+    global _PREFETCH
+    with _LOCK:
+        entry, _PREFETCH = _PREFETCH, None
+    if entry is None:
+        return None
+    if entry[0] != key:
+        entry[1].cancel()
+        PREFETCH_STATS["stale"] += 1
+        return None
+    return entry[1]
+
 
 def run_next() -> str:
-    """Generate the next statement towards the current goal."""
+    """Generate the next statement towards the current goal.
+
+    A matching prefetched statement is used if available (waiting for it if
+    it is still being generated); otherwise it is generated now.
+    """
     goal = get_active_goal()
     reflection = load_last_reflection()
+    future = _take_prefetch((goal, reflection))
+    if future is not None and not future.cancelled():
+        PREFETCH_STATS["hit"] += 1
+        logger.debug("using prefetched input for goal %r", goal)
+        return future.result()
+    PREFETCH_STATS["miss"] += 1
     return generate_next_input(goal, reflection)
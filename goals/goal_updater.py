@@ -4,17 +4,24 @@ from __future__ import annotations
 import json
 import logging
 import os
+from collections import Counter
 from difflib import SequenceMatcher
-from typing import List, Tuple, Optional
+from typing import Dict, List, NamedTuple, Tuple, Optional
 import re
 
-from utils.llm_client import get_client
-from cfg.config import PROMPTS, MODELS, TEMPERATURES
+from utils.llm_client import get_client, record_llm_call
+from cfg.config import GOAL_DECISION, PROMPTS, MODELS, TEMPERATURES
 
 logger = logging.getLogger(__name__)
 
 _SYSTEM_PROMPT = PROMPTS['goal_updater_system']
 
+_STOPWORDS = {
+    "untersuche", "analysiere", "über", "eine", "einer", "einen", "dich", "mich",
+    "sich", "nicht", "auch", "oder", "aber", "wenn", "dass", "sind", "wird",
+    "kann", "diese", "dieser", "dieses", "noch", "mehr", "sehr",
+}
+
 # ---------------------------------------------------------------------------
 # Goal proposal and shift utilities
 
@@ -41,6 +48,7 @@ def propose_goal(user_input: str, api_key: str | None = None) -> Optional[str]:
     ]
 
     try:
+        record_llm_call("chat")
         if hasattr(client, "chat"):
             resp = client.chat.completions.create(
                 model=MODELS['chat'],
@@ -74,6 +82,39 @@ def propose_goal(user_input: str, api_key: str | None = None) -> Optional[str]:
     return None
 
 
+def _embedding_similarity(a: str, b: str, api_key: str | None = None) -> Optional[float]:
+    """Return the cosine similarity of the embeddings of ``a`` and ``b``.
+
+    ``None`` if no client is available or the request failed.
+    """
+    client = get_client(api_key or os.getenv("OPENAI_API_KEY"))
+    if client is None:
+        return None
+    try:
+        record_llm_call("embedding")
+        if hasattr(client, "embeddings"):
+            resp = client.embeddings.create(
+                model=MODELS['embedding'],
+                input=[a, b],
+            )
+            vec1 = resp.data[0].embedding
+            vec2 = resp.data[1].embedding
+        else:
+            resp = client.Embedding.create(
+                model=MODELS['embedding'],
+                input=[a, b],
+            )
+            vec1 = resp["data"][0]["embedding"]
+            vec2 = resp["data"][1]["embedding"]
+        from numpy import dot
+        from numpy.linalg import norm
+
+        return float(dot(vec1, vec2) / (norm(vec1) * norm(vec2)))
+    except Exception as exc:  # pragma: no cover - network errors
+        logger.error("embedding similarity failed: %s", exc)
+        return None
+
+
 def check_goal_shift(current_goal: str, proposed_goal: str, api_key: str | None = None) -> bool:
     """Return ``True`` if ``proposed_goal`` represents a significant change."""
     proposed_goal = proposed_goal.strip()
@@ -84,31 +125,9 @@ def check_goal_shift(current_goal: str, proposed_goal: str, api_key: str | None
     if proposed_goal.lower() == current_goal.lower():
         return False
 
-    key = api_key or os.getenv("OPENAI_API_KEY")
-    client = get_client(key)
-    if client is not None:
-        try:
-            if hasattr(client, "embeddings"):
-                resp = client.embeddings.create(
-                    model=MODELS['embedding'],
-                    input=[current_goal, proposed_goal],
-                )
-                vec1 = resp.data[0].embedding
-                vec2 = resp.data[1].embedding
-            else:
-                resp = client.Embedding.create(
-                    model=MODELS['embedding'],
-                    input=[current_goal, proposed_goal],
-                )
-                vec1 = resp["data"][0]["embedding"]
-                vec2 = resp["data"][1]["embedding"]
-            from numpy import dot
-            from numpy.linalg import norm
-
-            sim = dot(vec1, vec2) / (norm(vec1) * norm(vec2))
-            return sim < 0.8
-        except Exception as exc:  # pragma: no cover - network errors
-            logger.error("embedding similarity failed: %s", exc)
+    sim = _embedding_similarity(current_goal, proposed_goal, api_key)
+    if sim is not None:
+        return sim < 0.8
 
     ratio = SequenceMatcher(None, current_goal.lower(), proposed_goal.lower()).ratio()
     return ratio < 0.6
@@ -141,27 +160,149 @@ def _extract_explicit_goal(text: str) -> Optional[str]:
     return None
 
 
-def update_goal(
+def is_new_topic(user_input: str, current_goal: str) -> bool:
+    """Return True if ``user_input`` appears unrelated to ``current_goal``."""
+    if not user_input or not current_goal:
+        return False
+    prefix = user_input.lower().strip()[:25]
+    return prefix not in current_goal.lower()
+
+
+def _content_words(text: str) -> set:
+    return {w for w in re.findall(r"\w+", text.lower()) if len(w) > 3 and w not in _STOPWORDS}
+
+
+def _lexical_similarity(user_input: str, goal: str) -> float:
+    """Share of the goal's content words that reappear in ``user_input``."""
+    goal_words = _content_words(goal)
+    if not goal_words:
+        return 0.0
+    return len(goal_words & _content_words(user_input)) / len(goal_words)
+
+
+class GoalDecision(NamedTuple):
+    """Outcome of :func:`decide_goal`."""
+
+    goal: str
+    changed: bool
+    # 'explicit', 'lexical', 'embedding', 'llm' or 'fallback' (no client)
+    tier: str
+
+
+# how many decisions each tier settled
+TIER_STATS: Counter = Counter()
+
+
+def tier_report() -> Dict[str, float]:
+    """Return the share of decisions settled by each tier."""
+    total = sum(TIER_STATS.values())
+    return {tier: count / total for tier, count in TIER_STATS.items()} if total else {}
+
+
+def _decided(goal: str, last_goal: str, tier: str) -> GoalDecision:
+    TIER_STATS[tier] += 1
+    changed = bool(goal.strip()) and goal.strip().lower() != last_goal.strip().lower()
+    logger.debug("goal decision by %s tier: %r (changed=%s)", tier, goal, changed)
+    return GoalDecision(goal if changed else last_goal, changed, tier)
+
+
+def _goal_phrase(user_input: str) -> str:
+    """Return ``user_input`` shortened to a goal phrase."""
+    words = user_input.split()[:GOAL_DECISION['max_goal_words']]
+    return " ".join(words).rstrip(".,;:!?")
+
+
+def decide_goal(
     user_input: str,
     last_goal: str,
-    last_reflection: str,
-    triplets: List[Tuple[str, str, str]],
-) -> str:
-    """Return a new goal if the focus changed, otherwise ``last_goal``."""
+    last_reflection: str = "",
+    triplets: List[Tuple[str, str, str]] | None = None,
+    new_topic_fallback: bool = False,
+) -> GoalDecision:
+    """Decide whether ``user_input`` moves the focus away from ``last_goal``.
 
+    Cheap tiers run first and stop as soon as the case is clear: an explicit
+    instruction, lexical overlap with the goal, then the embedding
+    similarity of input and goal. Only inputs the embedding cannot place are
+    sent to the LLM.
+
+    Without an LLM client the goal is kept, unless ``new_topic_fallback``
+    is set: then a new topic (or the first input) becomes the goal as
+    phrased by the user, as the cycle did before the tiers existed.
+    """
     explicit = _extract_explicit_goal(user_input)
-    if explicit and check_goal_shift(last_goal, explicit):
-        return explicit
+    if explicit:
+        if _lexical_similarity(explicit, last_goal) >= GOAL_DECISION['lexical_keep']:
+            return _decided(last_goal, last_goal, "explicit")
+        return _decided(explicit, last_goal, "explicit")
+
+    if not user_input.strip():
+        return _decided(last_goal, last_goal, "lexical")
+    if last_goal.strip():
+        if (
+            not is_new_topic(user_input, last_goal)
+            or _lexical_similarity(user_input, last_goal) >= GOAL_DECISION['lexical_keep']
+        ):
+            return _decided(last_goal, last_goal, "lexical")
+
+        sim = _embedding_similarity(user_input, last_goal)
+        if sim is not None:
+            if sim >= GOAL_DECISION['embedding_keep']:
+                return _decided(last_goal, last_goal, "embedding")
+            if sim <= GOAL_DECISION['embedding_shift']:
+                return _decided(_goal_phrase(user_input), last_goal, "embedding")
 
     proposed = propose_goal(user_input)
     if proposed and check_goal_shift(last_goal, proposed):
-        return proposed
-
+        return _decided(proposed, last_goal, "llm")
     client = get_client(os.getenv("OPENAI_API_KEY"))
     if client is None:
-        logger.error("No OpenAI client available")
-        return last_goal
+        logger.info("No OpenAI client available, goal decided without LLM")
+        if new_topic_fallback and (not last_goal.strip() or is_new_topic(user_input, last_goal)):
+            return _decided(_goal_phrase(user_input), last_goal, "fallback")
+        return _decided(last_goal, last_goal, "fallback")
+    goal = _llm_goal(client, user_input, last_goal, last_reflection, triplets or [])
+    return _decided(goal, last_goal, "llm")
+
+
+class GoalDecisionContext:
+    """Goal decision of one cycle, made once and shared by all stages.
+
+    ``run_metabo_cycle`` creates one per user input and hands it to the
+    reflection and to :func:`update_goal`, which reuse the decision instead
+    of asking the LLM again.
+    """
+
+    def __init__(self, user_input: str) -> None:
+        self.user_input = user_input
+        self.decision: GoalDecision | None = None
+
+    @property
+    def decided(self) -> bool:
+        return self.decision is not None
+
+    def decide(
+        self,
+        last_goal: str,
+        last_reflection: str = "",
+        triplets: List[Tuple[str, str, str]] | None = None,
+    ) -> GoalDecision:
+        """Return the cycle's decision, computing it on first use."""
+        if self.decision is None:
+            self.decision = decide_goal(
+                self.user_input, last_goal, last_reflection, triplets, new_topic_fallback=True
+            )
+        return self.decision
 
+
+def _llm_goal(
+    client,
+    user_input: str,
+    last_goal: str,
+    last_reflection: str,
+    triplets: List[Tuple[str, str, str]],
+) -> str:
+    """Let the LLM name the next goal; ``last_goal`` if it keeps the focus."""
     facts = "; ".join([f"{s} {p} {o}" for s, p, o in triplets])
 
     user_content = f"Eingabe: {user_input}\nAktuelles Ziel: {last_goal}"
@@ -176,6 +317,7 @@ def update_goal(
     ]
 
     try:
+        record_llm_call("chat")
         if hasattr(client, "chat"):
             response = client.chat.completions.create(
                 model=MODELS['chat'],
@@ -199,3 +341,19 @@ def update_goal(
         return last_goal
     return new_goal
 
+
+def update_goal(
+    user_input: str,
+    last_goal: str,
+    last_reflection: str,
+    triplets: List[Tuple[str, str, str]],
+    context: GoalDecisionContext | None = None,
+) -> str:
+    """Return a new goal if the focus changed, otherwise ``last_goal``.
+
+    If ``context`` already holds this cycle's decision, ``last_goal`` is the
+    result of it and is returned unchanged.
+    """
+    if context is not None and context.decided:
+        return last_goal
+    return decide_goal(user_input, last_goal, last_reflection, triplets).goal
@@ -0,0 +1,229 @@
+"""Several active goals pursued side by side.
+
+Each goal in ``MULTI_GOAL['path']`` (``memory/goals.json``) has a priority,
+its own subgoal plan and the entropy reductions of its last cycles. A round
+of :class:`MultiGoalScheduler` picks the goals with the best score – the
+priority times ``exp`` of the mean recent entropy reduction plus a bonus for
+every round a goal has waited; new goals first – and runs one goal cycle for
+each. The LLM stages (planning, reflection, triple extraction) of the picked goals run
+concurrently, the graph updates one after another, so throughput grows with
+``MULTI_GOAL['concurrency']``.
+"""
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from cfg.config import MULTI_GOAL
+from goals.plan_cache import PlanCache
+from goals.subgoal_planner import decompose_goal
+from parsing.rule_extractor import try_local_extraction
+from parsing.triplet_parser_llm import extract_triplets_via_llm
+from reflection.reflection_engine import run_llm_task
+from utils.llm_client import track_llm_calls
+
+logger = logging.getLogger(__name__)
+
+Triple = Tuple[str, str, str]
+
+
+class GoalSlot:
+    """One active goal with its plan, priority and entropy history."""
+
+    def __init__(
+        self,
+        goal: str,
+        priority: float = 1.0,
+        subgoals: Optional[List[str]] = None,
+        reductions: Optional[List[float]] = None,
+        last_round: int = 0,
+    ) -> None:
+        self.goal = goal
+        self.priority = priority
+        self.subgoals = subgoals or []
+        self.reductions = reductions or []
+        self.last_round = last_round
+
+    @property
+    def recent_reduction(self) -> float:
+        """Mean entropy reduction of the remembered cycles (0 if none)."""
+        if not self.reductions:
+            return 0.0
+        return sum(self.reductions) / len(self.reductions)
+
+    def score(self, current_round: int) -> float:
+        # exp keeps the priority factor positive: new triples usually raise
+        # the entropy, and a negative reduction must not invert priorities
+        waited = current_round - self.last_round
+        return self.priority * math.exp(self.recent_reduction) + MULTI_GOAL['aging'] * waited
+
+    def record(self, reduction: float, current_round: int) -> None:
+        self.reductions = (self.reductions + [reduction])[-MULTI_GOAL['history']:]
+        self.last_round = current_round
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "goal": self.goal,
+            "priority": self.priority,
+            "subgoals": self.subgoals,
+            "reductions": self.reductions,
+            "last_round": self.last_round,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "GoalSlot":
+        return cls(
+            str(data["goal"]),
+            float(data.get("priority", 1.0)),
+            list(data.get("subgoals", [])),
+            [float(r) for r in data.get("reductions", [])],
+            int(data.get("last_round", 0)),
+        )
+
+
+class MultiGoalStore:
+    """JSON file with the active goals and the round counter."""
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = Path(path or MULTI_GOAL['path'])
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {}
+        self.round: int = data.get("round", 0)
+        self.slots: Dict[str, GoalSlot] = {
+            d["goal"]: GoalSlot.from_dict(d) for d in data.get("goals", [])
+        }
+
+    def save(self) -> None:
+        """Write the goals atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        data = {"round": self.round, "goals": [s.to_dict() for s in self.slots.values()]}
+        tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp.replace(self.path)
+
+    def add(self, goal: str, priority: float = 1.0) -> GoalSlot:
+        """Add ``goal`` (or update its priority) and save."""
+        goal = goal.strip()
+        slot = self.slots.get(goal)
+        if slot is None:
+            # a new goal waits as long as the longest-waiting one
+            last = min((s.last_round for s in self.slots.values()), default=self.round)
+            slot = self.slots[goal] = GoalSlot(goal, priority, last_round=last)
+        else:
+            slot.priority = priority
+        self.save()
+        return slot
+
+    def remove(self, goal: str) -> bool:
+        """Drop ``goal``; returns ``False`` if it was not active."""
+        if self.slots.pop(goal.strip(), None) is None:
+            return False
+        self.save()
+        return True
+
+    def ranked(self) -> List[GoalSlot]:
+        """Return the goals by descending score for the next round.
+
+        Goals without a finished cycle come first (by priority), so every
+        goal gets measured before the entropy reductions take over.
+        """
+        upcoming = self.round + 1
+        return sorted(
+            self.slots.values(),
+            key=lambda s: (bool(s.reductions), -(s.score(upcoming) if s.reductions else s.priority)),
+        )
+
+
+class MultiGoalScheduler:
+    """Interleave cycles of several goals.
+
+    ``memory`` is the :class:`~memory.memory_manager.MemoryManager` whose
+    graph all goals share.
+    """
+
+    def __init__(
+        self,
+        store: MultiGoalStore,
+        memory,
+        concurrency: int | None = None,
+        planner: Callable[[str, str], List[str]] = decompose_goal,
+        api_key: str | None = None,
+    ) -> None:
+        self.store = store
+        self.memory = memory
+        self.concurrency = concurrency or MULTI_GOAL['concurrency']
+        self.planner = planner
+        self.api_key = api_key
+        self._graph_lock = threading.Lock()
+
+    def _think(self, slot: GoalSlot, last_reflection: str) -> Tuple[List[str], str, List[Triple]]:
+        """LLM stage of a goal cycle: plan, reflect, extract."""
+        cache = PlanCache(self.memory.graph, lock=self._graph_lock)
+        subgoals = cache.get_or_plan(slot.goal, last_reflection, self.planner)
+        focus = subgoals[0] if subgoals else slot.goal
+        prompt = (
+            f"Ziel: {slot.goal}\nNächstes Teilziel: {focus}\n"
+            "Reflektiere in wenigen kurzen Aussagesätzen, was dafür bekannt ist."
+        )
+        reflection = run_llm_task(prompt, api_key=self.api_key)
+        triplets = try_local_extraction(reflection) if reflection else []
+        if triplets is None:
+            triplets = extract_triplets_via_llm(reflection)
+        return subgoals, reflection, triplets
+
+    def _goal_cycle(self, slot: GoalSlot, last_reflection: str) -> Dict[str, object]:
+        try:
+            subgoals, reflection, triplets = self._think(slot, last_reflection)
+        except Exception as exc:
+            logger.warning("goal cycle for %r failed: %s", slot.goal, exc)
+            subgoals, reflection, triplets = slot.subgoals, "", []
+        # graph stage: one goal at a time, so each sees its own entropy change
+        with self._graph_lock:
+            before, after = self.memory.store_triplets(triplets, slot.goal)
+        return {
+            "goal": slot.goal,
+            "subgoals": subgoals,
+            "reflection": reflection,
+            "triplets": triplets,
+            "entropy_before": before,
+            "entropy_after": after,
+            "reduction": before - after,
+        }
+
+    def run_round(self, count: int | None = None) -> Dict[str, object]:
+        """Run one cycle for each of the ``count`` best goals.
+
+        Returns the per-goal results in the order they were picked and the
+        number of LLM requests of the round.
+        """
+        picked = self.store.ranked()[: count or self.concurrency]
+        if not picked:
+            return {"round": self.store.round, "cycles": [], "llm_calls": 0}
+        self.store.round += 1
+        # the round's triples get a cycle number of their own
+        self.memory.graph.begin_cycle()
+        last_reflection = self.memory.load_reflection()
+        with track_llm_calls() as calls:
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(picked))) as pool:
+                futures = [
+                    pool.submit(contextvars.copy_context().run, self._goal_cycle, slot, last_reflection)
+                    for slot in picked
+                ]
+                cycles = [f.result() for f in futures]
+        for slot, cycle in zip(picked, cycles):
+            slot.subgoals = cycle["subgoals"]
+            slot.record(cycle["reduction"], self.store.round)
+        self.store.save()
+        logger.info(
+            "[MultiGoal] Runde %d: %s", self.store.round,
+            ", ".join(f"{c['goal']} ({c['reduction']:+.3f})" for c in cycles),
+        )
+        return {"round": self.store.round, "cycles": cycles, "llm_calls": calls.total}
@@ -0,0 +1,139 @@
+"""Persistent cache of subgoal plans stored in the goal graph.
+
+A plan is a node ``plan:<normalized goal>`` hanging off its goal in
+:attr:`memory.intention_graph.IntentionGraph.goal_graph`, so it is saved
+with the goal graph and survives restarts. Besides the subgoals the node
+stores a fingerprint of the context (the last reflection) the plan was
+made for. A cached plan is reused for the same goal until the reflection
+diverges from that context, measured as the Jaccard similarity of their
+content words.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+from collections import Counter
+from contextlib import nullcontext
+from typing import Callable, List, Optional
+
+from cfg.config import PLANNING
+
+logger = logging.getLogger(__name__)
+
+PLAN_PREFIX = "plan:"
+
+# cache hits and misses since start
+PLAN_STATS: Counter = Counter()
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize_goal(goal: str) -> str:
+    """Return the cache key part of ``goal``: casefolded, single-spaced."""
+    return " ".join(goal.split()).casefold()
+
+
+def plan_node(goal: str) -> str:
+    """Return the goal-graph node holding the plan for ``goal``."""
+    return PLAN_PREFIX + normalize_goal(goal)
+
+
+def context_tokens(context: str) -> List[str]:
+    """Return the sorted content words of ``context``."""
+    return sorted({w for w in _WORD_RE.findall(context.casefold()) if len(w) > 3})
+
+
+def _fingerprint(tokens: List[str]) -> str:
+    return hashlib.blake2b(" ".join(tokens).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _jaccard(a: set, b: set) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class PlanCache:
+    """Look up and store subgoal plans in ``graph.goal_graph``.
+
+    Callers planning concurrently pass a shared ``lock``; it guards the
+    graph access in :meth:`get_or_plan` but not the planner call.
+    """
+
+    def __init__(self, graph, min_similarity: float | None = None, lock=None) -> None:
+        self.graph = graph
+        self.lock = lock if lock is not None else nullcontext()
+        self.min_similarity = (
+            PLANNING['cache_similarity'] if min_similarity is None else min_similarity
+        )
+
+    def lookup(self, goal: str, context: str = "") -> Optional[List[str]]:
+        """Return the cached plan for ``goal`` if ``context`` still matches."""
+        goals = self.graph.goal_graph
+        node = plan_node(goal)
+        if node not in goals:
+            return None
+        data = goals.nodes[node]
+        tokens = context_tokens(context)
+        if data.get("fingerprint") != _fingerprint(tokens):
+            cached = set(data.get("context", "").split())
+            similarity = _jaccard(cached, set(tokens))
+            if similarity < self.min_similarity:
+                logger.info(
+                    "[PlanCache] Kontext weicht ab (%.2f), neuer Plan für %r", similarity, goal
+                )
+                return None
+        try:
+            return json.loads(data["subgoals"])
+        except (KeyError, ValueError):
+            return None
+
+    def store(self, goal: str, context: str, subgoals: List[str]) -> None:
+        """Save ``subgoals`` as the plan for ``goal`` made in ``context``."""
+        goals = self.graph.goal_graph
+        tokens = context_tokens(context)
+        node = plan_node(goal)
+        if goal not in goals:
+            goals.add_node(goal)
+        goals.add_node(
+            node,
+            kind="plan",
+            goal=goal,
+            subgoals=json.dumps(subgoals, ensure_ascii=False),
+            context=" ".join(tokens),
+            fingerprint=_fingerprint(tokens),
+        )
+        goals.add_edge(goal, node, kind="plan")
+        self.graph._save_goal_graph()
+
+    def invalidate(self, goal: str) -> None:
+        """Drop the cached plan of ``goal``."""
+        node = plan_node(goal)
+        if node in self.graph.goal_graph:
+            self.graph.goal_graph.remove_node(node)
+            self.graph._save_goal_graph()
+
+    def get_or_plan(
+        self,
+        goal: str,
+        context: str,
+        planner: Callable[[str, str], List[str]],
+    ) -> List[str]:
+        """Return the cached plan or call ``planner(goal, context)`` and cache it.
+
+        The planner's ``[goal]`` fallback is not cached so a failed planning
+        round is retried next time.
+        """
+        with self.lock:
+            cached = self.lookup(goal, context)
+        if cached:
+            PLAN_STATS["hit"] += 1
+            return cached
+        PLAN_STATS["miss"] += 1
+        subgoals = planner(goal, context)
+        if subgoals and subgoals != [goal.strip()]:
+            with self.lock:
+                self.store(goal, context, subgoals)
+        return subgoals
@@ -0,0 +1,123 @@
+"""Explore all planned subgoals in parallel.
+
+Instead of activating only the first subgoal, every subgoal gets a mini
+cycle – a short reflection and the extraction of its triples – on a worker
+thread. The mini cycles only read the graph; their triples are merged into
+it afterwards in a single batch, and the subgoals are ranked by the degree
+entropy change their own triples would cause on the graph as it was before
+the merge (strongest reduction first). Callers measuring their own entropy
+change around the exploration can defer the merge with ``merge=False`` and
+call :func:`merge_explorations` later.
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+from cfg.config import PLANNING
+from parsing.rule_extractor import try_local_extraction
+from parsing.triplet_extractor import dedupe_triplets
+from parsing.triplet_parser_llm import extract_triplets_via_llm
+from reasoning.entropy_analyzer import degree_entropy_deltas
+from reflection.reflection_engine import run_llm_task
+
+logger = logging.getLogger(__name__)
+
+Triple = Tuple[str, str, str]
+
+# serializes the merges of concurrent explorations into a shared graph
+_MERGE_LOCK = threading.Lock()
+
+
+class Exploration(NamedTuple):
+    """Outcome of the mini cycle of one subgoal."""
+
+    subgoal: str
+    reflection: str
+    triplets: List[Triple]
+    delta: float
+
+
+def _explore(goal: str, subgoal: str, last_reflection: str, api_key: str | None) -> Tuple[str, List[Triple]]:
+    prompt = f"Übergeordnetes Ziel: {goal}\nTeilziel: {subgoal}\n"
+    if last_reflection.strip():
+        prompt += f"Letzte Reflexion: {last_reflection.strip()[:300]}\n"
+    prompt += "Reflektiere in wenigen kurzen Aussagesätzen, was zu diesem Teilziel bekannt ist."
+    reflection = run_llm_task(prompt, api_key=api_key)
+    if not reflection:
+        return "", []
+    triplets = try_local_extraction(reflection)
+    if triplets is None:
+        triplets = extract_triplets_via_llm(reflection)
+    return reflection, triplets
+
+
+def _increments(triplets: Sequence[Triple]) -> Dict[str, int]:
+    increments: Dict[str, int] = {}
+    for subj, _, obj in triplets:
+        increments[subj] = increments.get(subj, 0) + 1
+        increments[obj] = increments.get(obj, 0) + 1
+    return increments
+
+
+def _merge(memory, explorations: Sequence[Exploration]) -> List[Triple]:
+    merged = dedupe_triplets([t for e in explorations for t in e.triplets])
+    if merged:
+        memory.graph.add_triplets(merged)
+    return merged
+
+
+def merge_explorations(memory, explorations: Sequence[Exploration]) -> List[Triple]:
+    """Add the triples of ``explorations`` to ``memory.graph`` in one batch."""
+    with _MERGE_LOCK:
+        return _merge(memory, explorations)
+
+
+def explore_subgoals(
+    goal: str,
+    subgoals: Sequence[str],
+    memory,
+    last_reflection: str = "",
+    workers: int | None = None,
+    api_key: str | None = None,
+    merge: bool = True,
+) -> List[Exploration]:
+    """Run a mini cycle per subgoal concurrently and merge their triples.
+
+    ``memory.graph`` is the :class:`~memory.intention_graph.IntentionGraph`
+    receiving the merged triples; with ``merge=False`` the graph is left
+    untouched. Failed mini cycles count as empty. Returns the explorations
+    sorted by ``delta``, ascending; subgoals with equal deltas keep their
+    order.
+    """
+    subgoals = [s.strip() for s in subgoals if s.strip()]
+    if not subgoals:
+        return []
+    workers = workers or PLANNING['explore_workers']
+    with ThreadPoolExecutor(max_workers=min(workers, len(subgoals))) as pool:
+        futures = [
+            pool.submit(contextvars.copy_context().run, _explore, goal, sg, last_reflection, api_key)
+            for sg in subgoals
+        ]
+        outcomes = []
+        for subgoal, future in zip(subgoals, futures):
+            try:
+                outcomes.append(future.result())
+            except Exception as exc:
+                logger.warning("exploring subgoal %r failed: %s", subgoal, exc)
+                outcomes.append(("", []))
+
+    with _MERGE_LOCK:
+        deltas = degree_entropy_deltas(memory.graph.graph, [_increments(t) for _, t in outcomes])
+        explorations = [
+            Exploration(sg, reflection, triplets, float(delta))
+            for sg, (reflection, triplets), delta in zip(subgoals, outcomes, deltas)
+        ]
+        merged = _merge(memory, explorations) if merge else []
+    logger.info(
+        "[Exploration] %d Teilziele, %d neue Tripel", len(explorations), len(merged)
+    )
+    return sorted(explorations, key=lambda e: e.delta)
@@ -5,8 +5,8 @@ from typing import List
 import logging
 import os
 
-from utils.json_utils import parse_json_safe
-from utils.llm_client import get_client
+from utils.llm_client import get_client, record_llm_call
+from utils.structured_output import SUBGOALS_FUNCTION, extract_structured
 from cfg.config import PROMPTS, MODELS, TEMPERATURES
 
 logger = logging.getLogger(__name__)
@@ -14,6 +14,14 @@ logger = logging.getLogger(__name__)
 _SYSTEM_PROMPT = PROMPTS['subgoal_planner_system']
 
 
+def _parse_lines(text: str) -> List[str] | None:
+    """Read a plain bullet list of two to five subgoals."""
+    lines = [line.strip("-•* \t") for line in text.splitlines() if line.strip()]
+    if 2 <= len(lines) <= 5:
+        return lines
+    return None
+
+
 def decompose_goal(
     goal: str,
     context: str = "",
@@ -36,32 +44,32 @@ def decompose_goal(
     ]
 
     try:
+        record_llm_call("chat")
         if hasattr(client, "chat"):
             response = client.chat.completions.create(
                 model=model,
                 temperature=temperature,
                 messages=messages,
+                functions=[SUBGOALS_FUNCTION],
+                function_call={"name": SUBGOALS_FUNCTION["name"]},
             )
-            text = response.choices[0].message.content
         else:
             response = client.ChatCompletion.create(
                 model=model,
                 temperature=temperature,
                 messages=messages,
+                functions=[SUBGOALS_FUNCTION],
+                function_call={"name": SUBGOALS_FUNCTION["name"]},
             )
-            text = response["choices"][0]["message"]["content"]
     except Exception as exc:
         logger.error("LLM request failed: %s", exc)
-        text = ""
+        response = None
 
     subgoals: List[str] = []
-    data = parse_json_safe(text)
-    if isinstance(data, list) and all(isinstance(s, str) for s in data):
-        subgoals = [s.strip() for s in data if s.strip()]
-    else:
-        lines = [line.strip("-•* \t") for line in text.splitlines() if line.strip()]
-        if 2 <= len(lines) <= 5:
-            subgoals = lines
+    if response is not None:
+        data = extract_structured(response, SUBGOALS_FUNCTION, fallback=_parse_lines)
+        if data is not None:
+            subgoals = [s.strip() for s in data["subgoals"] if isinstance(s, str) and s.strip()]
 
     if not subgoals:
         logger.info("No subgoals parsed, returning goal as single item")
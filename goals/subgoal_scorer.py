@@ -1,7 +1,17 @@
-"""Score subgoals by estimated feasibility."""
+"""Score and rank subgoals."""
 from __future__ import annotations
 
-from typing import Dict, List
+import re
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import networkx as nx
+import numpy as np
+
+from cfg.config import SUBGOAL_SCORING
+from reasoning.entropy_analyzer import degree_entropy_deltas
+from utils.text_vectors import embed_texts, hash_vectors
+
+_WORD_RE = re.compile(r"\w+")
 
 
 def score_subgoals(subgoals: List[str]) -> Dict[str, float]:
@@ -19,3 +29,96 @@ def score_subgoals(subgoals: List[str]) -> Dict[str, float]:
             score = 0.5
         scores[sg] = round(min(max(score, 0.0), 1.0), 2)
     return scores
+
+
+class SubgoalScore(NamedTuple):
+    """One entry of :func:`rank_subgoals`."""
+
+    subgoal: str
+    score: float
+    relevance: float
+    overlap: float
+    novelty: float
+
+
+def _content_words(text: str) -> List[str]:
+    return list(dict.fromkeys(w for w in _WORD_RE.findall(text) if len(w) > 3))
+
+
+def _graph_node(graph: nx.Graph, word: str) -> Optional[str]:
+    for cand in (word, word.lower(), word.capitalize()):
+        if cand in graph:
+            return cand
+    return None
+
+
+def _vectors(texts: Sequence[str], use_embeddings: bool, api_key: str | None) -> np.ndarray:
+    if use_embeddings:
+        vectors = embed_texts(texts, api_key)
+        if vectors is not None:
+            return vectors
+    return hash_vectors(texts)
+
+
+def rank_subgoals(
+    goal: str,
+    subgoals: Sequence[str],
+    graph: nx.Graph | None = None,
+    api_key: str | None = None,
+    use_embeddings: bool | None = None,
+) -> List[SubgoalScore]:
+    """Rank ``subgoals`` by their value for ``goal``, best first.
+
+    All candidates are scored together:
+
+    - *relevance*: cosine similarity to the goal. Goal and subgoals are
+      vectorized as one batch, with local trigram vectors or, if
+      ``use_embeddings``, a single embedding request.
+    - *overlap*: share of the subgoal's content words that are nodes of
+      ``graph``, i.e. how well the subgoal is grounded in what is known.
+    - *novelty*: the degree entropy change expected if the subgoal's words
+      entered the graph (new words as degree-1 nodes, known words with one
+      more edge), rescaled to 0..1 across the candidates.
+
+    The score is the weighted sum from ``SUBGOAL_SCORING``.
+    """
+    subgoals = [s.strip() for s in subgoals if s.strip()]
+    if not subgoals:
+        return []
+    if use_embeddings is None:
+        use_embeddings = SUBGOAL_SCORING['embeddings']
+    graph = graph if graph is not None else nx.Graph()
+
+    vectors = _vectors([goal, *subgoals], use_embeddings, api_key)
+    relevance = np.clip(vectors[1:] @ vectors[0], 0.0, 1.0)
+
+    words = [_content_words(s) for s in subgoals]
+    vocab = list(dict.fromkeys(w for ws in words for w in ws))
+    column = {w: i for i, w in enumerate(vocab)}
+    contains = np.zeros((len(subgoals), len(vocab)))
+    for row, ws in enumerate(words):
+        contains[row, [column[w] for w in ws]] = 1.0
+    nodes = [_graph_node(graph, w) for w in vocab]
+    known = np.array([n is not None for n in nodes], dtype=float)
+    n_words = contains.sum(axis=1)
+    overlap = np.divide(contains @ known, n_words, out=np.zeros(len(subgoals)), where=n_words > 0)
+
+    # new words enter as degree-1 nodes, known nodes gain one edge
+    delta = degree_entropy_deltas(
+        graph,
+        [{nodes[column[w]] or w: 1 for w in ws} for ws in words],
+    )
+    spread = np.ptp(delta)
+    novelty = (delta - delta.min()) / spread if spread > 1e-12 else np.full(len(subgoals), 0.5)
+
+    score = (
+        SUBGOAL_SCORING['relevance'] * relevance
+        + SUBGOAL_SCORING['overlap'] * overlap
+        + SUBGOAL_SCORING['novelty'] * novelty
+    )
+    ranked = [
+        SubgoalScore(s, round(float(sc), 4), float(r), float(o), float(n))
+        for s, sc, r, o, n in zip(subgoals, score, relevance, overlap, novelty)
+    ]
+    # stable: ties keep the planner's order
+    return sorted(ranked, key=lambda item: -item.score)
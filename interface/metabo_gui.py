@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import json
+import threading
 from pathlib import Path
 import tkinter as tk
 from tkinter import ttk
@@ -9,6 +10,7 @@ from tkinter.scrolledtext import ScrolledText
 
 from control.metabo_cycle import run_metabo_cycle
 from control.takt_engine import run_metabotakt
+from control.takt_scheduler import TaktScheduler
 from goals.goal_manager import get_active_goal, set_goal
 from memory.memory_manager import get_memory_manager
 import utils.llm_client as llm_client
@@ -20,6 +22,9 @@ class MetaboGUI:
     def __init__(self) -> None:
         llm_client.init_client()
         self.memory = get_memory_manager()
+        self.scheduler = TaktScheduler(
+            on_result=lambda result: self.root.after(0, self._show_takt_result, result)
+        )
 
         self.root = tk.Tk()
         self.root.title("MetaboMind GUI")
@@ -139,6 +144,14 @@ class MetaboGUI:
         run_btn = tk.Button(frame, text="Takt ausführen", command=self._run_takt)
         run_btn.pack(pady=5)
 
+        self.auto_takt_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            frame,
+            text="Automatischer Takt",
+            variable=self.auto_takt_var,
+            command=self._toggle_auto_takt,
+        ).pack(anchor=tk.W)
+
         self.takt_goal_var = tk.StringVar(value="-")
         self.takt_emotion_var = tk.StringVar(value="-")
         self.takt_delta_var = tk.StringVar(value="0")
@@ -169,7 +182,27 @@ class MetaboGUI:
         self.entry.delete(0, tk.END)
 
         self._append_chat(f"Du: {user_input}\n", "user")
-        result = run_metabo_cycle(user_input)
+        self._run_in_background(lambda: run_metabo_cycle(user_input), self._show_cycle_result)
+
+    def _run_in_background(self, work, on_result) -> None:
+        """Run ``work`` in a worker thread and hand its result to the Tk thread.
+
+        The worker waits for a running background takt (the scheduler's user
+        cycle lock), so the window stays responsive meanwhile.
+        """
+
+        def worker() -> None:
+            try:
+                with self.scheduler.user_cycle():
+                    result = work()
+            except Exception as exc:  # pragma: no cover - error handling
+                self.root.after(0, self._append_chat, f"[Fehler: {exc}]\n", "system")
+                return
+            self.root.after(0, on_result, result)
+
+        threading.Thread(target=worker, name="gui-cycle", daemon=True).start()
+
+    def _show_cycle_result(self, result) -> None:
         self._append_chat(f"System: {result['reflection']}\n", "system")
         self.chat.see(tk.END)
 
@@ -183,7 +216,17 @@ class MetaboGUI:
         self._load_log()
 
     def _run_takt(self) -> None:
-        result = run_metabotakt()
+        self._run_in_background(run_metabotakt, self._show_takt_result)
+
+    def _toggle_auto_takt(self) -> None:
+        if self.auto_takt_var.get():
+            self.scheduler.start()
+            self._append_chat("[Automatischer Takt aktiviert]\n", "system")
+        else:
+            self.scheduler.stop(timeout=0)
+            self._append_chat("[Automatischer Takt deaktiviert]\n", "system")
+
+    def _show_takt_result(self, result) -> None:
         self.goal_var.set(result["goal"])
         msg = result.get("goal_update", "")
         if msg:
@@ -273,7 +316,8 @@ class MetaboGUI:
             self._append_chat(f"[Fehler beim Speichern: {exc}]\n", "system")
 
     def _on_close(self) -> None:
-        """Save graph on window close."""
+        """Stop background takts and save graph on window close."""
+        self.scheduler.stop(timeout=5)
         self._save_graph()
         self.root.destroy()
 
@@ -0,0 +1,348 @@
+"""Columnar export and vectorized queries over the cycle history.
+
+The JSON Lines files written by :class:`logs.logger.MetaboLogger` and
+:meth:`memory.memory_manager.MemoryManager.save_emotion` are converted into
+compressed NumPy column files. Each export only parses the lines appended
+since the previous run and stores them as a new part file, so repeated exports
+stay cheap even for very long histories.
+
+Usage::
+
+    python -m logs.cycle_analytics export
+    python -m logs.cycle_analytics rolling --window 50
+    python -m logs.cycle_analytics emotions
+    python -m logs.cycle_analytics growth
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = (
+    "timestamp",
+    "entropy_before",
+    "entropy_after",
+    "delta",
+    "emotion",
+    "triplets",
+    "source",
+)
+
+EMOTION_CODES = {"neutral": 0, "positive": 1, "negative": 2}
+EMOTION_LABELS = {code: label for label, code in EMOTION_CODES.items()}
+UNKNOWN_EMOTION = -1
+
+# ``source`` column values
+SOURCE_CYCLE = 0
+SOURCE_EMOTION = 1
+SOURCES = {"cycle": SOURCE_CYCLE, "emotion": SOURCE_EMOTION}
+
+_STATE_FILE = "state.json"
+_SECONDS_PER_DAY = 86400
+# an emotion record this close to a cycle record belongs to the same cycle
+_DUPLICATE_SECONDS = 2
+
+
+def _empty_columns() -> Dict[str, np.ndarray]:
+    return {
+        "timestamp": np.empty(0, dtype=np.int64),
+        "entropy_before": np.empty(0, dtype=np.float64),
+        "entropy_after": np.empty(0, dtype=np.float64),
+        "delta": np.empty(0, dtype=np.float64),
+        "emotion": np.empty(0, dtype=np.int8),
+        "triplets": np.empty(0, dtype=np.int32),
+        "source": np.empty(0, dtype=np.int8),
+    }
+
+
+def _read_new_lines(path: Path, offset: int) -> tuple[List[bytes], int]:
+    """Return complete lines after ``offset`` and the new offset.
+
+    A trailing line without newline is left for the next export because the
+    writer may still be appending to it.
+    """
+    with path.open("rb") as fh:
+        fh.seek(offset)
+        data = fh.read()
+    end = data.rfind(b"\n")
+    if end < 0:
+        return [], offset
+    return data[: end + 1].splitlines(), offset + end + 1
+
+
+def _parse_records(lines: List[bytes], source: int) -> Dict[str, np.ndarray]:
+    """Convert JSON lines into column arrays."""
+    stamps: List[str] = []
+    before: List[float] = []
+    after: List[float] = []
+    delta: List[float] = []
+    emotion: List[int] = []
+    triplets: List[int] = []
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            rec = json.loads(line)
+        except json.JSONDecodeError:
+            logger.warning("skipping malformed log line: %r", line[:80])
+            continue
+        ent_b = float(rec.get("entropy_before", 0.0))
+        ent_a = float(rec.get("entropy_after", 0.0))
+        stamps.append(rec.get("timestamp", "NaT"))
+        before.append(ent_b)
+        after.append(ent_a)
+        delta.append(float(rec.get("delta", ent_a - ent_b)))
+        emotion.append(EMOTION_CODES.get(rec.get("emotion"), UNKNOWN_EMOTION))
+        triplets.append(len(rec.get("triplets") or []))
+
+    stamp_array = _parse_timestamps(stamps)
+    valid = ~np.isnat(stamp_array)
+    if not valid.all():
+        logger.warning("skipping %d log lines without valid timestamp", int((~valid).sum()))
+    n = int(valid.sum())
+    return {
+        "timestamp": stamp_array[valid].astype(np.int64),
+        "entropy_before": np.array(before, dtype=np.float64)[valid],
+        "entropy_after": np.array(after, dtype=np.float64)[valid],
+        "delta": np.array(delta, dtype=np.float64)[valid],
+        "emotion": np.array(emotion, dtype=np.int8)[valid],
+        "triplets": np.array(triplets, dtype=np.int32)[valid],
+        "source": np.full(n, source, dtype=np.int8),
+    }
+
+
+def _parse_timestamps(stamps: List[object]) -> np.ndarray:
+    """Convert ISO-8601 strings, unparsable ones becoming NaT."""
+    try:
+        # one vectorized conversion instead of a datetime per row
+        return np.array(stamps, dtype="datetime64[s]")
+    except (TypeError, ValueError):
+        pass
+    parsed = np.empty(len(stamps), dtype="datetime64[s]")
+    for i, stamp in enumerate(stamps):
+        try:
+            parsed[i] = np.datetime64(stamp, "s")
+        except (TypeError, ValueError):
+            parsed[i] = np.datetime64("NaT")
+    return parsed
+
+
+def _drop_duplicate_emotions(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Drop emotion rows that record a cycle already in the cycle log.
+
+    Cycles run through :class:`control.cycle_manager.CycleManager` with a
+    logger appear in both files; only cycles without a log line keep their
+    emotion row.
+    """
+    cycle_ts = np.sort(columns["timestamp"][columns["source"] == SOURCE_CYCLE])
+    if not len(cycle_ts):
+        return columns
+    ts = columns["timestamp"]
+    pos = np.clip(np.searchsorted(cycle_ts, ts), 1, len(cycle_ts)) - 1
+    nearest = np.minimum(
+        np.abs(ts - cycle_ts[pos]),
+        np.abs(ts - cycle_ts[np.minimum(pos + 1, len(cycle_ts) - 1)]),
+    )
+    keep = (columns["source"] == SOURCE_CYCLE) | (nearest > _DUPLICATE_SECONDS)
+    return {name: arr[keep] for name, arr in columns.items()}
+
+
+class CycleArchive:
+    """Directory of compressed column part files plus export offsets."""
+
+    def __init__(
+        self,
+        directory: str = "data/analytics",
+        cycle_log: str = "data/metabo_log.jsonl",
+        emotion_log: str = "data/emotions.jsonl",
+    ) -> None:
+        self.directory = Path(directory)
+        self.sources = {
+            SOURCE_CYCLE: Path(cycle_log),
+            SOURCE_EMOTION: Path(emotion_log),
+        }
+
+    # ------------------------------------------------------------------
+    # Export
+
+    def _load_state(self) -> dict:
+        try:
+            return json.loads((self.directory / _STATE_FILE).read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"offsets": {}, "parts": 0}
+
+    def _save_state(self, state: dict) -> None:
+        (self.directory / _STATE_FILE).write_text(json.dumps(state), encoding="utf-8")
+
+    def _parts(self) -> List[Path]:
+        return sorted(self.directory.glob("part-*.npz"))
+
+    def reset(self) -> None:
+        """Remove all exported parts and offsets."""
+        for part in self._parts():
+            part.unlink()
+        state_path = self.directory / _STATE_FILE
+        if state_path.exists():
+            state_path.unlink()
+
+    def export(self) -> int:
+        """Convert newly appended log lines and return the number of rows added."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        state = self._load_state()
+        offsets = state["offsets"]
+
+        # a shrunken source was rotated or rewritten: rebuild from scratch
+        for source, path in self.sources.items():
+            size = path.stat().st_size if path.exists() else 0
+            if size < offsets.get(str(source), 0):
+                logger.info("%s shrank, rebuilding analytics archive", path)
+                self.reset()
+                state = {"offsets": {}, "parts": 0}
+                offsets = state["offsets"]
+                break
+
+        chunks = []
+        for source, path in self.sources.items():
+            if not path.exists():
+                continue
+            lines, offsets[str(source)] = _read_new_lines(path, offsets.get(str(source), 0))
+            if lines:
+                chunks.append(_parse_records(lines, source))
+
+        added = sum(len(c["timestamp"]) for c in chunks)
+        if added:
+            columns = {
+                name: np.concatenate([c[name] for c in chunks]) for name in COLUMNS
+            }
+            state["parts"] += 1
+            part = self.directory / f"part-{state['parts']:06d}.npz"
+            np.savez_compressed(part, **columns)
+        self._save_state(state)
+        return added
+
+    # ------------------------------------------------------------------
+    # Loading
+
+    def load(self, source: str = "all") -> Dict[str, np.ndarray]:
+        """Return all exported columns ordered by timestamp.
+
+        With ``source="all"`` every cycle is counted once even if both logs
+        recorded it.
+        """
+        parts = []
+        for path in self._parts():
+            with np.load(path) as data:
+                parts.append({name: data[name] for name in COLUMNS})
+        if not parts:
+            return _empty_columns()
+        columns = {name: np.concatenate([p[name] for p in parts]) for name in COLUMNS}
+        if source == "all":
+            columns = _drop_duplicate_emotions(columns)
+        else:
+            mask = columns["source"] == SOURCES[source]
+            columns = {name: arr[mask] for name, arr in columns.items()}
+        order = np.argsort(columns["timestamp"], kind="stable")
+        return {name: arr[order] for name, arr in columns.items()}
+
+
+# ----------------------------------------------------------------------
+# Vectorized queries
+
+
+def rolling_delta_mean(columns: Dict[str, np.ndarray], window: int = 50) -> np.ndarray:
+    """Return the rolling mean of the entropy delta over ``window`` cycles."""
+    delta = columns["delta"]
+    if window <= 0:
+        raise ValueError("window must be positive")
+    if len(delta) < window:
+        return np.empty(0, dtype=np.float64)
+    csum = np.concatenate(([0.0], np.cumsum(delta)))
+    return (csum[window:] - csum[:-window]) / window
+
+
+def emotion_distribution_per_day(columns: Dict[str, np.ndarray]) -> Dict[str, Dict[str, int]]:
+    """Return emotion counts per UTC day."""
+    if not len(columns["timestamp"]):
+        return {}
+    days = columns["timestamp"] // _SECONDS_PER_DAY
+    codes = columns["emotion"].astype(np.int64) - UNKNOWN_EMOTION
+    width = len(EMOTION_CODES) + 1
+    keys, counts = np.unique(days * width + codes, return_counts=True)
+    key_days = keys // width
+    key_codes = keys % width + UNKNOWN_EMOTION
+
+    out: Dict[str, Dict[str, int]] = {}
+    dates = key_days.astype("datetime64[D]").astype(str)
+    for date, code, count in zip(dates, key_codes, counts):
+        label = EMOTION_LABELS.get(int(code), "unknown")
+        out.setdefault(str(date), {})[label] = int(count)
+    return out
+
+
+def entropy_growth_rate(columns: Dict[str, np.ndarray]) -> float:
+    """Return the least-squares slope of ``entropy_after`` in bits per day."""
+    ts = columns["timestamp"]
+    if len(ts) < 2 or ts[0] == ts[-1]:
+        return 0.0
+    days = (ts - ts[0]) / _SECONDS_PER_DAY
+    slope, _ = np.polyfit(days, columns["entropy_after"], 1)
+    return float(slope)
+
+
+# ----------------------------------------------------------------------
+# Command line interface
+
+
+def main(argv: List[str] | None = None) -> None:
+    """Entry point for ``python -m logs.cycle_analytics``."""
+    parser = argparse.ArgumentParser(description="MetaboMind Zyklus-Analysen")
+    parser.add_argument("--dir", default="data/analytics", help="Archivverzeichnis")
+    parser.add_argument("--cycle-log", default="data/metabo_log.jsonl")
+    parser.add_argument("--emotion-log", default="data/emotions.jsonl")
+    parser.add_argument(
+        "--source", choices=["all", *SOURCES], default="all", help="Datenquelle filtern"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("export", help="neue Logzeilen in das Archiv übernehmen")
+    rolling = sub.add_parser("rolling", help="gleitender Mittelwert von ΔE")
+    rolling.add_argument("--window", type=int, default=50)
+    rolling.add_argument("--tail", type=int, default=10)
+    sub.add_parser("emotions", help="Emotionsverteilung pro Tag")
+    sub.add_parser("growth", help="Entropie-Wachstumsrate (Bits/Tag)")
+    args = parser.parse_args(argv)
+
+    archive = CycleArchive(args.dir, args.cycle_log, args.emotion_log)
+    start = time.perf_counter()
+    if args.command == "export":
+        added = archive.export()
+        print(f"{added} neue Zeilen exportiert")
+    else:
+        columns = archive.load(args.source)
+        loaded = time.perf_counter()
+        if args.command == "rolling":
+            values = rolling_delta_mean(columns, args.window)
+            for value in values[-args.tail:]:
+                print(f"{value:+.4f}")
+        elif args.command == "emotions":
+            for day, counts in emotion_distribution_per_day(columns).items():
+                print(day, json.dumps(counts, ensure_ascii=False))
+        else:
+            print(f"{entropy_growth_rate(columns):+.6f} Bits/Tag")
+        print(
+            f"[{len(columns['timestamp'])} Zeilen, Laden {(loaded - start) * 1000:.1f} ms, "
+            f"Abfrage {(time.perf_counter() - loaded) * 1000:.1f} ms]"
+        )
+        return
+    print(f"[{(time.perf_counter() - start) * 1000:.1f} ms]")
+
+
+if __name__ == "__main__":
+    main()
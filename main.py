@@ -2,12 +2,17 @@
 from __future__ import annotations
 
 from control.metabo_cycle import run_metabo_cycle
-from control.takt_engine import run_metabotakt
+from control.takt_engine import run_metabotakt, run_metabotakt_batch
+from control.takt_scheduler import TaktScheduler
 from goals.goal_manager import set_goal
 from goals.goal_updater import update_goal
+from goals.multi_goal import MultiGoalScheduler, MultiGoalStore
+from goals.plan_cache import PLAN_STATS
 from interface.metabo_gui import MetaboGUI
 import utils.llm_client as llm_client
 from memory.memory_manager import get_memory_manager
+from parsing.rule_extractor import FAST_PATH
+from utils.structured_output import structured_output_stats
 
 
 def print_help() -> None:
@@ -15,17 +20,70 @@ def print_help() -> None:
     print("Verfügbare Befehle:")
     print("/quit  - Programm beenden")
     print("/ziel <Text> - neues Ziel setzen")
+    print("/takt  - einen Metabotakt ausführen")
+    print("/takt <n> - n Metabotakte, Reflexion nur bei deutlicher Entropieänderung")
+    print("/autotakt - automatischen Hintergrundtakt ein-/ausschalten")
+    print("/ziele - aktive Ziele anzeigen")
+    print("/ziele + <Text> - weiteres aktives Ziel hinzufügen")
+    print("/ziele - <Text> - aktives Ziel entfernen")
+    print("/runde - einen Zyklus für die besten aktiven Ziele ausführen")
+    print("/statistik - Trefferquoten von Plan-Cache, lokaler Extraktion und strukturierten Antworten")
     print("/hilfe - diese Hilfe anzeigen")
 
 
+def handle_goals_command(command: str) -> None:
+    """Handle ``/ziele`` and ``/runde`` for the concurrently active goals."""
+    store = MultiGoalStore()
+    if command == "/runde":
+        result = MultiGoalScheduler(store, get_memory_manager()).run_round()
+        if not result["cycles"]:
+            print("[Keine aktiven Ziele. Mit '/ziele + <Text>' hinzufügen.]")
+        for cycle in result["cycles"]:
+            print(f"{cycle['goal']}: ΔE {-cycle['reduction']:+.2f}, {len(cycle['triplets'])} Tripel")
+        print(f"[Runde {result['round']} abgeschlossen, {result['llm_calls']} LLM-Aufrufe]")
+        return
+    arg = command[len("/ziele"):].strip()
+    if arg.startswith("+") and arg[1:].strip():
+        store.add(arg[1:])
+        print(f"[Aktives Ziel hinzugefügt: {arg[1:].strip()}]")
+    elif arg.startswith("-") and arg[1:].strip():
+        if store.remove(arg[1:]):
+            print(f"[Aktives Ziel entfernt: {arg[1:].strip()}]")
+        else:
+            print("[Ziel nicht gefunden]")
+    else:
+        for slot in store.ranked():
+            print(f"- {slot.goal} (Priorität {slot.priority:g}, ΔE-Reduktion {slot.recent_reduction:+.2f})")
+
+
+def print_stats() -> None:
+    """Show the hit and failure counters collected since start."""
+    hits, misses = PLAN_STATS["hit"], PLAN_STATS["miss"]
+    print(f"Plan-Cache: {hits} Treffer, {misses} neue Pläne")
+    fast = FAST_PATH.report()
+    print(
+        f"Lokale Extraktion: {fast['skipped']}/{fast['attempts']} ohne LLM "
+        f"({fast['skip_rate']:.0%}), {fast['saved_seconds']:.1f} s gespart"
+    )
+    for name, entry in structured_output_stats().items():
+        print(
+            f"{name}: {entry['total']} Antworten, {entry['repaired']} repariert, "
+            f"Fehlerquote {entry['failure_rate']:.0%}"
+        )
+
+
 def main() -> None:
     """Interactive loop processing user input via ``run_metabo_cycle``."""
     print("[MetaboMind CLI]")
+    scheduler = TaktScheduler(
+        on_result=lambda r: print(f"\n[Hintergrundtakt] ΔE: {r['delta']:+.2f} -> {r['emotion']}")
+    )
     while True:
         try:
             user_input = input("> ").strip()
         except (EOFError, KeyboardInterrupt):
             print("\n[MetaboMind wird beendet.]")
+            scheduler.stop(timeout=5)
             break
 
         if not user_input:
@@ -33,18 +91,42 @@ def main() -> None:
 
         if user_input == "/quit":
             print("[MetaboMind wird beendet.]")
+            scheduler.stop(timeout=5)
             break
         if user_input == "/hilfe":
             print_help()
             continue
+        if user_input == "/statistik":
+            print_stats()
+            continue
+        if user_input == "/autotakt":
+            if scheduler.running:
+                scheduler.stop(timeout=0)
+                print("[Automatischer Takt deaktiviert]")
+            else:
+                scheduler.start()
+                print("[Automatischer Takt aktiviert]")
+            continue
+        if user_input.startswith("/takt ") and user_input[6:].strip().isdigit():
+            with scheduler.user_cycle():
+                batch = run_metabotakt_batch(int(user_input[6:]))
+            print(f"[{len(batch['takts'])} Metabotakte ausgeführt, {batch['reflections']} mit Reflexion]")
+            print(f"LLM-Aufrufe: {batch['llm_calls']}, eingespart: {batch['llm_calls_avoided']}")
+            print(f"Aktuelles Ziel: {batch['goal']}")
+            continue
         if user_input == "/takt":
-            result = run_metabotakt()
+            with scheduler.user_cycle():
+                result = run_metabotakt()
             print("[Metabotakt ausgeführt]")
             if result["goal_update"]:
                 print(result["goal_update"])
             print(f"ΔE: {result['delta']:+.2f} -> {result['emotion']} ({result['intensity']})")
             print(f"Reflexion: {result['reflection']}")
             continue
+        if user_input == "/runde" or user_input == "/ziele" or user_input.startswith("/ziele "):
+            with scheduler.user_cycle():
+                handle_goals_command(user_input)
+            continue
         if user_input.startswith("/ziel"):
             new_goal = user_input[len("/ziel"):].strip()
             if not new_goal:
@@ -54,12 +136,14 @@ def main() -> None:
                 print(f"[Neues Ziel gespeichert: {new_goal}]")
             continue
 
-        result = run_metabo_cycle(user_input)
+        with scheduler.user_cycle():
+            result = run_metabo_cycle(user_input)
         new_goal = update_goal(
             user_input=user_input,
             last_goal=result.get("goal", ""),
             last_reflection=result.get("reflection", ""),
             triplets=result.get("triplets", []),
+            context=result.get("goal_context"),
         )
         set_goal(new_goal)
         print("[Zyklus abgeschlossen]")
@@ -0,0 +1,186 @@
+"""Incremental topological order of the goal graph.
+
+Goals oscillate, so the goal graph is usually cyclic and a fresh
+``topological_sort`` on every request fails over to a DFS. :class:`GoalIndex`
+instead maintains the condensation of the graph – strongly connected
+components (SCCs) as single vertices – together with a topological order of
+the components that is repaired locally on every edge insertion following
+Pearce & Kelly (2006): only the components between the two endpoints in the
+current order are searched and reordered. An insertion that closes a cycle
+merges the components on it.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+Node = Hashable
+
+
+class GoalIndex:
+    """Dynamic SCC condensation with a maintained topological order."""
+
+    def __init__(self, edges: Iterable[Tuple[Node, Node]] = (), nodes: Iterable[Node] = ()) -> None:
+        self._comp: Dict[Node, int] = {}
+        self._members: Dict[int, List[Node]] = {}
+        self._succ: Dict[int, Counter] = {}
+        self._pred: Dict[int, Counter] = {}
+        self._ord: Dict[int, int] = {}
+        self._next_id = 0
+        self._next_ord = 0
+        self._version = 0
+        self._path: Tuple[int, List[Node]] = (-1, [])
+        self._reach: Dict[int, Tuple[int, Set[int]]] = {}
+        for node in nodes:
+            self.add_node(node)
+        for u, v in edges:
+            self.add_edge(u, v)
+
+    # ------------------------------------------------------------------
+    # Queries
+
+    def __contains__(self, node: Node) -> bool:
+        return node in self._comp
+
+    def __len__(self) -> int:
+        return len(self._comp)
+
+    def visited(self, goal: Node) -> bool:
+        """True if ``goal`` has been part of the goal history."""
+        return goal in self._comp
+
+    def same_component(self, a: Node, b: Node) -> bool:
+        """True if ``a`` and ``b`` lie on a common cycle."""
+        return a in self._comp and self._comp.get(a) == self._comp.get(b)
+
+    def reachable(self, source: Node, target: Node) -> bool:
+        """True if ``target`` can be reached from ``source``.
+
+        Pairs in the same component or in the wrong topological order are
+        answered from the index directly. Otherwise the descendants of
+        ``source`` are computed once and reused until the next insertion,
+        so repeated queries from the same goal are O(1).
+        """
+        if source not in self._comp or target not in self._comp:
+            return False
+        cs, ct = self._comp[source], self._comp[target]
+        if cs == ct:
+            return True
+        if self._ord[cs] > self._ord[ct]:
+            return False
+        version, reach = self._reach.get(cs, (-1, set()))
+        if version != self._version:
+            reach = self._descendants(cs)
+            self._reach[cs] = (self._version, reach)
+        return ct in reach
+
+    def order(self) -> List[Node]:
+        """Return all goals in topological order of their components."""
+        version, path = self._path
+        if version != self._version:
+            comps = sorted(self._members, key=self._ord.__getitem__)
+            path = [node for c in comps for node in self._members[c]]
+            self._path = (self._version, path)
+        return list(path)
+
+    # ------------------------------------------------------------------
+    # Updates
+
+    def add_node(self, node: Node) -> None:
+        """Add ``node`` as a component of its own at the end of the order."""
+        if node in self._comp:
+            return
+        cid = self._next_id
+        self._next_id += 1
+        self._comp[node] = cid
+        self._members[cid] = [node]
+        self._succ[cid] = Counter()
+        self._pred[cid] = Counter()
+        self._ord[cid] = self._next_ord
+        self._next_ord += 1
+        self._version += 1
+
+    def add_edge(self, u: Node, v: Node) -> None:
+        """Insert ``u -> v`` and repair the order (merging a closed cycle)."""
+        self.add_node(u)
+        self.add_node(v)
+        cu, cv = self._comp[u], self._comp[v]
+        if cu == cv:
+            return
+        new_edge = self._succ[cu][cv] == 0
+        self._succ[cu][cv] += 1
+        self._pred[cv][cu] += 1
+        if not new_edge:
+            return
+        self._version += 1
+        lower, upper = self._ord[cv], self._ord[cu]
+        if upper < lower:
+            return  # order already consistent
+
+        forward, cycle = self._search(cv, self._succ, stop=cu, inside=lambda o: o < upper)
+        backward, _ = self._search(cu, self._pred, stop=None, inside=lambda o: o > lower)
+        slots = sorted(self._ord[c] for c in forward | backward)
+        if cycle:
+            merged = (forward & backward) | {cu, cv}
+            forward -= merged
+            backward -= merged
+        # ancestors take the lowest slots, descendants the highest ones
+        ordered = sorted(backward, key=self._ord.__getitem__)
+        ordered += sorted(forward, key=self._ord.__getitem__)
+        for comp, slot in zip(ordered, slots[:len(backward)] + slots[len(slots) - len(forward):]):
+            self._ord[comp] = slot
+        if cycle:
+            # everything before the merged component reaches it, everything
+            # after is reached from it, so any slot in between is valid
+            keep = self._merge(merged)
+            self._ord[keep] = slots[len(backward)]
+
+    # ------------------------------------------------------------------
+    # Internals
+
+    def _search(self, start: int, adjacency, stop, inside) -> Tuple[Set[int], bool]:
+        """Collect components reachable from ``start`` within the affected region."""
+        seen = {start}
+        stack = [start]
+        hit = False
+        while stack:
+            comp = stack.pop()
+            for nxt in adjacency[comp]:
+                if nxt == stop:
+                    hit = True
+                    continue
+                if nxt not in seen and inside(self._ord[nxt]):
+                    seen.add(nxt)
+                    stack.append(nxt)
+        return seen, hit
+
+    def _merge(self, comps: Set[int]) -> int:
+        """Merge ``comps`` into one component and return its id."""
+        keep = min(comps, key=lambda c: (len(self._members[c]) * -1, c))
+        for comp in comps - {keep}:
+            for node in self._members.pop(comp):
+                self._comp[node] = keep
+                self._members[keep].append(node)
+            for adjacency, reverse in ((self._succ, self._pred), (self._pred, self._succ)):
+                for other, count in adjacency.pop(comp).items():
+                    if other in reverse:
+                        reverse[other].pop(comp, None)
+                    if other not in comps:
+                        adjacency[keep][other] += count
+                        reverse[other][keep] += count
+            del self._ord[comp]
+            self._reach.pop(comp, None)
+        for adjacency in (self._succ, self._pred):
+            for comp in comps:
+                adjacency[keep].pop(comp, None)
+        return keep
+
+    def _descendants(self, comp: int) -> Set[int]:
+        seen = {comp}
+        stack = [comp]
+        while stack:
+            for nxt in self._succ[stack.pop()]:
+                if nxt not in seen:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        return seen
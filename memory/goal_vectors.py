@@ -0,0 +1,173 @@
+"""Nearest-goal lookup for deduplicating paraphrased goals.
+
+Every goal node is stored as a row of a preallocated matrix. With an LLM
+client the rows are model embeddings (:func:`utils.text_vectors.embed_texts`);
+offline, or once an embedding request fails, hashed trigram vectors
+(:func:`utils.text_vectors.hash_vectors`) of the goal's content words are
+used. The shared imperative ("Untersuche …"), articles and prepositions are
+dropped before hashing, otherwise they dominate the cosine of short goals.
+A lookup vectorizes the proposed goal once and compares it with all previous
+goals in a single matrix-vector product; the matrices grow by doubling, so
+adding a goal is amortized O(1).
+"""
+from __future__ import annotations
+
+import logging
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from cfg.config import GOAL_DECISION
+from utils.text_vectors import DIMENSIONS, embed_texts, hash_vectors
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"\w+")
+_FUNCTION_WORDS = {
+    # goal verbs, as leading imperative or trailing infinitive
+    "untersuche", "analysiere", "erforsche", "verstehe", "erkläre", "beschreibe",
+    "betrachte", "finde", "lerne", "beschäftige", "konzentriere", "fokussiere",
+    "untersuchen", "analysieren", "erforschen", "verstehen", "erklären",
+    "beschreiben", "betrachten", "finden", "lernen", "dich", "mich", "sich",
+    # articles, prepositions, conjunctions
+    "der", "die", "das", "den", "dem", "des", "ein", "eine", "einen", "einem",
+    "einer", "eines", "mit", "auf", "über", "von", "vom", "in", "im", "zu", "zum",
+    "zur", "für", "bei", "beim", "und", "oder",
+}
+# embeddings of recent queries, so resolving and then adding a goal costs
+# one request
+_CACHE_SIZE = 256
+
+
+def goal_key(goal: str) -> str:
+    """Return the content words of ``goal`` that trigram vectors compare."""
+    words = [w for w in _WORD_RE.findall(goal.casefold()) if w not in _FUNCTION_WORDS]
+    return " ".join(words) or goal
+
+
+def _append_rows(matrix: np.ndarray, size: int, rows: np.ndarray) -> np.ndarray:
+    """Write ``rows`` after the first ``size`` rows, doubling the capacity."""
+    capacity = len(matrix)
+    while capacity < size + len(rows):
+        capacity *= 2
+    if capacity != len(matrix) or matrix.shape[1] != rows.shape[1]:
+        grown = np.zeros((capacity, rows.shape[1]), dtype=np.float32)
+        grown[:size] = matrix[:size]
+        matrix = grown
+    matrix[size:size + len(rows)] = rows
+    return matrix
+
+
+class GoalVectorIndex:
+    """Map proposed goals onto the most similar known goal."""
+
+    def __init__(
+        self,
+        goals: Iterable[str] = (),
+        threshold: float | None = None,
+        use_embeddings: bool | None = None,
+        api_key: str | None = None,
+    ) -> None:
+        self.threshold = threshold
+        self.api_key = api_key
+        self.embeddings = (
+            GOAL_DECISION['dedup_embeddings'] if use_embeddings is None else use_embeddings
+        )
+        self._goals: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._matrix = np.zeros((16, DIMENSIONS), dtype=np.float32)
+        self._embedded = np.zeros((16, 1), dtype=np.float32)
+        self._cache: Dict[str, np.ndarray] = {}
+        self.add_many(goals)
+
+    def __len__(self) -> int:
+        return len(self._goals)
+
+    def __contains__(self, goal: str) -> bool:
+        return goal in self._rows
+
+    def _embed(self, texts: Sequence[str]) -> Optional[np.ndarray]:
+        """Return embeddings of ``texts``; ``None`` switches to trigrams for good."""
+        if not self.embeddings:
+            return None
+        missing = [t for t in dict.fromkeys(texts) if t not in self._cache]
+        if missing:
+            vectors = embed_texts(missing, self.api_key)
+            if vectors is None:
+                logger.info("[GoalVectors] keine Embeddings, vergleiche Trigramme")
+                self.embeddings = False
+                return None
+            if len(self._cache) + len(missing) > _CACHE_SIZE:
+                self._cache.clear()
+            self._cache.update(zip(missing, vectors))
+        return np.stack([self._cache[t] for t in texts])
+
+    def add_many(self, goals: Iterable[str]) -> None:
+        """Add ``goals`` not yet in the index, vectorized as one batch."""
+        new = [g for g in dict.fromkeys(goals) if g not in self._rows]
+        if not new:
+            return
+        size = len(self._goals)
+        self._matrix = _append_rows(self._matrix, size, hash_vectors([goal_key(g) for g in new]))
+        if self.embeddings:
+            embedded = self._embed(new)
+            if embedded is not None:
+                self._embedded = _append_rows(self._embedded, size, embedded)
+        for goal in new:
+            self._rows[goal] = len(self._goals)
+            self._goals.append(goal)
+
+    def add(self, goal: str) -> None:
+        self.add_many([goal])
+
+    def retain(self, goals: Iterable[str]) -> None:
+        """Make ``goals`` the indexed goals, dropping all others.
+
+        Goals already indexed keep their vectors; only new ones are
+        vectorized (and embedded), so a rebuild costs no requests for them.
+        """
+        goals = list(dict.fromkeys(goals))
+        kept = [g for g in goals if g in self._rows]
+        rows = np.array([self._rows[g] for g in kept], dtype=np.intp)
+        self._matrix = _append_rows(
+            np.zeros((16, self._matrix.shape[1]), dtype=np.float32), 0, self._matrix[rows]
+        )
+        if self.embeddings:
+            self._embedded = _append_rows(
+                np.zeros((16, self._embedded.shape[1]), dtype=np.float32), 0, self._embedded[rows]
+            )
+        self._goals = kept
+        self._rows = {g: i for i, g in enumerate(kept)}
+        self.add_many(goals)
+
+    def _nearest(self, goal: str) -> Optional[Tuple[str, float, float]]:
+        """Return the best match, its similarity and the threshold that applies."""
+        if goal in self._rows:
+            return goal, 1.0, 1.0
+        if not self._goals:
+            return None
+        count = len(self._goals)
+        query = self._embed([goal]) if self.embeddings else None
+        if query is not None:
+            scores = self._embedded[:count] @ query[0]
+            threshold = GOAL_DECISION['dedup_similarity']
+        else:
+            scores = self._matrix[:count] @ hash_vectors([goal_key(goal)])[0]
+            threshold = GOAL_DECISION['dedup_trigram_similarity']
+        if self.threshold is not None:
+            threshold = self.threshold
+        best = int(np.argmax(scores))
+        return self._goals[best], float(scores[best]), threshold
+
+    def nearest(self, goal: str) -> Optional[Tuple[str, float]]:
+        """Return the most similar known goal and its cosine similarity."""
+        match = self._nearest(goal)
+        return None if match is None else match[:2]
+
+    def resolve(self, goal: str) -> str:
+        """Return the known goal ``goal`` paraphrases, or ``goal`` itself."""
+        match = self._nearest(goal)
+        if match is not None and match[1] >= match[2]:
+            return match[0]
+        return goal
@@ -1,11 +1,68 @@
 
 import os
 from pathlib import Path
-from typing import List, Tuple
+from typing import Callable, List, Tuple
 
 import networkx as nx
 from sklearn.metrics.pairwise import cosine_similarity
 
+from memory.goal_index import GoalIndex
+from memory.goal_vectors import GoalVectorIndex
+
+class GoalGraph(nx.DiGraph):
+    """Directed goal graph that counts its structural changes.
+
+    :attr:`version` grows with every node or edge insertion or removal, so
+    :class:`IntentionGraph` notices direct edits of ``goal_graph`` even if
+    they leave the node and edge counts unchanged.
+    """
+
+    version = 0
+
+    def _changed(self) -> None:
+        self.version += 1
+
+    def add_node(self, node_for_adding, **attr):
+        super().add_node(node_for_adding, **attr)
+        self._changed()
+
+    def add_nodes_from(self, nodes_for_adding, **attr):
+        super().add_nodes_from(nodes_for_adding, **attr)
+        self._changed()
+
+    def remove_node(self, n):
+        super().remove_node(n)
+        self._changed()
+
+    def remove_nodes_from(self, nodes):
+        super().remove_nodes_from(nodes)
+        self._changed()
+
+    def add_edge(self, u_of_edge, v_of_edge, **attr):
+        super().add_edge(u_of_edge, v_of_edge, **attr)
+        self._changed()
+
+    def add_edges_from(self, ebunch_to_add, **attr):
+        super().add_edges_from(ebunch_to_add, **attr)
+        self._changed()
+
+    def remove_edge(self, u, v):
+        super().remove_edge(u, v)
+        self._changed()
+
+    def remove_edges_from(self, ebunch):
+        super().remove_edges_from(ebunch)
+        self._changed()
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def clear_edges(self):
+        super().clear_edges()
+        self._changed()
+
+
 class IntentionGraph:
     """Graph storing intention triples and goal transitions with persistence."""
 
@@ -22,6 +79,8 @@ class IntentionGraph:
 
         self.filepath = filepath
         self.goal_path = Path(goal_path or "memory/intent_graph.gml")
+        self._edge_listeners: List[Callable[[str, str, str], None]] = []
+        self._goal_vectors: GoalVectorIndex | None = None
         self.load_graph()
         self._load_goal_graph()
 
@@ -52,15 +111,14 @@ class IntentionGraph:
         """Load the directed goal graph from ``self.goal_path`` if available."""
         if self.goal_path.exists():
             try:
-                self.goal_graph = nx.read_gml(self.goal_path)
-                if not isinstance(self.goal_graph, nx.DiGraph):
-                    self.goal_graph = nx.DiGraph(self.goal_graph)
+                self.goal_graph = GoalGraph(nx.read_gml(self.goal_path))
                 print(f"[GoalGraph] Lade bestehenden Graph aus {self.goal_path}")
             except Exception as exc:  # pragma: no cover - log for debugging
                 print(f"[GoalGraph] Fehler beim Laden, erstelle neuen Graph: {exc}")
-                self.goal_graph = nx.DiGraph()
+                self.goal_graph = GoalGraph()
         else:
-            self.goal_graph = nx.DiGraph()
+            self.goal_graph = GoalGraph()
+        self._rebuild_goal_index()
 
     def _save_goal_graph(self) -> None:
         """Persist the goal graph to disk."""
@@ -70,117 +128,203 @@ class IntentionGraph:
             print(f"[GoalGraph] Fehler beim Speichern: {exc}")
 
 
+    def add_edge_listener(self, listener: Callable[[str, str, str], None]) -> None:
+        """Call ``listener(subject, object, relation)`` for every added edge."""
+        self._edge_listeners.append(listener)
+
     def add_triplets(self, triplets: List[Tuple[str, str, str]]):
-        """Add a list of (subject, relation, object) triples to the graph."""
+        """Add a list of (subject, relation, object) triples to the graph.
+
+        New nodes and all edges are tagged with the current cycle number.
+        """
+        cycle = self.current_cycle
         for subj, rel, obj in triplets:
-            self.graph.add_node(subj)
-            self.graph.add_node(obj)
-            self.graph.add_edge(subj, obj, relation=rel)
+            for node in (subj, obj):
+                if node not in self.graph:
+                    self.graph.add_node(node, cycle=cycle)
+            self.graph.add_edge(subj, obj, relation=rel, cycle=cycle)
+            for listener in self._edge_listeners:
+                listener(subj, obj, rel)
 
     def snapshot(self) -> nx.MultiDiGraph:
         """Return a copy of the current graph."""
         return self.graph.copy()
 
     # ------------------------------------------------------------------
-    # Goal transition management
+    # Cycle versioning
 
-    def add_goal_transition(self, previous_goal: str, new_goal: str) -> None:
-        """Add a directed edge from ``previous_goal`` to ``new_goal``.
+    @property
+    def current_cycle(self) -> int:
+        """Number of the running cycle (stored with the graph)."""
+        return int(self.graph.graph.get("cycle", 0))
+
+    def begin_cycle(self) -> int:
+        """Advance and return the cycle number used to tag new edges."""
+        self.graph.graph["cycle"] = self.current_cycle + 1
+        return self.current_cycle
+
+    def as_of(self, cycle: int) -> nx.MultiDiGraph:
+        """Return a read-only view of the graph as it was after ``cycle``.
 
-        Nodes are created if they do not yet exist. Duplicate edges are
-        ignored. The goal graph is persisted after modification.
+        Edges are visible from the cycle in their ``cycle`` attribute until
+        the cycle in their optional ``removed`` attribute. Untagged elements
+        count as cycle 0. No data is copied.
         """
+        nodes = self.graph.nodes
+        edges = self.graph.edges
 
-        self.goal_graph.add_node(previous_goal)
-        self.goal_graph.add_node(new_goal)
-        if not self.goal_graph.has_edge(previous_goal, new_goal):
-            self.goal_graph.add_edge(previous_goal, new_goal)
-            self._save_goal_graph()
+        def node_visible(node) -> bool:
+            return nodes[node].get("cycle", 0) <= cycle
 
-    def get_goal_path(self) -> List[str]:
-        """Return a list representing the current goal path."""
+        def edge_visible(u, v, key) -> bool:
+            data = edges[u, v, key]
+            return data.get("cycle", 0) <= cycle < data.get("removed", float("inf"))
 
-        if len(self.goal_graph) == 0:
-            return []
-        try:
-            return list(nx.topological_sort(self.goal_graph))
-        except nx.NetworkXUnfeasible:
-            start = next(iter(self.goal_graph.nodes()))
-            return list(nx.dfs_preorder_nodes(self.goal_graph, start))
+        return nx.subgraph_view(self.graph, filter_node=node_visible, filter_edge=edge_visible)
 
-    def visualize_graph(self, output_path: str = "memory/intent_graph.png") -> None:
-        """Create a simple PNG visualization of the goal graph."""
+    # ------------------------------------------------------------------
+    # Goal transition management
 
-        import matplotlib.pyplot as plt
+    @property
+    def goal_index(self) -> GoalIndex:
+        """Incremental topological index over the goals (plan nodes excluded).
 
-        plt.figure(figsize=(8, 6))
-        pos = nx.spring_layout(self.goal_graph)
-        nx.draw(self.goal_graph, pos, with_labels=True, arrows=True, node_color="lightblue")
-        plt.tight_layout()
-        plt.savefig(output_path)
-        plt.close()
+        Transitions added with :meth:`add_goal_transition` update it in place.
+        Direct edits of ``goal_graph`` are picked up on the next access:
+        insertions incrementally, removals by a rebuild.
+        """
+        if self._goal_index_signature != self._goal_graph_signature():
+            self._sync_goal_index()
+        return self._goal_index
+
+    def _goal_graph_signature(self) -> Tuple[int, int, int]:
+        # the counts catch edits of a goal graph replaced by a plain DiGraph
+        return (
+            self.goal_graph.number_of_nodes(),
+            self.goal_graph.number_of_edges(),
+            getattr(self.goal_graph, "version", 0),
+        )
+
+    def _is_goal(self, node) -> bool:
+        return self.goal_graph.nodes[node].get("kind") != "plan"
+
+    def _rebuild_goal_index(self) -> None:
+        goals = [n for n in self.goal_graph.nodes if self._is_goal(n)]
+        self._goal_edges = set(self._goal_graph_edges())
+        self._goal_index = GoalIndex(self._goal_edges, nodes=goals)
+        # keep the vectors of known goals: embedding costs a request per goal
+        if self._goal_vectors is None:
+            self._goal_vectors = GoalVectorIndex(goals)
+        else:
+            self._goal_vectors.retain(goals)
+        self._goal_index_signature = self._goal_graph_signature()
+
+    def _goal_graph_edges(self):
+        return (
+            (u, v) for u, v in self.goal_graph.edges if self._is_goal(u) and self._is_goal(v)
+        )
+
+    def _sync_goal_index(self) -> None:
+        """Add goals and transitions inserted into ``goal_graph`` behind our back.
+
+        Removals cannot be applied incrementally and rebuild the index.
+        """
+        index = self._goal_index
+        if len(index) > len(self.goal_graph) or any(
+            n not in self.goal_graph for n in index.order()
+        ) or any(not self.goal_graph.has_edge(u, v) for u, v in self._goal_edges):
+            self._rebuild_goal_index()
+            return
+        added = []
+        for node in list(self.goal_graph.nodes):
+            if node in index or not self._is_goal(node):
+                continue
+            index.add_node(node)
+            added.append(node)
+        for edge in list(self._goal_graph_edges()):
+            if edge not in self._goal_edges:
+                self._goal_edges.add(edge)
+                index.add_edge(*edge)
+        self._goal_vectors.add_many(added)
+        self._goal_index_signature = self._goal_graph_signature()
+
+    def resolve_goal(self, goal: str) -> str:
+        """Return the existing goal node ``goal`` paraphrases, else ``goal``.
+
+        "Untersuche die Musik" resolves to a stored "Untersuche Musik" if
+        they are similar enough (see :class:`memory.goal_vectors.GoalVectorIndex`).
+        """
 
+        self.goal_index  # pick up goals added directly
+        return self._goal_vectors.resolve(goal.strip())
 
-    def add_goal_transition(self, previous_goal: str, new_goal: str) -> None:
+    def add_goal_transition(self, previous_goal: str, new_goal: str) -> str:
         """Add a directed edge from ``previous_goal`` to ``new_goal``.
 
-        Nodes are created if they do not yet exist. Duplicate edges are
-        ignored. The goal graph is persisted after modification.
+        Both goals are first resolved to existing nodes they paraphrase
+        (see :meth:`resolve_goal`); nodes are created if no such node exists.
+        Duplicate edges and self-loops are ignored. The goal graph is
+        persisted after modification. Returns the node used for ``new_goal``.
         """
 
-        self.goal_graph.add_node(previous_goal)
-        self.goal_graph.add_node(new_goal)
-        if not self.goal_graph.has_edge(previous_goal, new_goal):
+        index = self.goal_index
+        previous_goal = self.resolve_goal(previous_goal)
+        new_goal = self.resolve_goal(new_goal)
+        for goal in (previous_goal, new_goal):
+            if goal not in self.goal_graph:
+                self.goal_graph.add_node(goal)
+                index.add_node(goal)
+                self._goal_vectors.add(goal)
+        changed = self._goal_graph_signature() != self._goal_index_signature
+        if previous_goal != new_goal and not self.goal_graph.has_edge(previous_goal, new_goal):
             self.goal_graph.add_edge(previous_goal, new_goal)
+            index.add_edge(previous_goal, new_goal)
+            self._goal_edges.add((previous_goal, new_goal))
+            changed = True
+        if changed:
             self._save_goal_graph()
+        self._goal_index_signature = self._goal_graph_signature()
+        return new_goal
 
-    def get_goal_path(self) -> List[str]:
-        """Return a list representing the current goal path."""
+    def set_active_subgoal(self, main_goal: str, subgoal: str) -> None:
+        """Remember that ``subgoal`` of ``main_goal`` is the active goal.
 
-        if len(self.goal_graph) == 0:
-            return []
-        try:
-            return list(nx.topological_sort(self.goal_graph))
-        except nx.NetworkXUnfeasible:
-            start = next(iter(self.goal_graph.nodes()))
-            return list(nx.dfs_preorder_nodes(self.goal_graph, start))
+        The cycle overwrites the stored goal with the subgoal it executes;
+        :meth:`main_goal_of` maps it back, e.g. to look up the plan.
+        """
 
-    def visualize_graph(self, output_path: str = "memory/intent_graph.png") -> None:
-        """Create a simple PNG visualization of the goal graph."""
+        data = self.goal_graph.graph
+        if data.get("main_goal") == main_goal and data.get("active_goal") == subgoal:
+            return
+        data.update(main_goal=main_goal, active_goal=subgoal)
+        self._save_goal_graph()
 
-        import matplotlib.pyplot as plt
+    def main_goal_of(self, goal: str) -> str:
+        """Return the main goal ``goal`` was activated for, else ``goal``."""
 
-        plt.figure(figsize=(8, 6))
-        pos = nx.spring_layout(self.goal_graph)
-        nx.draw(self.goal_graph, pos, with_labels=True, arrows=True, node_color="lightblue")
-        plt.tight_layout()
-        plt.savefig(output_path)
-        plt.close()
+        data = self.goal_graph.graph
+        if goal and data.get("active_goal") == goal:
+            return data.get("main_goal") or goal
+        return goal
 
+    def get_goal_path(self) -> List[str]:
+        """Return a list representing the current goal path.
 
-    def add_goal_transition(self, previous_goal: str, new_goal: str) -> None:
-        """Add a directed edge from ``previous_goal`` to ``new_goal``.
-
-        Nodes are created if they do not yet exist. Duplicate edges are
-        ignored. The goal graph is persisted after modification.
+        Goals come in topological order; goals on a cycle are kept together
+        in the order they were first seen.
         """
 
-        self.goal_graph.add_node(previous_goal)
-        self.goal_graph.add_node(new_goal)
-        if not self.goal_graph.has_edge(previous_goal, new_goal):
-            self.goal_graph.add_edge(previous_goal, new_goal)
-            self._save_goal_graph()
+        return self.goal_index.order()
 
-    def get_goal_path(self) -> List[str]:
-        """Return a list representing the current goal path."""
+    def has_visited_goal(self, goal: str) -> bool:
+        """Return ``True`` if ``goal`` is part of the goal history."""
 
-        if len(self.goal_graph) == 0:
-            return []
-        try:
-            return list(nx.topological_sort(self.goal_graph))
-        except nx.NetworkXUnfeasible:
-            start = next(iter(self.goal_graph.nodes()))
-            return list(nx.dfs_preorder_nodes(self.goal_graph, start))
+        return self.goal_index.visited(goal)
+
+    def goal_reachable(self, source: str, target: str) -> bool:
+        """Return ``True`` if ``target`` was reached after ``source``."""
+
+        return self.goal_index.reachable(source, target)
 
     def visualize_graph(self, output_path: str = "memory/intent_graph.png") -> None:
         """Create a simple PNG visualization of the goal graph."""
@@ -193,8 +337,3 @@ class IntentionGraph:
         plt.tight_layout()
         plt.savefig(output_path)
         plt.close()
-
-
-
-
-
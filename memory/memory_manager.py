@@ -6,8 +6,14 @@ from pathlib import Path
 from typing import List, Tuple
 
 from memory.intention_graph import IntentionGraph
-from reasoning.entropy_analyzer import entropy_of_graph
+from reasoning.entropy_analyzer import (
+    DegreeEntropySketch,
+    EgoEntropyTracker,
+    entropy_of_graph,
+    goal_anchor_nodes,
+)
 from reasoning.emotion import interpret_emotion
+from cfg.config import ENTROPY
 
 
 class MemoryManager:
@@ -19,8 +25,34 @@ class MemoryManager:
         emotion_log: str = "data/emotions.jsonl",
         reflection_path: str = "memory/last_reflection.txt",
         entropy_path: str = "memory/last_entropy.txt",
+        entropy_mode: str = ENTROPY['mode'],
+        approx_threshold: int = ENTROPY['approx_threshold'],
+        entropy_scope: str = ENTROPY['scope'],
+        ego_hops: int = ENTROPY['ego_hops'],
     ) -> None:
+        """Create the manager.
+
+        ``entropy_mode`` selects how graph entropy is measured: ``"exact"``
+        counts all node degrees, ``"approx"`` uses a bounded-memory
+        :class:`DegreeEntropySketch` and ``"auto"`` switches to the sketch
+        once the graph has more than ``approx_threshold`` nodes.
+
+        With ``entropy_scope="goal"`` the entropy is instead measured on the
+        ``ego_hops``-neighbourhood of the active goal's nodes and maintained
+        incrementally by an :class:`EgoEntropyTracker`.
+        """
+        if entropy_mode not in {"exact", "approx", "auto"}:
+            raise ValueError(f"unknown entropy mode: {entropy_mode}")
+        if entropy_scope not in {"global", "goal"}:
+            raise ValueError(f"unknown entropy scope: {entropy_scope}")
         self.graph = IntentionGraph(graph_path)
+        self.entropy_mode = entropy_mode
+        self.approx_threshold = approx_threshold
+        self.entropy_scope = entropy_scope
+        self.ego_hops = ego_hops
+        self._sketch: DegreeEntropySketch | None = None
+        self._ego: EgoEntropyTracker | None = None
+        self._ego_goal: str | None = None
         self.emotion_log = Path(emotion_log)
         self.emotion_log.parent.mkdir(parents=True, exist_ok=True)
         self.reflection_path = Path(reflection_path)
@@ -31,12 +63,16 @@ class MemoryManager:
     # ------------------------------------------------------------------
     # Triplet handling
 
-    def store_triplets(self, triplets: List[Tuple[str, str, str]]) -> tuple[float, float]:
+    def store_triplets(
+        self,
+        triplets: List[Tuple[str, str, str]],
+        goal: str | None = None,
+    ) -> tuple[float, float]:
         """Add ``triplets`` to the intention graph and return entropy values."""
-        before = entropy_of_graph(self.graph.snapshot())
+        before = self.calculate_entropy(goal)
         if triplets:
             self.graph.add_triplets(triplets)
-        after = entropy_of_graph(self.graph.snapshot())
+        after = self.calculate_entropy(goal)
         return before, after
 
     # ------------------------------------------------------------------
@@ -73,9 +109,50 @@ class MemoryManager:
     # ------------------------------------------------------------------
     # Entropy helpers
 
-    def calculate_entropy(self) -> float:
-        """Return the entropy of the current knowledge graph."""
-        return entropy_of_graph(self.graph.snapshot())
+    def _entropy_sketch(self) -> DegreeEntropySketch | None:
+        """Return the approximate estimator if the current mode calls for it."""
+        if self._sketch is None:
+            if self.entropy_mode == "exact":
+                return None
+            if (
+                self.entropy_mode == "auto"
+                and self.graph.graph.number_of_nodes() <= self.approx_threshold
+            ):
+                return None
+            self._sketch = DegreeEntropySketch.from_graph(
+                self.graph.graph, epsilon=ENTROPY['epsilon'], delta=ENTROPY['delta']
+            )
+            self.graph.add_edge_listener(lambda subj, obj, rel: self._sketch.add_edge(subj, obj))
+        return self._sketch
+
+    def _ego_tracker(self, goal: str) -> EgoEntropyTracker:
+        """Return the neighbourhood tracker for ``goal``, rebuilding on change."""
+        if self._ego is None:
+            # one listener forwards to whichever tracker is current
+            self.graph.add_edge_listener(
+                lambda subj, obj, rel: self._ego.add_edge(subj, obj)
+            )
+        anchors = goal_anchor_nodes(self.graph.graph, goal)
+        if self._ego is None or goal != self._ego_goal:
+            self._ego = EgoEntropyTracker(self.graph.graph, anchors, hops=self.ego_hops)
+            self._ego_goal = goal
+        else:
+            # goal words that became nodes since the tracker was built
+            for anchor in anchors:
+                self._ego.add_anchor(anchor)
+        return self._ego
+
+    def calculate_entropy(self, goal: str | None = None) -> float:
+        """Return the entropy of the current knowledge graph.
+
+        ``goal`` is only used with ``entropy_scope="goal"``.
+        """
+        if self.entropy_scope == "goal" and goal:
+            return self._ego_tracker(goal).entropy()
+        sketch = self._entropy_sketch()
+        if sketch is not None:
+            return sketch.estimate()
+        return entropy_of_graph(self.graph.graph)
 
     def load_last_entropy(self) -> float:
         """Return the previously stored entropy value."""
@@ -0,0 +1,276 @@
+"""Rule-based extraction of triples from simple German sentences.
+
+Main clauses with the verb in second position are matched against a small
+set of patterns: the copula ("Musik ist eine Kunst"), common transitive verbs
+("Musik hat Rhythmus"), verbs with a prepositional object ("Musik besteht aus
+Tönen") and enumerations in the object ("Musik hat Rhythmus, Melodie und
+Harmonie"). Every sentence gets a confidence score; sentences the rules do
+not understand (subordinate clauses, negation, pronoun subjects, questions)
+score zero, so the mean confidence tells callers whether the LLM is needed.
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from cfg.config import EXTRACTION
+from parsing.text_chunker import split_sentences
+
+Triple = Tuple[str, str, str]
+
+_COPULA = {"ist", "sind", "war", "waren", "bleibt", "bleiben", "wird", "werden"}
+_VERBS = {
+    "hat", "haben", "enthält", "enthalten", "braucht", "brauchen", "benötigt",
+    "benötigen", "erzeugt", "erzeugen", "beeinflusst", "beeinflussen", "fördert",
+    "fördern", "ermöglicht", "ermöglichen", "verursacht", "verursachen", "nutzt",
+    "nutzen", "bildet", "bilden", "beschreibt", "beschreiben", "umfasst",
+    "umfassen", "kennt", "kennen", "liebt", "lieben", "mag", "mögen", "bedeutet",
+    "bedeuten", "bestimmt", "bestimmen", "prägt", "prägen", "schafft", "schaffen",
+    "stärkt", "stärken", "verbindet", "verbinden", "unterstützt", "unterstützen",
+    "erfordert", "erfordern", "gehört", "gehören", "besteht", "bestehen", "führt",
+    "führen", "basiert", "basieren", "beruht", "beruhen", "liegt", "liegen",
+    "stammt", "stammen", "kommt", "kommen", "wohnt", "wohnen", "lebt", "leben",
+    "spielt", "spielen", "erklärt", "erklären", "zeigt", "zeigen", "verändert",
+    "verändern", "begleitet", "begleiten", "hilft", "helfen",
+}
+_PREPOSITIONS = {
+    "in", "im", "ins", "auf", "an", "am", "mit", "zu", "zum", "zur", "aus", "von",
+    "vom", "für", "über", "unter", "bei", "beim", "nach", "durch", "gegen", "ohne",
+    "um", "zwischen", "neben", "vor", "hinter",
+}
+_ARTICLES = {
+    "der", "die", "das", "den", "dem", "des", "ein", "eine", "einen", "einem",
+    "einer", "eines",
+}
+_PRONOUNS = {
+    "ich", "du", "er", "sie", "es", "wir", "ihr", "man", "dies", "das", "dieser",
+    "diese", "dieses", "jemand", "niemand", "alles", "etwas",
+}
+_NEGATIONS = {"nicht", "kein", "keine", "keinen", "keinem", "keiner", "nie", "niemals"}
+_SUBORDINATORS = {
+    "dass", "weil", "wenn", "ob", "obwohl", "da", "damit", "sodass", "während",
+    "nachdem", "bevor", "als", "welche", "welcher", "welches", "der", "die", "das",
+}
+_FILLERS = {"auch", "oft", "immer", "meist", "häufig", "manchmal", "stets"}
+# conjunctions that join clauses or contrast predicates, never list members
+_CONJUNCTIONS = {"aber", "denn", "sondern", "doch", "jedoch"}
+
+_TOKEN_RE = re.compile(r"[\w\-']+|,")
+_LIST_WORDS = {",", "und", "sowie"}
+
+# confidence of a sentence matched by the generic verb-second heuristic
+_GUESS_CONFIDENCE = 0.5
+_MAX_SUBJECT = 4
+_MAX_OBJECT = 6
+
+
+class LocalExtraction(NamedTuple):
+    """Result of :func:`extract_triplets_local`."""
+
+    triplets: List[Triple]
+    confidence: float
+
+
+def _strip_article(words: List[str]) -> List[str]:
+    if words and words[0].lower() in _ARTICLES:
+        return words[1:]
+    return words
+
+
+def _phrase(words: List[str]) -> str:
+    return " ".join(_strip_article(words))
+
+
+def _is_phrase(words: List[str]) -> bool:
+    """Whether ``words`` form one noun phrase.
+
+    A lowercase word after the noun ("Peter seit 2010") starts an adverbial
+    or a phrase the rules do not know, so the phrase is not taken as object.
+    """
+    noun_seen = False
+    for word in _strip_article(words):
+        if word[0].isupper() or word[0].isdigit():
+            noun_seen = True
+        elif noun_seen:
+            return False
+    return True
+
+
+def _split_list(words: List[str]) -> List[List[str]]:
+    """Split an enumeration ("A, B und C") into its members."""
+    members: List[List[str]] = [[]]
+    for word in words:
+        if word.lower() in _LIST_WORDS:
+            members.append([])
+        else:
+            members[-1].append(word)
+    return [m for m in members if m]
+
+
+def _sentence_triplets(sentence: str) -> Tuple[List[Triple], float]:
+    """Return the triples of one sentence and their confidence.
+
+    A sentence matched by the known verb lists starts at 1.0; fillers,
+    long objects and split-off prepositional phrases lower the score.
+    Sentences whose parts the rules would cut wrongly score zero: a
+    prepositional phrase in front of the verb ("Am Montag ist Schule"), a
+    second verb or a contrasting conjunction in the object ("… groß und
+    Paris ist schön", "… schön, aber teuer") and words after the object noun
+    ("Anna kennt Peter seit 2010").
+    """
+    text = sentence.strip().rstrip(".!;")
+    if not text or text.endswith("?") or ":" in text or "(" in text:
+        return [], 0.0
+    tokens = _TOKEN_RE.findall(text)
+    lowered = [t.lower() for t in tokens]
+    if len(tokens) < 3 or _NEGATIONS.intersection(lowered):
+        return [], 0.0
+    # subordinate or relative clause after a comma: beyond the rules
+    for i, token in enumerate(lowered[:-1]):
+        if token == "," and lowered[i + 1] in _SUBORDINATORS:
+            return [], 0.0
+
+    verb_pos = None
+    for i, word in enumerate(lowered[1:_MAX_SUBJECT + 1], start=1):
+        if word == ",":
+            break
+        if word in _COPULA or word in _VERBS:
+            verb_pos = i
+            break
+    confidence = 1.0
+    if verb_pos is None:
+        # unknown verb in second position after a noun ("Das Gehirn verarbeitet")
+        verb_pos = 2 if lowered[0] in _ARTICLES else 1
+        verb = tokens[verb_pos] if verb_pos < len(tokens) - 1 else ""
+        noun = tokens[verb_pos - 1]
+        if not (noun[0].isupper() and verb.islower() and verb.endswith(("t", "en"))):
+            return [], 0.0
+        confidence = _GUESS_CONFIDENCE
+
+    if verb_pos == 1 and lowered[0] in _PRONOUNS:
+        return [], 0.0
+    # verb-second after an adverbial: the subject follows the verb
+    if lowered[0] in _PREPOSITIONS:
+        return [], 0.0
+    subject = _phrase(tokens[:verb_pos])
+    if not subject or not subject[0].isupper():
+        return [], 0.0
+
+    relation = lowered[verb_pos]
+    rest = tokens[verb_pos + 1:]
+    while rest and rest[0].lower() in _FILLERS:
+        rest = rest[1:]
+        confidence -= 0.1
+    if rest and rest[0].lower() in _PREPOSITIONS:
+        relation = f"{relation} {rest[0].lower()}"
+        rest = rest[1:]
+    if not rest:
+        return [], 0.0
+    for word in rest:
+        lower = word.lower()
+        if lower in _CONJUNCTIONS or (word == lower and (lower in _COPULA or lower in _VERBS)):
+            return [], 0.0
+    if len(rest) > _MAX_OBJECT:
+        confidence -= 0.4
+
+    # a prepositional phrase inside the object becomes a triple of its own:
+    # "Musik ist eine Kunst mit Rhythmus" -> (Kunst, mit, Rhythmus)
+    extra: List[Triple] = []
+    for i, word in enumerate(rest[1:-1], start=1):
+        if word.lower() in _PREPOSITIONS and "," not in rest[:i]:
+            if not _is_phrase(rest[i + 1:]):
+                return [], 0.0
+            head, target = _phrase(rest[:i]), _phrase(rest[i + 1:])
+            if head and target:
+                extra.append((head, word.lower(), target))
+                rest = rest[:i]
+                confidence -= 0.1
+            break
+
+    members = _split_list(rest)
+    if not all(_is_phrase(member) for member in members):
+        return [], 0.0
+    objects = [_phrase(member) for member in members]
+    triples = [(subject, relation, obj) for obj in objects if obj]
+    if not triples:
+        return [], 0.0
+    return triples + extra, max(confidence, 0.0)
+
+
+def extract_triplets_local(text: str) -> LocalExtraction:
+    """Extract triples from ``text`` with pattern rules only.
+
+    The confidence is the mean over all sentences, unmatched sentences
+    counting as zero.
+    """
+    sentences = split_sentences(text)
+    if not sentences:
+        return LocalExtraction([], 0.0)
+    triples: List[Triple] = []
+    total = 0.0
+    for sentence in sentences:
+        found, confidence = _sentence_triplets(sentence)
+        triples.extend(found)
+        total += confidence
+    return LocalExtraction(list(dict.fromkeys(triples)), total / len(sentences))
+
+
+class FastPathStats:
+    """Counters for the local fast path in front of the LLM extraction."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.attempts = 0
+            self.skipped = 0
+            self.local_seconds = 0.0
+            self.llm_calls = 0
+            self.llm_seconds = 0.0
+
+    def record_local(self, seconds: float, skipped: bool) -> None:
+        with self._lock:
+            self.attempts += 1
+            self.skipped += int(skipped)
+            self.local_seconds += seconds
+
+    def record_llm(self, seconds: float) -> None:
+        with self._lock:
+            self.llm_calls += 1
+            self.llm_seconds += seconds
+
+    def report(self) -> Dict[str, float]:
+        """Return the skip rate and the estimated time saved."""
+        with self._lock:
+            mean_llm = self.llm_seconds / self.llm_calls if self.llm_calls else 0.0
+            return {
+                "attempts": self.attempts,
+                "skipped": self.skipped,
+                "skip_rate": self.skipped / self.attempts if self.attempts else 0.0,
+                "mean_local_ms": 1000 * self.local_seconds / self.attempts if self.attempts else 0.0,
+                "mean_llm_ms": 1000 * mean_llm,
+                # every skipped call would have cost a mean LLM round trip
+                "saved_seconds": self.skipped * mean_llm - self.local_seconds,
+            }
+
+
+FAST_PATH = FastPathStats()
+
+
+def try_local_extraction(text: str, threshold: float | None = None) -> Optional[List[Triple]]:
+    """Return local triples if their confidence reaches ``threshold``.
+
+    ``None`` means the caller should ask the LLM; time it with
+    ``FAST_PATH.record_llm`` so the savings can be estimated.
+    """
+    if threshold is None:
+        threshold = EXTRACTION['local_confidence']
+    started = time.perf_counter()
+    result = extract_triplets_local(text)
+    skip = bool(result.triplets) and result.confidence >= threshold
+    FAST_PATH.record_local(time.perf_counter() - started, skip)
+    return result.triplets if skip else None
@@ -0,0 +1,40 @@
+"""Sentence-aligned splitting of long texts into chunks."""
+from __future__ import annotations
+
+import re
+from typing import List
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+|\n\s*\n")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split ``text`` at sentence ends and blank lines."""
+    return [s.strip() for s in _SENTENCE_END.split(text) if s and s.strip()]
+
+
+def chunk_text(text: str, max_chars: int = 1500, overlap: int = 0) -> List[str]:
+    """Return sentence-aligned chunks of at most ``max_chars`` characters.
+
+    Sentences are never cut; a single sentence longer than ``max_chars``
+    forms its own chunk. With ``overlap`` > 0 every chunk repeats that many
+    trailing sentences of the previous chunk so statements that span a
+    boundary are seen in one piece.
+    """
+    sentences = split_sentences(text)
+    chunks: List[str] = []
+    start = 0
+    while start < len(sentences):
+        end = start
+        size = 0
+        while end < len(sentences):
+            extra = len(sentences[end]) + (1 if end > start else 0)
+            if end > start and size + extra > max_chars:
+                break
+            size += extra
+            end += 1
+        chunks.append(" ".join(sentences[start:end]))
+        if end >= len(sentences):
+            break
+        # keep at least one new sentence per chunk
+        start = max(end - overlap, start + 1)
+    return chunks
@@ -28,6 +28,24 @@ def extract_triplets(text: str, max_triplets: int = 10, debug: bool = False) ->
         logger.info("No triplets extracted.")
         return []
 
+    triples = dedupe_triplets(triples, max_triplets)
+
+    if debug:
+        print("[debug] filtered:", triples)
+
+    return triples
+
+
+def dedupe_triplets(
+    triples: List[Tuple[str, str, str]],
+    max_triplets: int | None = None,
+) -> List[Tuple[str, str, str]]:
+    """Drop duplicate triples (keeping order) and cap the result.
+
+    Runs of more than three identical consecutive triples are logged as a
+    sign of a degenerate model response. ``max_triplets=None`` disables the
+    cap.
+    """
     # detect consecutive repetition of the same triple
     repeat_count = 1
     warned = False
@@ -46,11 +64,8 @@ def extract_triplets(text: str, max_triplets: int = 10, debug: bool = False) ->
         logger.info("[TripletExtractor] Duplikate entfernt (%d → %d)", len(triples), len(unique))
     triples = unique
 
-    if len(triples) > max_triplets:
-        logger.info("[TripletExtractor] limiting to %d triplets", max_triplets)
+    if max_triplets is not None and len(triples) > max_triplets:
+        logger.warning("[TripletExtractor] limiting to %d triplets", max_triplets)
         triples = triples[:max_triplets]
 
-    if debug:
-        print("[debug] filtered:", triples)
-
     return triples
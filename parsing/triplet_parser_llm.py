@@ -1,128 +1,586 @@
 """LLM-based extraction of semantic triples from German text."""
 from __future__ import annotations
 
+import contextvars
 import json
-import ast
 import os
 import logging
-from typing import List, Tuple
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, List, Tuple
 
-from utils.llm_client import get_client
-from cfg.config import PROMPTS, MODELS, TEMPERATURES
+from parsing.text_chunker import chunk_text
+from utils.json_utils import parse_json_safe
+from utils.llm_client import get_client, record_llm_call
+from utils.structured_output import TRIPLETS_FUNCTION, extract_structured
+from cfg.config import EXTRACTION, PROMPTS, MODELS, TEMPERATURES
 
 # System prompt instructing the model
 
 _SYSTEM_PROMPT = PROMPTS['triplet_parser_system']
+_BATCH_PROMPT = PROMPTS['triplet_batch_system']
 logger = logging.getLogger(__name__)
 
 
-def _parse_unquoted(text: str) -> List[Tuple[str, str, str]] | None:
-    """Attempt to parse a list of triples without quoted strings."""
-    import re
+_OPEN_RE = re.compile(r"[\[({]")
+_SPECIAL_RE = re.compile(r"[\[\](){},:\"']")
+_STRING_END_RE = {'"': re.compile(r'["\\\n]'), "'": re.compile(r"['\\\n]")}
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f"}
+_SEPARATORS = ",:])}"
 
-    txt = text.strip()
-    if not (txt.startswith("[") and txt.endswith("]")):
-        return None
-    inner = txt[1:-1].strip()
-    # split triples separated by brackets, parentheses, commas or newlines
-    segments = re.split(r"\]\s*,\s*\[|\]\s*\n\s*\[|\)\s*,\s*\(|\],\s*\(|\),\s*\[", inner)
-    triples: List[Tuple[str, str, str]] = []
-    for seg in segments:
-        seg = seg.strip().strip("[]()")
-        if not seg:
-            continue
-        parts = [p.strip(" '\"") for p in seg.split(',')]
-        if len(parts) != 3:
+# fast path: a complete flat group of three simple atoms in one match
+# bare atoms start and end on a non-space character, so they never compete
+# with the surrounding ``\s*`` and the match cannot backtrack
+_BARE = r"""[^\s\[\](){},:"'\\]+"""
+_ATOM = rf"""\s*("[^"\\\n]*"|'[^'\\\n]*'|{_BARE}(?:[ \t]+{_BARE})*)\s*"""
+_TRIPLE_RE = re.compile(rf"[\[(]{_ATOM},{_ATOM},{_ATOM}(?:,\s*)?[\])}}]")
+_GAP_RE = re.compile(r"\s*,?\s*")
+
+# keys accepted for triples given as objects, mapped to their position
+_KEY_POSITIONS = {
+    "subject": 0, "subjekt": 0,
+    "predicate": 1, "prädikat": 1, "praedikat": 1, "relation": 1,
+    "object": 2, "objekt": 2,
+}
+
+
+class _Frame:
+    """One open bracket group while scanning."""
+
+    __slots__ = ("kind", "atoms", "keys", "key", "nested")
+
+    def __init__(self, kind: str) -> None:
+        self.kind = kind
+        self.atoms: List[str] = []
+        self.keys: List[str | None] = []
+        self.key: str | None = None
+        self.nested = False
+
+    def triple(self) -> Tuple[str, str, str] | None:
+        if self.nested:
             return None
-        triples.append(tuple(parts))
-    return triples
+        if self.kind == "{":
+            slots: List[str | None] = [None, None, None]
+            for key, atom in zip(self.keys, self.atoms):
+                pos = _KEY_POSITIONS.get((key or "").lower())
+                if pos is not None:
+                    slots[pos] = atom
+            if all(slot is not None for slot in slots):
+                return (slots[0], slots[1], slots[2])
+            return None
+        if len(self.atoms) == 3:
+            return (self.atoms[0], self.atoms[1], self.atoms[2])
+        return None
 
 
-def _parse_response(content: str) -> List[Tuple[str, str, str]] | None:
-    """Parse a raw string from the LLM into a list of triples."""
-    text = content.strip()
-    if text.startswith("```") and text.endswith("```"):
-        lines = text.splitlines()
-        if len(lines) >= 3:
-            text = "\n".join(lines[1:-1])
-    # Try JSON first, then Python literal evaluation
-    try:
-        data = json.loads(text)
-    except json.JSONDecodeError:
-        try:
-            data = ast.literal_eval(text)
-        except Exception:
-            import re
-
-            match = re.search(r"\[.*\]", text, re.S)
-            if match:
-                snippet = match.group(0)
-                for parser in (json.loads, ast.literal_eval):
+class TripletScanner:
+    """Linear-time, incremental scanner for triples in LLM output.
+
+    A single pass over the text tracks bracket groups (``[]``, ``()`` and
+    ``{}``) and their atoms. Every innermost group with exactly three atoms
+    (or an object with subject/predicate/object keys) becomes a triple, so
+    JSON, Python literals, unquoted bracket lists and triples embedded in
+    prose are all handled the same way. Atoms may be double- or
+    single-quoted strings or bare text; text outside any group is ignored.
+
+    :meth:`feed` may be called with arbitrary chunks of the text and returns
+    the triples completed by that chunk.
+    """
+
+    def __init__(self) -> None:
+        self.groups = 0
+        self._frames: List[_Frame] = []
+        self._bare: List[str] = []
+        # whether ``_bare`` holds anything but whitespace
+        self._bare_has_content = False
+        self._atom: str | None = None
+        self._quote = ""
+        self._string: List[str] = []
+        self._escape: str | None = None
+
+    # -- atoms ----------------------------------------------------------
+    def _take_atom(self) -> str | None:
+        if self._atom is not None:
+            atom = self._atom.strip()
+        else:
+            atom = "".join(self._bare).strip().strip("'\"").strip()
+            if not atom:
+                atom = None
+        self._atom = None
+        self._bare = []
+        self._bare_has_content = False
+        return atom
+
+    def _end_atom(self) -> None:
+        atom = self._take_atom()
+        if atom is not None and self._frames:
+            frame = self._frames[-1]
+            frame.atoms.append(atom)
+            frame.keys.append(frame.key)
+            frame.key = None
+
+    # -- groups ---------------------------------------------------------
+    def _match_flat(self, text: str, j: int, out: List[Tuple[str, str, str]]) -> int:
+        """Consume a simple three-atom group at ``j`` in one regex match.
+
+        Directly following sibling groups are consumed as well. Returns the
+        position after the last group, or ``j`` if the group needs the
+        general state machine.
+        """
+        pos = j
+        while True:
+            m = _TRIPLE_RE.match(text, pos)
+            if m is None:
+                return pos
+            atoms = []
+            for raw in m.groups():
+                if raw[0] in "'\"":
+                    atoms.append(raw[1:-1].strip())
+                else:
+                    raw = raw.strip()
+                    if not raw:
+                        return pos
+                    atoms.append(raw)
+            if pos == j and self._frames:
+                self._end_atom()
+                self._frames[-1].nested = True
+            self.groups += 1
+            out.append((atoms[0], atoms[1], atoms[2]))
+            # separators between sibling groups carry no atoms
+            pos = _GAP_RE.match(text, m.end()).end()
+
+    def _open(self, kind: str) -> None:
+        if self._frames:
+            self._end_atom()
+            self._frames[-1].nested = True
+        self._frames.append(_Frame(kind))
+
+    def _close(self, out: List[Tuple[str, str, str]]) -> None:
+        self._end_atom()
+        frame = self._frames.pop()
+        self.groups += 1
+        triple = frame.triple()
+        if triple is not None:
+            out.append(triple)
+
+    # -- strings --------------------------------------------------------
+    def _scan_string(self, text: str, i: int) -> int:
+        n = len(text)
+        end_re = _STRING_END_RE[self._quote]
+        while i < n:
+            if self._escape is not None:
+                self._escape += text[i]
+                i += 1
+                seq = self._escape
+                if seq[0] == "u":
+                    if len(seq) < 5:
+                        continue
                     try:
-                        data = parser(snippet)
-                        break
-                    except Exception:
-                        data = None
-                if data is None:
-                    data = _parse_unquoted(snippet)
+                        self._string.append(chr(int(seq[1:5], 16)))
+                    except ValueError:
+                        self._string.append("\\" + seq)
+                else:
+                    self._string.append(_ESCAPES.get(seq, seq))
+                self._escape = None
+                continue
+            m = end_re.search(text, i)
+            if m is None:
+                self._string.append(text[i:])
+                return n
+            self._string.append(text[i:m.start()])
+            char = m.group()
+            if char == "\\":
+                self._escape = ""
+                i = m.end()
+            elif char == "\n":
+                # raw newlines never occur in quoted atoms: it was bare text
+                self._bare = [self._quote, *self._string]
+                self._bare_has_content = True
+                self._string = []
+                self._quote = ""
+                return m.start()
+            else:
+                self._atom = "".join(self._string)
+                self._string = []
+                self._quote = ""
+                return m.end()
+        return i
+
+    # -- driver ---------------------------------------------------------
+    def feed(self, text: str) -> List[Tuple[str, str, str]]:
+        """Consume ``text`` and return the triples it completes."""
+        out: List[Tuple[str, str, str]] = []
+        i = 0
+        n = len(text)
+        while i < n:
+            if self._quote:
+                i = self._scan_string(text, i)
+                continue
+            if not self._frames:
+                m = _OPEN_RE.search(text, i)
+                if m is None:
+                    break
+                i = self._match_flat(text, m.start(), out)
+                if i == m.start():
+                    self._open(m.group())
+                    i = m.end()
+                continue
+            if self._atom is not None:
+                while i < n and text[i].isspace():
+                    i += 1
+                if i == n:
+                    break
+                if text[i] not in _SEPARATORS:
+                    # text after a closing quote: the quotes were apostrophes
+                    self._bare = [f"'{self._atom}'"]
+                    self._bare_has_content = True
+                    self._atom = None
+            m = _SPECIAL_RE.search(text, i)
+            j = m.start() if m else n
+            if j > i:
+                chunk = text[i:j]
+                self._bare.append(chunk)
+                if not self._bare_has_content and not chunk.isspace():
+                    self._bare_has_content = True
+            if m is None:
+                break
+            char = text[j]
+            i = j + 1
+            if char in "[({":
+                end = self._match_flat(text, j, out)
+                if end != j:
+                    i = end
+                else:
+                    self._open(char)
+            elif char in "])}":
+                self._close(out)
+            elif char == ",":
+                self._end_atom()
+            elif char == ":":
+                if self._frames[-1].kind == "{":
+                    self._frames[-1].key = self._take_atom()
+                else:
+                    self._bare.append(char)
+                    self._bare_has_content = True
+            elif self._bare_has_content:
+                self._bare.append(char)
             else:
-                data = _parse_unquoted(text)
-            if data is None:
-                return None
-    if isinstance(data, list):
-        triples: List[Tuple[str, str, str]] = []
-        for item in data:
-            if (
-                isinstance(item, (list, tuple))
-                and len(item) == 3
-            ):
-                triples.append(
-                    (str(item[0]).strip(), str(item[1]).strip(), str(item[2]).strip())
-                )
-        return triples
-    return None
+                self._bare = []
+                self._quote = char
+        return out
+
+
+def _parse_response(content: str) -> List[Tuple[str, str, str]] | None:
+    """Parse a raw string from the LLM into a list of triples.
+
+    Returns ``None`` if ``content`` contains no bracket group at all.
+    """
+    scanner = TripletScanner()
+    triples = scanner.feed(content)
+    if not scanner.groups:
+        return None
+    return triples
+
+
+def _request_triplets(client, text: str, model: str) -> List[Tuple[str, str, str]] | None:
+    """Send one extraction request; ``None`` if the request or parsing failed.
+
+    The model is asked to answer through :data:`TRIPLETS_FUNCTION`; plain
+    text answers are still accepted and parsed with the triple scanner.
+    """
+    messages = [
+        {"role": "system", "content": _SYSTEM_PROMPT},
+        {"role": "user", "content": text},
+    ]
+    try:
+        record_llm_call("chat")
+        if hasattr(client, "chat"):
+            response = client.chat.completions.create(
+                model=model,
+                temperature=TEMPERATURES['chat'],
+                messages=messages,
+                functions=[TRIPLETS_FUNCTION],
+                function_call={"name": TRIPLETS_FUNCTION["name"]},
+            )
+        else:
+            response = client.ChatCompletion.create(
+                model=model,
+                temperature=TEMPERATURES['chat'],
+                messages=messages,
+                functions=[TRIPLETS_FUNCTION],
+                function_call={"name": TRIPLETS_FUNCTION["name"]},
+            )
+    except Exception as exc:
+        logger.error("LLM request failed: %s", exc)
+        return None
+
+    data = extract_structured(response, TRIPLETS_FUNCTION, fallback=_parse_response)
+    if data is None:
+        logger.error("Parsing failed. Text: %r", text)
+        return None
+    # strip the atoms as the triple scanner does for text answers
+    triples = [tuple(str(atom).strip() for atom in t) for t in data["triplets"]]
+    return [t for t in triples if all(t)]
+
+
+def _normalize(value: str) -> str:
+    return " ".join(value.split()).casefold()
+
+
+class TripletMerger:
+    """Merge triples of several chunks into one consistent list.
+
+    Entities and relations are compared case- and whitespace-insensitively;
+    every entity keeps the surface form under which it was first seen, so
+    "Musik" and "musik" from two chunks end up as one node.
+    """
+
+    def __init__(self) -> None:
+        self._names: dict = {}
+        self._seen: set = set()
+
+    def _canonical(self, value: str) -> str:
+        return self._names.setdefault(_normalize(value), value.strip())
+
+    def add(self, triples: List[Tuple[str, str, str]]) -> List[Tuple[str, str, str]]:
+        """Return the triples of ``triples`` not seen before, canonicalised."""
+        new = []
+        for subj, rel, obj in triples:
+            triple = (self._canonical(subj), rel.strip(), self._canonical(obj))
+            key = (_normalize(subj), _normalize(rel), _normalize(obj))
+            if key not in self._seen:
+                self._seen.add(key)
+                new.append(triple)
+        return new
+
+
+def _iter_chunk_results(client, text: str, model: str) -> Iterator[Tuple[int, List[Tuple[str, str, str]]]]:
+    """Extract the chunks of a long ``text`` concurrently.
+
+    Yields ``(chunk_index, triples)`` in completion order.
+    """
+    chunks = chunk_text(
+        text, max_chars=EXTRACTION['chunk_chars'], overlap=EXTRACTION['chunk_overlap']
+    )
+    logger.info("[TripletParser] %d Zeichen in %d Abschnitte geteilt", len(text), len(chunks))
+    workers = max(1, min(EXTRACTION['chunk_workers'], len(chunks)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # each worker runs in a copy of the caller's context so LLM call
+        # tracking sees the chunk requests
+        futures = {
+            pool.submit(contextvars.copy_context().run, _request_triplets, client, chunk, model): idx
+            for idx, chunk in enumerate(chunks)
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result() or []
 
 
 def extract_triplets_via_llm(text: str, model: str = MODELS['chat']) -> List[Tuple[str, str, str]]:
-    """Extract semantic triples from ``text`` using an OpenAI chat model."""
+    """Extract semantic triples from ``text`` using an OpenAI chat model.
+
+    Texts longer than ``EXTRACTION['chunk_chars']`` are split into overlapping
+    sentence-aligned chunks which are extracted concurrently and merged, so
+    latency stays close to that of a single chunk.
+    """
     client = get_client(os.getenv("OPENAI_API_KEY"))
     if client is None:
         logger.error("No OpenAI API key provided or client unavailable")
         return []
 
+    if len(text) <= EXTRACTION['chunk_chars']:
+        return _request_triplets(client, text, model) or []
+
+    results = dict(_iter_chunk_results(client, text, model))
+    merger = TripletMerger()
+    return [t for idx in sorted(results) for t in merger.add(results[idx])]
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+def _pack_batches(items: List[Tuple[int, str]], budget: int) -> List[List[Tuple[int, str]]]:
+    """Greedily group ``(id, text)`` items so each batch fits ``budget``."""
+    batches: List[List[Tuple[int, str]]] = []
+    current: List[Tuple[int, str]] = []
+    used = 0
+    for item in items:
+        cost = _estimate_tokens(item[1])
+        if current and used + cost > budget:
+            batches.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _request_batch(client, batch: List[Tuple[int, str]], model: str) -> dict:
+    """Send one batch and return the parsed ``{id: triples}`` mapping."""
+    content = "\n\n".join(f"[{idx}] {text}" for idx, text in batch)
+    messages = [
+        {"role": "system", "content": _BATCH_PROMPT},
+        {"role": "user", "content": content},
+    ]
     try:
+        record_llm_call("chat")
         if hasattr(client, "chat"):
             response = client.chat.completions.create(
                 model=model,
                 temperature=TEMPERATURES['chat'],
-                messages=[
-                    {"role": "system", "content": _SYSTEM_PROMPT},
-                    {"role": "user", "content": text},
-                ],
+                messages=messages,
             )
+            reply = response.choices[0].message.content
         else:
             response = client.ChatCompletion.create(
                 model=model,
                 temperature=TEMPERATURES['chat'],
-                messages=[
-                    {"role": "system", "content": _SYSTEM_PROMPT},
-                    {"role": "user", "content": text},
-                ],
+                messages=messages,
             )
+            reply = response["choices"][0]["message"]["content"]
     except Exception as exc:
-        logger.error("LLM request failed: %s", exc)
-        return []
+        logger.error("LLM batch request failed: %s", exc)
+        return {}
+
+    data = parse_json_safe(reply or "")
+    if not isinstance(data, dict):
+        logger.warning("Batch response not parseable: %r", (reply or "")[:200])
+        return {}
+    results = {}
+    for idx, _ in batch:
+        value = data.get(str(idx))
+        if isinstance(value, list):
+            results[idx] = _parse_response(json.dumps(value, ensure_ascii=False)) or []
+    return results
+
+
+def extract_triplets_batch(
+    texts: List[str],
+    model: str = MODELS['chat'],
+    token_budget: int = EXTRACTION['batch_token_budget'],
+    max_retries: int = EXTRACTION['batch_retries'],
+    raise_on_failure: bool = False,
+) -> List[List[Tuple[str, str, str]]]:
+    """Extract triples for many texts with as few requests as possible.
+
+    Texts are tagged with their index and packed into requests of at most
+    ``token_budget`` estimated input tokens. The reply maps each index to its
+    triples. Items whose output is missing or unparseable are retried up to
+    ``max_retries`` times, in batches of half the previous budget. Returns
+    one list of triples per input text, in input order. Texts that could not
+    be extracted get an empty list, or raise ``RuntimeError`` with
+    ``raise_on_failure`` so callers can tell them from texts without triples.
+    """
+    results: List[List[Tuple[str, str, str]]] = [[] for _ in texts]
+    pending = [(i, text) for i, text in enumerate(texts) if text and text.strip()]
+    if not pending:
+        return results
+
+    client = get_client(os.getenv("OPENAI_API_KEY"))
+    if client is None:
+        logger.error("No OpenAI API key provided or client unavailable")
+        if raise_on_failure:
+            raise RuntimeError("no LLM client for batch extraction")
+        return results
+
+    budget = token_budget
+    for attempt in range(max_retries + 1):
+        failed: List[Tuple[int, str]] = []
+        for batch in _pack_batches(pending, budget):
+            parsed = _request_batch(client, batch, model)
+            for idx, text in batch:
+                if idx in parsed:
+                    results[idx] = parsed[idx]
+                else:
+                    failed.append((idx, text))
+        if not failed:
+            break
+        logger.info("retrying %d of %d batch items", len(failed), len(pending))
+        pending = failed
+        budget = max(1, budget // 2)
+    else:
+        logger.error("no triples parsed for %d batch items", len(pending))
+        if raise_on_failure:
+            raise RuntimeError(f"no triples parsed for {len(pending)} batch items")
+    return results
 
+
+def _delta_content(chunk) -> str:
+    """Return the text delta of one streamed completion chunk.
+
+    Streamed function-call arguments count as text as well; the triple
+    scanner reads ``{"triplets": [[...], ...]}`` like any other reply.
+    """
     try:
-        content = response.choices[0].message.content
-    except Exception:
+        delta = chunk.choices[0].delta
+        call = getattr(delta, "function_call", None)
+        return delta.content or (call and call.arguments) or ""
+    except AttributeError:
         # Fallback for older client versions
-        content = response["choices"][0]["message"]["content"]
-    triples = _parse_response(content)
-    if triples is None:
-        logger.error("Parsing failed. Text: %r Response: %r", text, content)
-        return []
-    return triples
+        delta = chunk["choices"][0]["delta"]
+        call = delta.get("function_call") or {}
+        return delta.get("content") or call.get("arguments") or ""
+
+
+def stream_triplets_via_llm(text: str, model: str = MODELS['chat']) -> Iterator[Tuple[str, str, str]]:
+    """Yield triples from ``text`` while the completion is still streaming.
+
+    Each triple is yielded as soon as its closing bracket arrives, so callers
+    can update the graph before the model has finished. Long inputs are
+    extracted chunk-wise as in :func:`extract_triplets_via_llm`.
+    """
+    client = get_client(os.getenv("OPENAI_API_KEY"))
+    if client is None:
+        logger.error("No OpenAI API key provided or client unavailable")
+        return
+
+    if len(text) > EXTRACTION['chunk_chars']:
+        # long inputs: yield each chunk's new triples as soon as it is done
+        merger = TripletMerger()
+        for _, triples in _iter_chunk_results(client, text, model):
+            yield from merger.add(triples)
+        return
+
+    messages = [
+        {"role": "system", "content": _SYSTEM_PROMPT},
+        {"role": "user", "content": text},
+    ]
+    try:
+        record_llm_call("chat")
+        if hasattr(client, "chat"):
+            stream = client.chat.completions.create(
+                model=model,
+                temperature=TEMPERATURES['chat'],
+                messages=messages,
+                functions=[TRIPLETS_FUNCTION],
+                function_call={"name": TRIPLETS_FUNCTION["name"]},
+                stream=True,
+            )
+        else:
+            stream = client.ChatCompletion.create(
+                model=model,
+                temperature=TEMPERATURES['chat'],
+                messages=messages,
+                functions=[TRIPLETS_FUNCTION],
+                function_call={"name": TRIPLETS_FUNCTION["name"]},
+                stream=True,
+            )
+    except Exception as exc:
+        logger.error("LLM request failed: %s", exc)
+        return
+
+    scanner = TripletScanner()
+    try:
+        for chunk in stream:
+            piece = _delta_content(chunk)
+            if piece:
+                yield from scanner.feed(piece)
+    except Exception as exc:
+        logger.error("LLM stream interrupted: %s", exc)
+    if not scanner.groups:
+        logger.error("Parsing failed. Text: %r", text)
 
 
 if __name__ == "__main__":
@@ -1,6 +1,12 @@
+import hashlib
 import math
-from collections import Counter
+from collections import Counter, deque
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Sequence, Tuple
+
 import networkx as nx
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
 
 
 def entropy_of_graph(graph: nx.Graph) -> float:
@@ -15,3 +21,432 @@ def entropy_of_graph(graph: nx.Graph) -> float:
         p = freq / total
         entropy -= p * math.log(p, 2)
     return entropy
+
+
+# ----------------------------------------------------------------------
+# Vectorized structural metrics
+
+
+class GraphArrays(NamedTuple):
+    """Edge-list export of a graph as integer arrays.
+
+    ``src`` and ``dst`` hold node indices in ``range(n_nodes)`` and
+    ``relation`` holds one integer relation code per edge.
+    """
+
+    n_nodes: int
+    src: np.ndarray
+    dst: np.ndarray
+    relation: np.ndarray
+
+
+def graph_to_arrays(graph: nx.Graph) -> GraphArrays:
+    """Export ``graph`` into :class:`GraphArrays` in a single edge pass."""
+    index = {node: i for i, node in enumerate(graph)}
+    codes: Dict[object, int] = {}
+    n_edges = graph.number_of_edges()
+    src = np.empty(n_edges, dtype=np.int64)
+    dst = np.empty(n_edges, dtype=np.int64)
+    rel = np.empty(n_edges, dtype=np.int64)
+    for i, (u, v, r) in enumerate(graph.edges(data="relation")):
+        src[i] = index[u]
+        dst[i] = index[v]
+        rel[i] = codes.setdefault(r, len(codes))
+    return GraphArrays(len(index), src, dst, rel)
+
+
+def _matrix_to_arrays(matrix) -> GraphArrays:
+    """Interpret a (sparse) adjacency matrix with edge multiplicities."""
+    coo = sparse.coo_matrix(matrix)
+    counts = coo.data.astype(np.int64)
+    src = np.repeat(coo.row.astype(np.int64), counts)
+    dst = np.repeat(coo.col.astype(np.int64), counts)
+    return GraphArrays(coo.shape[0], src, dst, np.zeros(len(src), dtype=np.int64))
+
+
+def _distribution_entropy(values: np.ndarray) -> float:
+    """Shannon entropy (bits) of the empirical distribution of ``values``."""
+    if not len(values):
+        return 0.0
+    _, counts = np.unique(values, return_counts=True)
+    return _counts_entropy(counts)
+
+
+def _counts_entropy(counts: np.ndarray) -> float:
+    """Shannon entropy (bits) of a histogram given as ``counts``."""
+    counts = counts[counts > 0]
+    if not len(counts):
+        return 0.0
+    p = counts / counts.sum()
+    return float(-(p * np.log2(p)).sum())
+
+
+def graph_metrics(data, clustering_sample: int | None = None, seed: int | None = None) -> Dict[str, float]:
+    """Return several entropy-based structural signals of a graph at once.
+
+    Parameters
+    ----------
+    data:
+        A networkx graph, a :class:`GraphArrays` export or a square adjacency
+        matrix (dense or ``scipy.sparse``) whose entries are edge counts.
+    clustering_sample:
+        If given, the average clustering coefficient is estimated from this
+        many randomly chosen nodes instead of all nodes.
+    seed:
+        Random seed for the clustering sample.
+
+    Returns
+    -------
+    dict
+        ``degree_entropy`` (identical to :func:`entropy_of_graph`),
+        ``in_degree_entropy``, ``out_degree_entropy``, ``relation_entropy``,
+        ``component_entropy`` and ``clustering``.
+    """
+    if isinstance(data, nx.Graph):
+        arrays = graph_to_arrays(data)
+    elif isinstance(data, GraphArrays):
+        arrays = data
+    else:
+        arrays = _matrix_to_arrays(data)
+
+    n = arrays.n_nodes
+    if n == 0:
+        return {
+            "degree_entropy": 0.0,
+            "in_degree_entropy": 0.0,
+            "out_degree_entropy": 0.0,
+            "relation_entropy": 0.0,
+            "component_entropy": 0.0,
+            "clustering": 0.0,
+        }
+
+    out_deg = np.bincount(arrays.src, minlength=n)
+    in_deg = np.bincount(arrays.dst, minlength=n)
+
+    # directed multigraph adjacency with edge multiplicities
+    adj = sparse.csr_matrix(
+        (np.ones(len(arrays.src), dtype=np.int64), (arrays.src, arrays.dst)), shape=(n, n)
+    )
+    _, labels = connected_components(adj, directed=True, connection="weak")
+
+    # simple undirected projection without self-loops for clustering
+    loop_free = arrays.src != arrays.dst
+    u = arrays.src[loop_free]
+    v = arrays.dst[loop_free]
+    und = sparse.csr_matrix(
+        (np.ones(2 * len(u), dtype=np.int64), (np.concatenate((u, v)), np.concatenate((v, u)))),
+        shape=(n, n),
+    )
+    und.sum_duplicates()
+    und.data[:] = 1
+    rows = np.arange(n)
+    if clustering_sample is not None and clustering_sample < n:
+        rng = np.random.default_rng(seed)
+        rows = rng.choice(n, size=clustering_sample, replace=False)
+    sub = und[rows]
+    deg = np.asarray(sub.sum(axis=1)).ravel()
+    triangles = np.asarray((sub @ und).multiply(sub).sum(axis=1)).ravel() / 2
+    possible = deg * (deg - 1)
+    local = np.divide(2 * triangles, possible, out=np.zeros(len(rows)), where=possible > 0)
+
+    return {
+        "degree_entropy": _distribution_entropy(out_deg + in_deg),
+        "in_degree_entropy": _distribution_entropy(in_deg),
+        "out_degree_entropy": _distribution_entropy(out_deg),
+        "relation_entropy": _distribution_entropy(arrays.relation),
+        "component_entropy": _counts_entropy(np.bincount(labels)),
+        "clustering": float(local.mean()),
+    }
+
+
+def degree_entropy_deltas(graph: nx.Graph, increments: Sequence[Mapping]) -> np.ndarray:
+    """Return the degree entropy change for each of several hypothetical updates.
+
+    ``increments[i]`` maps nodes to the number of edge ends update ``i``
+    would add to them; nodes missing from ``graph`` enter as new nodes. All
+    updates are evaluated against the same degree histogram in one batch,
+    without modifying or copying ``graph``.
+    """
+    if not increments:
+        return np.zeros(0)
+    degrees = np.fromiter((d for _, d in graph.degree()), dtype=np.int64, count=len(graph))
+    old = {
+        node: (graph.degree(node) if node in graph else -1)
+        for inc in increments for node in inc
+    }
+    width = max(
+        [int(degrees.max(initial=0))]
+        + [max(old[n], 0) + add for inc in increments for n, add in inc.items()]
+    ) + 1
+    base = np.bincount(degrees, minlength=width).astype(float)
+    after = np.tile(base, (len(increments), 1))
+    for row, inc in enumerate(increments):
+        for node, add in inc.items():
+            if old[node] >= 0:
+                after[row, old[node]] -= 1
+            after[row, max(old[node], 0) + add] += 1
+    totals = after.sum(axis=1, keepdims=True)
+    p = np.divide(after, totals, out=np.zeros_like(after), where=totals > 0)
+    logs = np.log2(p, out=np.zeros_like(p), where=p > 0)
+    return -(p * logs).sum(axis=1) - _counts_entropy(base)
+
+
+# ----------------------------------------------------------------------
+# Streaming approximation
+
+
+def sketch_sample_size(epsilon: float, delta: float) -> int:
+    """Return the node sample size for the requested error bound.
+
+    By Hoeffding's inequality, ``ceil(ln(2 / delta) / (2 * epsilon**2))``
+    sampled nodes estimate the share of every degree class to within
+    ``epsilon`` with probability at least ``1 - delta``.
+    """
+    if not 0 < epsilon < 1 or not 0 < delta < 1:
+        raise ValueError("epsilon and delta must lie in (0, 1)")
+    return math.ceil(math.log(2 / delta) / (2 * epsilon ** 2))
+
+
+def _node_hash(node) -> int:
+    digest = hashlib.blake2b(str(node).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class DegreeEntropySketch:
+    """Estimate degree entropy from an edge stream in bounded memory.
+
+    Nodes are sampled by hash (distinct sampling): a node belongs to the
+    sample while the lowest ``level`` bits of its hash are zero. Whenever the
+    sample outgrows ``capacity`` the level is raised, which evicts about half
+    of the sampled nodes. A sampled node has been in the sample since its
+    first edge, so its degree is exact and the estimate is the degree entropy
+    of a uniform node sample. Updates cost O(1) per edge and estimates
+    O(capacity), independent of the graph size.
+    """
+
+    def __init__(self, epsilon: float = 0.05, delta: float = 0.05, capacity: int | None = None) -> None:
+        # the sample shrinks to about half of ``capacity`` after a level change
+        self.capacity = capacity or 2 * sketch_sample_size(epsilon, delta)
+        self.level = 0
+        self.degrees: Dict[object, int] = {}
+
+    @classmethod
+    def from_graph(cls, graph: nx.Graph, **kwargs) -> "DegreeEntropySketch":
+        """Build a sketch by streaming over the nodes and edges of ``graph``."""
+        sketch = cls(**kwargs)
+        for node in graph.nodes:
+            sketch.add_node(node)
+        for u, v in graph.edges():
+            sketch.add_edge(u, v)
+        return sketch
+
+    def _sampled(self, node) -> bool:
+        return _node_hash(node) & ((1 << self.level) - 1) == 0
+
+    def _shrink(self) -> None:
+        while len(self.degrees) > self.capacity:
+            self.level += 1
+            self.degrees = {n: d for n, d in self.degrees.items() if self._sampled(n)}
+
+    def add_node(self, node) -> None:
+        """Register ``node`` (with degree zero if it is new)."""
+        if node not in self.degrees and self._sampled(node):
+            self.degrees[node] = 0
+            self._shrink()
+
+    def add_edge(self, u, v) -> None:
+        """Account for a new edge between ``u`` and ``v``."""
+        for node in (u, v):
+            if node in self.degrees:
+                self.degrees[node] += 1
+            elif self._sampled(node):
+                self.degrees[node] = 1
+                self._shrink()
+
+    @property
+    def sampling_rate(self) -> float:
+        return 1.0 / (1 << self.level)
+
+    def estimate(self) -> float:
+        """Return the estimated degree entropy in bits."""
+        if not self.degrees:
+            return 0.0
+        counts = np.bincount(np.fromiter(self.degrees.values(), dtype=np.int64))
+        entropy = _counts_entropy(counts)
+        if self.level:
+            # Miller-Madow correction for the downward bias of the plug-in estimate
+            distinct = int((counts > 0).sum())
+            entropy += (distinct - 1) / (2 * len(self.degrees) * math.log(2))
+        return entropy
+
+
+# ----------------------------------------------------------------------
+# Goal-local entropy
+
+
+def goal_anchor_nodes(graph: nx.Graph, goal: str) -> List[str]:
+    """Return the nodes of ``graph`` that represent ``goal``.
+
+    The goal text itself and each of its words (as written, lower-case or
+    capitalized) count if they exist as nodes. Only membership tests are
+    used, so the cost does not depend on the graph size.
+    """
+    anchors: List[str] = []
+    candidates = [goal.strip()]
+    for word in goal.split():
+        word = word.strip(".,;:!?\"'()")
+        candidates.extend([word, word.lower(), word.capitalize()])
+    for cand in candidates:
+        if cand and cand in graph and cand not in anchors:
+            anchors.append(cand)
+    return anchors
+
+
+class EgoEntropyTracker:
+    """Maintain the degree entropy of a k-hop neighbourhood incrementally.
+
+    The tracked subgraph is induced by all nodes within ``hops`` undirected
+    steps of the anchor nodes. Call :meth:`add_edge` after every edge insertion
+    into ``graph``; edges outside the neighbourhood are ignored in O(1) and
+    the remaining work depends only on the local subgraph. Anchors that
+    appear later are added with :meth:`add_anchor`.
+    """
+
+    def __init__(self, graph: nx.MultiDiGraph, anchors: Iterable, hops: int = 2) -> None:
+        self.graph = graph
+        self.hops = hops
+        self.dist: Dict[object, int] = {}
+        self.degree: Dict[object, int] = {}
+        self.hist: Counter = Counter()
+        self.anchors: set = set()
+        for anchor in anchors:
+            self.add_anchor(anchor)
+
+    def _bump(self, node) -> None:
+        old = self.degree[node]
+        self.hist[old] -= 1
+        if not self.hist[old]:
+            del self.hist[old]
+        self.degree[node] = old + 1
+        self.hist[old + 1] += 1
+
+    def _neighbours(self, node):
+        yield from self.graph.successors(node)
+        yield from self.graph.predecessors(node)
+
+    def _enter(self, node, dist: int) -> None:
+        """Add ``node`` to the neighbourhood and count its induced edges."""
+        self.dist[node] = dist
+        self.degree[node] = 0
+        self.hist[0] += 1
+        for _, other in self.graph.out_edges(node):
+            if other in self.dist:
+                self._bump(node)
+                self._bump(other)
+        for other, _ in self.graph.in_edges(node):
+            if other in self.dist and other != node:
+                self._bump(node)
+                self._bump(other)
+
+    def _relax(self, queue: deque) -> None:
+        while queue:
+            node = queue.popleft()
+            dist = self.dist[node]
+            if dist >= self.hops:
+                continue
+            for other in self._neighbours(node):
+                if other not in self.dist:
+                    self._enter(other, dist + 1)
+                    queue.append(other)
+                elif self.dist[other] > dist + 1:
+                    self.dist[other] = dist + 1
+                    queue.append(other)
+
+    def add_anchor(self, node) -> None:
+        """Make ``node`` (already in ``graph``) a centre of the neighbourhood."""
+        if node in self.anchors or node not in self.graph:
+            return
+        self.anchors.add(node)
+        if node in self.dist:
+            self.dist[node] = 0
+        else:
+            self._enter(node, 0)
+        self._relax(deque([node]))
+
+    def add_edge(self, u, v) -> None:
+        """Update the neighbourhood after the edge ``u -> v`` was inserted."""
+        du = self.dist.get(u)
+        dv = self.dist.get(v)
+        if du is None and dv is None:
+            return
+        if du is not None and dv is not None:
+            self._bump(u)
+            self._bump(v)
+            if du + 1 < dv:
+                self.dist[v] = du + 1
+                self._relax(deque([v]))
+            elif dv + 1 < du:
+                self.dist[u] = dv + 1
+                self._relax(deque([u]))
+            return
+        inside, outside = (u, v) if du is not None else (v, u)
+        dist = self.dist[inside]
+        if dist < self.hops:
+            self._enter(outside, dist + 1)
+            self._relax(deque([outside]))
+
+    def __len__(self) -> int:
+        return len(self.dist)
+
+    def entropy(self) -> float:
+        """Return the degree entropy of the tracked neighbourhood in bits."""
+        if not self.hist:
+            return 0.0
+        return _counts_entropy(np.fromiter(self.hist.values(), dtype=np.int64))
+
+
+# ----------------------------------------------------------------------
+# Retroactive entropy trajectories
+
+
+def entropy_trajectory(graph: nx.MultiDiGraph) -> List[Tuple[int, float]]:
+    """Return ``(cycle, entropy)`` after every cycle of a versioned graph.
+
+    Uses the ``cycle`` (and optional ``removed``) tags written by
+    :class:`memory.intention_graph.IntentionGraph`. The result equals
+    ``entropy_of_graph(intention_graph.as_of(cycle))`` for each listed
+    cycle but is computed in one sorted pass over all nodes and edges.
+    """
+    events: List[Tuple[int, int, tuple]] = []
+    for node, cycle in graph.nodes(data="cycle", default=0):
+        events.append((cycle, 0, (node,)))
+    for u, v, data in graph.edges(data=True):
+        events.append((data.get("cycle", 0), 1, (u, v)))
+        if "removed" in data:
+            events.append((data["removed"], 2, (u, v)))
+    events.sort(key=lambda e: (e[0], e[1]))
+
+    degree: Dict[object, int] = {}
+    hist: Counter = Counter()
+
+    def shift(node, step: int) -> None:
+        old = degree[node]
+        hist[old] -= 1
+        if not hist[old]:
+            del hist[old]
+        degree[node] = old + step
+        hist[old + step] += 1
+
+    trajectory: List[Tuple[int, float]] = []
+    for i, (cycle, kind, payload) in enumerate(events):
+        if kind == 0:
+            degree[payload[0]] = 0
+            hist[0] += 1
+        else:
+            step = 1 if kind == 1 else -1
+            shift(payload[0], step)
+            shift(payload[1], step)
+        if i + 1 == len(events) or events[i + 1][0] != cycle:
+            counts = np.fromiter(hist.values(), dtype=np.int64)
+            trajectory.append((cycle, _counts_entropy(counts)))
+    return trajectory
@@ -3,8 +3,9 @@ import json
 import logging
 from typing import Dict, List, Tuple, Optional
 
-from utils.llm_client import get_client
+from utils.llm_client import get_client, record_llm_call
 from goals import goal_manager
+from goals.goal_updater import GoalDecisionContext
 from memory.memory_manager import get_memory_manager
 from cfg.config import PROMPTS, MODELS, TEMPERATURES
 
@@ -23,6 +24,7 @@ def run_llm_task(prompt: str, api_key: str | None = None) -> str:
     messages = [{"role": "user", "content": prompt}]
 
     try:
+        record_llm_call("chat")
         if hasattr(client, "chat"):
             resp = client.chat.completions.create(
                 model=MODELS['chat'],
@@ -86,6 +88,7 @@ def detect_goal_shift(
     ]
 
     try:
+        record_llm_call("chat")
         if hasattr(client, "chat"):
             resp = client.chat.completions.create(
                 model=MODELS['chat'],
@@ -127,8 +130,13 @@ def generate_reflection(
     api_key: str | None = None,
     previous_user_inputs: list[str] | None = None,
     last_system_output: str = "",
+    goal_context: GoalDecisionContext | None = None,
 ) -> Dict[str, object]:
-    """Generate a short reflection addressing the user input and goal."""
+    """Generate a short reflection addressing the user input and goal.
+
+    With a ``goal_context`` that already decided the cycle's goal, the
+    separate goal-shift detection is skipped.
+    """
 
     client = get_client(api_key or os.getenv("OPENAI_API_KEY"))
     if client is None:
@@ -141,13 +149,16 @@ def generate_reflection(
     if not goal.strip():
         goal = f"Erkundung: {last_user_input.strip()[:40]}"
 
-    changed, proposed = detect_goal_shift(
-        last_user_input,
-        goal,
-        api_key=api_key,
-        previous_user_inputs=previous_user_inputs,
-        last_system_output=last_system_output,
-    )
+    if goal_context is not None and goal_context.decided:
+        changed, proposed = False, None
+    else:
+        changed, proposed = detect_goal_shift(
+            last_user_input,
+            goal,
+            api_key=api_key,
+            previous_user_inputs=previous_user_inputs,
+            last_system_output=last_system_output,
+        )
     goal_update_msg = ""
     memory = get_memory_manager()
     if changed and proposed and proposed.strip() and proposed != goal:
@@ -179,6 +190,7 @@ def generate_reflection(
         {"role": "user", "content": user_content},
     ]
 
+    record_llm_call("chat")
     if hasattr(client, "chat"):
         response = client.chat.completions.create(
             model=MODELS['chat'],
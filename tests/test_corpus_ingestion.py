@@ -0,0 +1,108 @@
+import json
+
+from control import corpus_ingestion
+from memory.intention_graph import IntentionGraph
+from parsing.text_chunker import chunk_text
+from parsing.triplet_extractor import dedupe_triplets
+
+
+def make_graph(tmp_path):
+    return IntentionGraph(
+        filepath=str(tmp_path / "graph.gml"), goal_path=str(tmp_path / "goals.gml")
+    )
+
+
+def fake_extractor(chunks):
+    # "A ist B." -> ("A", "ist", "B")
+    out = []
+    for chunk in chunks:
+        triples = []
+        for sentence in chunk.split(". "):
+            words = sentence.strip(". ").split()
+            if len(words) == 3:
+                triples.append(tuple(words))
+        out.append(triples)
+    return out
+
+
+def write_corpus(root):
+    root.mkdir()
+    (root / "a.txt").write_text("Musik ist Kunst. Rhythmus ist Musik.", encoding="utf-8")
+    (root / "sub").mkdir()
+    (root / "sub" / "b.md").write_text("Musik ist Kunst. Kunst hat Form.", encoding="utf-8")
+    (root / "skip.json").write_text("{}", encoding="utf-8")
+
+
+def test_chunk_text_overlap():
+    text = "Eins. Zwei. Drei. Vier."
+    assert chunk_text(text, max_chars=12) == ["Eins. Zwei.", "Drei. Vier."]
+    assert chunk_text(text, max_chars=12, overlap=1) == ["Eins. Zwei.", "Zwei. Drei.", "Drei. Vier."]
+
+
+def test_dedupe_triplets_keeps_order_without_cap():
+    triples = [("a", "b", "c"), ("d", "e", "f"), ("a", "b", "c")] * 6
+    assert dedupe_triplets(triples) == [("a", "b", "c"), ("d", "e", "f")]
+    assert dedupe_triplets(triples, 1) == [("a", "b", "c")]
+
+
+def test_ingest_corpus_dedupes_and_checkpoints(tmp_path):
+    write_corpus(tmp_path / "corpus")
+    ig = make_graph(tmp_path)
+    ckpt = tmp_path / "ckpt.json"
+    report = corpus_ingestion.ingest_corpus(
+        str(tmp_path / "corpus"), ig, checkpoint_path=str(ckpt),
+        workers=2, transaction_size=1, extractor=fake_extractor,
+    )
+    assert report["documents"] == 2
+    assert report["triples"] == 3
+    assert ig.graph.number_of_edges() == 3
+    assert (tmp_path / "graph.gml").exists()
+    assert set(json.loads(ckpt.read_text())["documents"]) == {"a.txt", "sub/b.md"}
+
+
+def test_ingest_corpus_resumes(tmp_path):
+    write_corpus(tmp_path / "corpus")
+    ckpt = tmp_path / "ckpt.json"
+    ckpt.write_text(json.dumps({"documents": {"a.txt": 2}, "triples": 2}), encoding="utf-8")
+    seen = []
+
+    def extractor(chunks):
+        seen.extend(chunks)
+        return fake_extractor(chunks)
+
+    report = corpus_ingestion.ingest_corpus(
+        str(tmp_path / "corpus"), make_graph(tmp_path),
+        checkpoint_path=str(ckpt), extractor=extractor,
+    )
+    assert seen == ["Musik ist Kunst. Kunst hat Form."]
+    assert report["documents"] == 1
+    assert json.loads(ckpt.read_text())["triples"] == 4
+
+
+def test_failed_document_is_retried(tmp_path):
+    write_corpus(tmp_path / "corpus")
+    ckpt = tmp_path / "ckpt.json"
+
+    def flaky(chunks):
+        if "Form" in chunks[0]:
+            raise RuntimeError("timeout")
+        return fake_extractor(chunks)
+
+    corpus_ingestion.ingest_corpus(
+        str(tmp_path / "corpus"), make_graph(tmp_path),
+        checkpoint_path=str(ckpt), extractor=flaky,
+    )
+    assert set(json.loads(ckpt.read_text())["documents"]) == {"a.txt"}
+
+
+def test_run_without_client_checkpoints_nothing(tmp_path, monkeypatch):
+    from parsing import triplet_parser_llm
+
+    monkeypatch.setattr(triplet_parser_llm, "get_client", lambda *a, **k: None)
+    write_corpus(tmp_path / "corpus")
+    ckpt = tmp_path / "ckpt.json"
+    report = corpus_ingestion.ingest_corpus(
+        str(tmp_path / "corpus"), make_graph(tmp_path), checkpoint_path=str(ckpt),
+    )
+    assert report["documents"] == 0
+    assert not ckpt.exists() or json.loads(ckpt.read_text())["documents"] == {}
@@ -0,0 +1,106 @@
+import json
+
+import numpy as np
+import pytest
+
+from logs import cycle_analytics
+
+
+def write_lines(path, records):
+    with path.open("a", encoding="utf-8") as fh:
+        for rec in records:
+            fh.write(json.dumps(rec) + "\n")
+
+
+def make_archive(tmp_path):
+    return cycle_analytics.CycleArchive(
+        directory=str(tmp_path / "analytics"),
+        cycle_log=str(tmp_path / "metabo_log.jsonl"),
+        emotion_log=str(tmp_path / "emotions.jsonl"),
+    )
+
+
+def cycle(ts, before, after, emotion, n_triplets=0):
+    return {
+        "timestamp": ts,
+        "entropy_before": before,
+        "entropy_after": after,
+        "delta": after - before,
+        "emotion": emotion,
+        "intensity": "low",
+        "triplets": [["a", "b", "c"]] * n_triplets,
+    }
+
+
+def test_incremental_export(tmp_path):
+    archive = make_archive(tmp_path)
+    log = tmp_path / "metabo_log.jsonl"
+    write_lines(log, [cycle("2024-01-01T10:00:00", 1.0, 1.5, "negative", 2)])
+    assert archive.export() == 1
+    assert archive.export() == 0
+
+    write_lines(log, [cycle("2024-01-02T10:00:00", 1.5, 1.2, "positive", 1)])
+    write_lines(tmp_path / "emotions.jsonl", [cycle("2024-01-02T11:00:00", 1.2, 1.2, "neutral")])
+    assert archive.export() == 2
+
+    cols = archive.load()
+    assert cols["timestamp"].dtype == np.int64
+    assert list(cols["triplets"]) == [2, 1, 0]
+    assert list(cols["source"]) == [0, 0, 1]
+    assert len(archive.load("emotion")["timestamp"]) == 1
+
+
+def test_partial_line_is_deferred(tmp_path):
+    archive = make_archive(tmp_path)
+    log = tmp_path / "metabo_log.jsonl"
+    log.write_text(json.dumps(cycle("2024-01-01T10:00:00", 0.0, 0.1, "negative")), encoding="utf-8")
+    assert archive.export() == 0
+    with log.open("a", encoding="utf-8") as fh:
+        fh.write("\n")
+    assert archive.export() == 1
+
+
+def test_rebuild_after_truncation(tmp_path):
+    archive = make_archive(tmp_path)
+    log = tmp_path / "metabo_log.jsonl"
+    write_lines(log, [cycle("2024-01-01T10:00:00", 0.0, 0.1, "negative")] * 3)
+    archive.export()
+    log.write_text("", encoding="utf-8")
+    write_lines(log, [cycle("2024-01-05T10:00:00", 0.0, 0.1, "negative")])
+    archive.export()
+    assert len(archive.load()["timestamp"]) == 1
+
+
+def test_cycles_in_both_logs_count_once(tmp_path):
+    archive = make_archive(tmp_path)
+    write_lines(tmp_path / "metabo_log.jsonl", [
+        cycle("2024-01-01T10:00:01", 1.0, 1.5, "negative"),
+        {**cycle("2024-01-01T10:05:00", 1.0, 1.5, "negative"), "timestamp": "kaputt"},
+    ])
+    write_lines(tmp_path / "emotions.jsonl", [
+        cycle("2024-01-01T10:00:00", 1.0, 1.5, "negative"),
+        cycle("2024-01-01T12:00:00", 1.5, 1.2, "positive"),
+    ])
+    assert archive.export() == 3
+    cols = archive.load()
+    assert list(cols["source"]) == [0, 1]
+    assert cycle_analytics.emotion_distribution_per_day(cols) == {
+        "2024-01-01": {"negative": 1, "positive": 1},
+    }
+    assert len(archive.load("emotion")["timestamp"]) == 2
+
+
+def test_queries():
+    ts = np.array(["2024-01-01T00:00", "2024-01-01T12:00", "2024-01-02T00:00"], dtype="datetime64[s]")
+    cols = {
+        "timestamp": ts.astype(np.int64),
+        "entropy_after": np.array([1.0, 1.5, 2.0]),
+        "delta": np.array([0.3, -0.1, 0.4]),
+        "emotion": np.array([2, 1, -1], dtype=np.int8),
+    }
+    assert np.allclose(cycle_analytics.rolling_delta_mean(cols, 2), [0.1, 0.15])
+    assert cycle_analytics.emotion_distribution_per_day(cols) == {
+        "2024-01-01": {"negative": 1, "positive": 1},
+        "2024-01-02": {"unknown": 1},
+    }
+    assert cycle_analytics.entropy_growth_rate(cols) == pytest.approx(1.0)
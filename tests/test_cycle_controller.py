@@ -6,6 +6,7 @@ from control import cycle_controller
 
 
 def test_run_cycle_recall(monkeypatch):
+    monkeypatch.setitem(cycle_controller.ASSIST, "prefetch_next_input", False)
     monkeypatch.setattr(cycle_controller.intent_detector, "classify", lambda t: "recall")
     called = {}
     def fake_recall(scope="global", limit=10):
@@ -16,3 +17,26 @@ def test_run_cycle_recall(monkeypatch):
     res = cycle_controller.run_cycle("hi")
     assert called['scope'] == "conversation"
     assert res["antwort"] == "r"
+
+
+def test_cycle_prefetches_next_input(monkeypatch):
+    from concurrent.futures import Future
+
+    from goals import goal_executor
+
+    monkeypatch.setattr(cycle_controller.intent_detector, "classify", lambda t: "chat")
+    monkeypatch.setattr(
+        cycle_controller, "run_metabo_cycle", lambda x: {"reflection": "r", "goal": "g", "llm_calls": 2}
+    )
+    future = Future()
+    calls = []
+    monkeypatch.setattr(goal_executor, "_PREFETCH", None)
+    monkeypatch.setattr(goal_executor, "prefetch_next", lambda: calls.append(1) or future)
+    assert cycle_controller.run_cycle("hi")["llm_calls"] == 2
+    assert calls == []
+    monkeypatch.setitem(cycle_controller.ASSIST, "prefetch_next_input", True)
+    # the prefetch request counts towards the cycle that started it
+    assert cycle_controller.run_cycle("hi")["llm_calls"] == 3
+    monkeypatch.setattr(goal_executor, "_PREFETCH", (("g", "r"), future))
+    assert cycle_controller.run_cycle("hi")["llm_calls"] == 2
+    assert calls == [1, 1]
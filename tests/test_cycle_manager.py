@@ -53,3 +53,36 @@ def test_first_goal(monkeypatch):
     assert cm.current_goal == "Start"
     assert res["goal"] == "Start"
     assert "Neues Ziel" in res["goal_update"]
+
+
+def test_simple_input_skips_llm(monkeypatch):
+    cm = CycleManager(api_key="x", logger=None)
+    setup_common(monkeypatch, cm)
+    monkeypatch.setattr("control.cycle_manager.goal_engine.update_goal", lambda *a, **k: "Alt")
+    monkeypatch.setattr("control.cycle_manager.run_llm_task", lambda *a, **k: "")
+    calls = []
+    monkeypatch.setattr("control.cycle_manager.extract_triplets_via_llm", lambda text: calls.append(text) or [])
+    monkeypatch.setattr(cm.memory, "store_triplets", lambda t, goal=None: (0.0, 0.0))
+    cm.current_goal = "Alt"
+    assert cm.run_cycle("Musik ist eine Kunst.")["triplets"] == [("Musik", "ist", "Kunst")]
+    assert calls == []
+    cm.run_cycle("Ich glaube, dass Musik wichtig ist.")
+    assert calls == ["Ich glaube, dass Musik wichtig ist."]
+    cm.run_cycle("Ich glaube, dass Musik wichtig ist.")
+    assert len(calls) == 2
+
+
+def test_goal_is_decided_after_the_triples_are_stored(monkeypatch):
+    cm = CycleManager(api_key=None, logger=None)
+    setup_common(monkeypatch, cm)
+    order = []
+    monkeypatch.setattr(
+        cm.memory, "store_triplets", lambda t, goal=None: order.append("store") or (0.0, 0.0)
+    )
+    monkeypatch.setattr(
+        "control.cycle_manager.goal_engine.update_goal",
+        lambda *a, **k: order.append("goal") or "Alt",
+    )
+    cm.current_goal = "Alt"
+    cm.run_cycle("Musik ist eine Kunst.")
+    assert order == ["store", "goal"]
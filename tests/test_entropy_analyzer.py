@@ -0,0 +1,117 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from reasoning import entropy_analyzer
+
+
+def sample_graph():
+    G = nx.MultiDiGraph()
+    G.add_edge("A", "B", relation="ist")
+    G.add_edge("B", "C", relation="ist")
+    G.add_edge("C", "A", relation="hat")
+    G.add_edge("A", "B", relation="hat")
+    G.add_edge("D", "E", relation="ist")
+    G.add_node("F")
+    return G
+
+
+def test_degree_entropy_matches_reference():
+    G = sample_graph()
+    metrics = entropy_analyzer.graph_metrics(G)
+    assert metrics["degree_entropy"] == pytest.approx(entropy_analyzer.entropy_of_graph(G))
+
+
+def test_structural_metrics():
+    metrics = entropy_analyzer.graph_metrics(sample_graph())
+    # relations: ist x3, hat x2
+    assert metrics["relation_entropy"] == pytest.approx(0.970950594)
+    # components of size 3, 2 and 1 over 6 nodes
+    p = np.array([3, 2, 1]) / 6
+    assert metrics["component_entropy"] == pytest.approx(float(-(p * np.log2(p)).sum()))
+    # triangle A-B-C, D/E/F have no clustering
+    assert metrics["clustering"] == pytest.approx(0.5)
+    assert metrics["out_degree_entropy"] > 0
+
+
+def test_adjacency_export_input():
+    G = sample_graph()
+    matrix = nx.to_scipy_sparse_array(G, weight=None)
+    metrics = entropy_analyzer.graph_metrics(matrix)
+    assert metrics["degree_entropy"] == pytest.approx(entropy_analyzer.entropy_of_graph(G))
+    assert metrics["relation_entropy"] == 0.0
+
+
+def test_empty_graph():
+    metrics = entropy_analyzer.graph_metrics(nx.MultiDiGraph())
+    assert set(metrics.values()) == {0.0}
+
+
+def random_graph(n_nodes, n_edges, seed=0):
+    rng = np.random.default_rng(seed)
+    G = nx.MultiDiGraph()
+    G.add_nodes_from(range(n_nodes))
+    G.add_edges_from(zip(rng.integers(0, n_nodes, n_edges), rng.integers(0, n_nodes, n_edges)))
+    return G
+
+
+def test_sketch_exact_when_everything_fits():
+    G = sample_graph()
+    sketch = entropy_analyzer.DegreeEntropySketch.from_graph(G)
+    assert sketch.level == 0
+    assert sketch.estimate() == pytest.approx(entropy_analyzer.entropy_of_graph(G))
+
+
+def test_sketch_bounded_memory_estimate():
+    G = random_graph(20_000, 40_000)
+    sketch = entropy_analyzer.DegreeEntropySketch.from_graph(G, epsilon=0.05, delta=0.05)
+    assert len(sketch.degrees) <= sketch.capacity
+    assert sketch.level > 0
+    assert sketch.estimate() == pytest.approx(entropy_analyzer.entropy_of_graph(G), abs=0.15)
+
+
+def test_sample_size_bounds():
+    assert entropy_analyzer.sketch_sample_size(0.05, 0.05) == 738
+    with pytest.raises(ValueError):
+        entropy_analyzer.sketch_sample_size(0, 0.05)
+
+
+def ego_reference(G, anchors, hops):
+    nodes = set()
+    U = G.to_undirected(as_view=True)
+    for a in anchors:
+        nodes |= set(nx.single_source_shortest_path_length(U, a, cutoff=hops))
+    return entropy_analyzer.entropy_of_graph(G.subgraph(nodes))
+
+
+def test_ego_tracker_incremental_matches_recomputation():
+    rng = np.random.default_rng(1)
+    G = nx.MultiDiGraph()
+    G.add_edge("Musik", "Rhythmus")
+    tracker = entropy_analyzer.EgoEntropyTracker(G, ["Musik"], hops=2)
+    for _ in range(300):
+        u, v = (f"n{x}" for x in rng.integers(0, 60, 2))
+        if rng.random() < 0.1:
+            u = "Musik"
+        G.add_edge(u, v)
+        tracker.add_edge(u, v)
+        assert tracker.entropy() == pytest.approx(ego_reference(G, ["Musik"], 2))
+    assert 0 < len(tracker) < G.number_of_nodes()
+
+
+def test_goal_anchor_nodes():
+    G = nx.MultiDiGraph()
+    G.add_edge("Musik", "Rhythmus")
+    G.add_edge("untersuche die musik", "x")
+    assert entropy_analyzer.goal_anchor_nodes(G, "Untersuche die Musik.") == ["Musik"]
+    assert entropy_analyzer.goal_anchor_nodes(G, "Sport") == []
+
+
+def test_ego_tracker_late_anchor():
+    G = nx.MultiDiGraph([("Musik", "Rhythmus"), ("Kunst", "Form"), ("Form", "Farbe"), ("Farbe", "Licht")])
+    tracker = entropy_analyzer.EgoEntropyTracker(G, ["Musik", "Tanz"], hops=1)
+    G.add_edge("Tanz", "Form")
+    tracker.add_edge("Tanz", "Form")
+    tracker.add_anchor("Tanz")
+    tracker.add_anchor("Kunst")
+    assert tracker.entropy() == pytest.approx(ego_reference(G, ["Musik", "Tanz", "Kunst"], 1))
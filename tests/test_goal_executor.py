@@ -0,0 +1,54 @@
+import threading
+
+import pytest
+
+from goals import goal_executor
+
+
+@pytest.fixture
+def state(monkeypatch):
+    state = {"goal": "Musik", "reflection": "r1", "calls": []}
+    release = threading.Event()
+    release.set()
+
+    def generate(goal, reflection=""):
+        release.wait(2)
+        state["calls"].append((goal, reflection))
+        return f"Weiter mit {goal}"
+
+    monkeypatch.setattr(goal_executor, "get_active_goal", lambda: state["goal"])
+    monkeypatch.setattr(goal_executor, "load_last_reflection", lambda: state["reflection"])
+    monkeypatch.setattr(goal_executor, "generate_next_input", generate)
+    monkeypatch.setattr(goal_executor, "_PREFETCH", None)
+    goal_executor.PREFETCH_STATS.clear()
+    state["release"] = release
+    return state
+
+
+def test_prefetched_input_is_used(state):
+    goal_executor.prefetch_next().result(2)
+    assert goal_executor.run_next() == "Weiter mit Musik"
+    assert state["calls"] == [("Musik", "r1")]
+    assert goal_executor.PREFETCH_STATS == {"hit": 1}
+
+
+def test_prefetch_discarded_when_goal_or_reflection_changes(state):
+    goal_executor.prefetch_next().result(2)
+    state["reflection"] = "r2"
+    assert goal_executor.run_next() == "Weiter mit Musik"
+    assert state["calls"] == [("Musik", "r1"), ("Musik", "r2")]
+    assert goal_executor.PREFETCH_STATS == {"stale": 1, "miss": 1}
+
+
+def test_pending_prefetch_is_awaited_and_not_duplicated(state):
+    state["release"].clear()
+    first = goal_executor.prefetch_next()
+    assert goal_executor.prefetch_next() is first
+    state["release"].set()
+    assert goal_executor.run_next() == "Weiter mit Musik"
+    assert len(state["calls"]) == 1
+
+
+def test_no_prefetch_without_goal(state):
+    state["goal"] = ""
+    assert goal_executor.prefetch_next() is None
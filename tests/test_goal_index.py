@@ -0,0 +1,116 @@
+import random
+
+import networkx as nx
+
+from memory.goal_index import GoalIndex
+from memory.intention_graph import IntentionGraph
+
+
+def assert_consistent(index, edges):
+    graph = nx.DiGraph(edges)
+    order = index.order()
+    assert sorted(order) == sorted(graph.nodes)
+    position = {node: i for i, node in enumerate(order)}
+    sccs = {node: i for i, comp in enumerate(nx.strongly_connected_components(graph)) for node in comp}
+    for u, v in graph.edges:
+        assert index.same_component(u, v) == (sccs[u] == sccs[v])
+        if sccs[u] != sccs[v]:
+            assert position[u] < position[v]
+
+
+def test_order_without_cycles():
+    index = GoalIndex([("C", "D"), ("A", "B"), ("B", "C")])
+    assert index.order() == ["A", "B", "C", "D"]
+    assert index.reachable("A", "D")
+    assert not index.reachable("D", "A")
+
+
+def test_cycle_is_condensed():
+    index = GoalIndex([("A", "B"), ("B", "C"), ("C", "D")])
+    index.add_edge("C", "A")
+    assert index.same_component("A", "C")
+    assert not index.same_component("C", "D")
+    assert index.order()[-1] == "D"
+    assert index.reachable("B", "A")
+    assert index.visited("D")
+    assert not index.visited("E")
+
+
+def test_random_insertions_match_networkx():
+    rng = random.Random(7)
+    for _ in range(20):
+        index = GoalIndex()
+        edges = []
+        for _ in range(60):
+            u, v = rng.randrange(25), rng.randrange(25)
+            if u == v:
+                continue
+            edges.append((u, v))
+            index.add_edge(u, v)
+            assert_consistent(index, edges)
+        graph = nx.DiGraph(edges)
+        for u in list(graph.nodes)[:5]:
+            descendants = nx.descendants(graph, u) | {u}
+            for v in graph.nodes:
+                assert index.reachable(u, v) == (v in descendants)
+
+
+def test_intention_graph_uses_index(tmp_path):
+    ig = IntentionGraph(filepath=str(tmp_path / "graph.gml"), goal_path=str(tmp_path / "goals.gml"))
+    ig.add_goal_transition("Musik", "Rhythmus")
+    ig.add_goal_transition("Rhythmus", "Musik")
+    ig.add_goal_transition("Rhythmus", "Tanz")
+    ig.goal_graph.add_node("Vulkane")
+    assert ig.get_goal_path() == ["Musik", "Rhythmus", "Tanz", "Vulkane"]
+    assert ig.has_visited_goal("Vulkane")
+    assert ig.goal_reachable("Rhythmus", "Musik")
+    assert not ig.goal_reachable("Tanz", "Musik")
+    reloaded = IntentionGraph(filepath=str(tmp_path / "graph.gml"), goal_path=str(tmp_path / "goals.gml"))
+    assert reloaded.get_goal_path()[-1] == "Tanz"
+
+
+def test_paraphrased_goals_share_a_node(tmp_path):
+    ig = IntentionGraph(filepath=str(tmp_path / "graph.gml"), goal_path=str(tmp_path / "goals.gml"))
+    ig.add_goal_transition("Vulkane", "Untersuche Musik")
+    assert ig.add_goal_transition("Vulkane", "Untersuche die Musik") == "Untersuche Musik"
+    assert ig.add_goal_transition("Untersuche Musik", "Untersuche Mathematik") == "Untersuche Mathematik"
+    assert ig.resolve_goal("Musik untersuchen") == "Untersuche Musik"
+    assert ig.get_goal_path() == ["Vulkane", "Untersuche Musik", "Untersuche Mathematik"]
+
+
+def test_direct_goal_graph_edits_reach_the_index(tmp_path):
+    ig = IntentionGraph(filepath=str(tmp_path / "graph.gml"), goal_path=str(tmp_path / "goals.gml"))
+    ig.add_goal_transition("Musik", "Rhythmus")
+    ig.goal_graph.add_node("Tanz")
+    assert not ig.goal_reachable("Rhythmus", "Tanz")
+    # edge between existing goals: the node count stays the same
+    ig.goal_graph.add_edge("Rhythmus", "Tanz")
+    assert ig.goal_reachable("Musik", "Tanz")
+    ig.goal_graph.remove_edge("Rhythmus", "Tanz")
+    ig.goal_graph.add_edge("Tanz", "Musik")
+    assert not ig.goal_reachable("Musik", "Tanz")
+    assert ig.goal_reachable("Tanz", "Rhythmus")
+
+
+def test_rebuild_does_not_embed_known_goals_again(tmp_path, monkeypatch):
+    import numpy as np
+
+    from memory import goal_vectors
+
+    embedded = []
+
+    def embed(texts, api_key=None):
+        embedded.extend(texts)
+        return np.eye(8, dtype=np.float32)[[len(t) % 8 for t in texts]]
+
+    monkeypatch.setattr(goal_vectors, "embed_texts", embed)
+    monkeypatch.setitem(goal_vectors.GOAL_DECISION, "dedup_embeddings", True)
+    ig = IntentionGraph(filepath=str(tmp_path / "graph.gml"), goal_path=str(tmp_path / "goals.gml"))
+    ig.add_goal_transition("Musik", "Rhythmus")
+    ig.add_goal_transition("Rhythmus", "Tanz")
+    embedded.clear()
+    # a removal rebuilds the index
+    ig.goal_graph.remove_node("Tanz")
+    ig.goal_graph.add_node("Oper")
+    assert ig.get_goal_path() == ["Musik", "Rhythmus", "Oper"]
+    assert embedded == ["Oper"]
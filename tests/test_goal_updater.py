@@ -54,3 +54,61 @@ def test_config_prompt():
     from cfg import config
     assert goal_updater._SYSTEM_PROMPT is config.PROMPTS['goal_updater_system']
 
+
+def count_calls(monkeypatch, sim=None):
+    calls = []
+    monkeypatch.setattr(goal_updater, "_embedding_similarity", lambda a, b, k=None: calls.append("emb") or sim)
+    monkeypatch.setattr(goal_updater, "propose_goal", lambda t: calls.append("llm") or "Vorschlag")
+    monkeypatch.setattr(goal_updater, "check_goal_shift", lambda a, b: True)
+    return calls
+
+
+def test_lexical_tier_keeps_goal_without_remote_calls(monkeypatch):
+    calls = count_calls(monkeypatch)
+    goal_updater.TIER_STATS.clear()
+    res = goal_updater.decide_goal("Welche Rolle spielt Rhythmus in der Musik?", "Untersuche Musik und Rhythmus")
+    assert res == ("Untersuche Musik und Rhythmus", False, "lexical")
+    assert calls == []
+    assert goal_updater.tier_report() == {"lexical": 1.0}
+
+
+def test_embedding_tier_settles_clear_cases(monkeypatch):
+    calls = count_calls(monkeypatch, sim=0.9)
+    assert goal_updater.decide_goal("Wie klingt ein Orchester?", "Musik").tier == "embedding"
+    calls = count_calls(monkeypatch, sim=0.2)
+    res = goal_updater.decide_goal("Erzähl mir von Vulkanen", "Musik")
+    assert res == ("Erzähl mir von Vulkanen", True, "embedding")
+    assert calls == ["emb"]
+
+
+def test_llm_only_when_embedding_inconclusive(monkeypatch):
+    calls = count_calls(monkeypatch, sim=0.65)
+    res = goal_updater.decide_goal("Erzähl mir von Vulkanen", "Musik")
+    assert res == ("Vorschlag", True, "llm")
+    assert calls == ["emb", "llm"]
+
+
+def test_explicit_tier(monkeypatch):
+    calls = count_calls(monkeypatch)
+    assert goal_updater.decide_goal("Untersuche Vulkane", "Musik") == ("Vulkane", True, "explicit")
+    assert goal_updater.decide_goal("Analysiere Musik", "Musik").changed is False
+    assert calls == []
+
+
+def test_no_client_falls_back_to_new_topic(monkeypatch):
+    monkeypatch.setattr(goal_updater, "get_client", lambda *a, **k: None)
+    goal_updater.TIER_STATS.clear()
+    text = "Erzähl mir bitte ausführlich von den großen Vulkanen auf Island und ihrer Geschichte."
+    res = goal_updater.GoalDecisionContext(text).decide("Musik")
+    assert res == ("Erzähl mir bitte ausführlich von den großen Vulkanen", True, "fallback")
+    assert goal_updater.GoalDecisionContext("Wie klingt Jazz?").decide("") == ("Wie klingt Jazz", True, "fallback")
+    # a standalone update keeps the goal without a client
+    assert goal_updater.update_goal(text, "Musik", "", []) == "Musik"
+    assert goal_updater.tier_report() == {"fallback": 1.0}
+
+
+def test_embedding_shift_shortens_input(monkeypatch):
+    count_calls(monkeypatch, sim=0.1)
+    text = "Ich habe gestern einen Film über die Tiefsee gesehen und frage mich, wie dort Licht entsteht."
+    res = goal_updater.decide_goal(text, "Musik")
+    assert res == ("Ich habe gestern einen Film über die Tiefsee", True, "embedding")
@@ -0,0 +1,75 @@
+import numpy as np
+
+from memory import goal_vectors
+from memory.goal_vectors import GoalVectorIndex
+
+
+def test_resolve_paraphrases_only():
+    index = GoalVectorIndex(["Untersuche Musik", "Vulkane"], use_embeddings=False)
+    assert index.resolve("Untersuche die Musik") == "Untersuche Musik"
+    assert index.resolve("Untersuche Mathematik") == "Untersuche Mathematik"
+    assert index.nearest("Vulkane") == ("Vulkane", 1.0)
+    assert GoalVectorIndex(use_embeddings=False).nearest("Musik") is None
+
+
+def test_shared_goal_verb_does_not_merge_goals():
+    index = GoalVectorIndex(
+        ["Untersuche Musik", "Untersuche die Rolle von Rhythmus in der Musik"], use_embeddings=False
+    )
+    assert index.resolve("Untersuche Mut") == "Untersuche Mut"
+    melody = "Untersuche die Rolle von Melodie in der Musik"
+    assert index.resolve(melody) == melody
+    assert index.resolve("Analysiere die Rolle des Rhythmus in Musik") == (
+        "Untersuche die Rolle von Rhythmus in der Musik"
+    )
+
+
+def test_index_grows_past_initial_capacity():
+    goals = [f"Ziel Nummer {i}" for i in range(100)]
+    index = GoalVectorIndex(goals[:10], threshold=0.99, use_embeddings=False)
+    for goal in goals[10:]:
+        index.add(goal)
+    assert len(index) == 100
+    assert all(index.nearest(goal + " ")[0] == goal for goal in goals[::7])
+
+
+def test_embeddings_used_when_available(monkeypatch):
+    vectors = {"Musik": [1.0, 0.0], "Klänge": [0.96, 0.28], "Mut": [0.0, 1.0]}
+    requests = []
+
+    def embed(texts, api_key=None):
+        requests.append(list(texts))
+        return np.array([vectors[t] for t in texts], dtype=np.float32)
+
+    monkeypatch.setattr(goal_vectors, "embed_texts", embed)
+    index = GoalVectorIndex(["Musik"], use_embeddings=True)
+    assert index.resolve("Klänge") == "Musik"
+    assert index.resolve("Mut") == "Mut"
+    index.add("Mut")
+    assert requests == [["Musik"], ["Klänge"], ["Mut"]]
+
+
+def test_falls_back_to_trigrams_without_client(monkeypatch):
+    monkeypatch.setattr(goal_vectors, "embed_texts", lambda texts, api_key=None: None)
+    index = GoalVectorIndex(["Untersuche Musik"], use_embeddings=True)
+    assert index.resolve("Untersuche die Musik") == "Untersuche Musik"
+    assert index.resolve("Untersuche Mut") == "Untersuche Mut"
+    assert index.embeddings is False
+
+
+def test_retain_embeds_only_new_goals(monkeypatch):
+    vectors = {"Musik": [1.0, 0.0], "Klänge": [0.96, 0.28], "Mut": [0.0, 1.0], "Tanz": [0.6, 0.8]}
+    requests = []
+
+    def embed(texts, api_key=None):
+        requests.append(list(texts))
+        return np.array([vectors[t] for t in texts], dtype=np.float32)
+
+    monkeypatch.setattr(goal_vectors, "embed_texts", embed)
+    index = GoalVectorIndex(["Musik", "Mut"], use_embeddings=True)
+    index.retain(["Mut", "Tanz"])
+    assert requests == [["Musik", "Mut"], ["Tanz"]]
+    assert "Musik" not in index and len(index) == 2
+    assert index.nearest("Mut") == ("Mut", 1.0)
+    assert index.resolve("Klänge") == "Klänge"
+    assert index.nearest("Klänge")[0] == "Tanz"
@@ -0,0 +1,68 @@
+import pytest
+
+from memory.intention_graph import IntentionGraph
+from reasoning.entropy_analyzer import entropy_of_graph, entropy_trajectory
+
+
+def make_graph(tmp_path):
+    return IntentionGraph(
+        filepath=str(tmp_path / "graph.gml"), goal_path=str(tmp_path / "goals.gml")
+    )
+
+
+def build_history(ig):
+    ig.begin_cycle()
+    ig.add_triplets([("A", "ist", "B")])
+    ig.begin_cycle()
+    ig.add_triplets([("B", "hat", "C"), ("A", "ist", "C")])
+    ig.begin_cycle()
+    ig.add_triplets([("D", "ist", "A")])
+
+
+def test_edges_are_tagged_with_cycle(tmp_path):
+    ig = make_graph(tmp_path)
+    build_history(ig)
+    assert ig.current_cycle == 3
+    assert ig.graph.nodes["C"]["cycle"] == 2
+    assert sorted(c for _, _, c in ig.graph.edges(data="cycle")) == [1, 2, 2, 3]
+
+
+def test_as_of_view(tmp_path):
+    ig = make_graph(tmp_path)
+    build_history(ig)
+    view = ig.as_of(1)
+    assert set(view.nodes) == {"A", "B"}
+    assert view.number_of_edges() == 1
+    assert set(ig.as_of(2).nodes) == {"A", "B", "C"}
+    assert ig.as_of(3).number_of_edges() == ig.graph.number_of_edges()
+    # the view reads through to the live graph without copying
+    ig.graph.edges["A", "B", 0]["removed"] = 3
+    assert ig.as_of(3).number_of_edges() == 3
+    assert ig.as_of(2).number_of_edges() == 3
+
+
+def test_cycle_survives_save(tmp_path):
+    ig = make_graph(tmp_path)
+    build_history(ig)
+    ig.save_graph()
+    loaded = make_graph(tmp_path)
+    assert loaded.current_cycle == 3
+    assert loaded.as_of(2).number_of_edges() == 3
+
+
+def test_entropy_trajectory_matches_views(tmp_path):
+    ig = make_graph(tmp_path)
+    build_history(ig)
+    ig.graph.edges["A", "B", 0]["removed"] = 3
+    trajectory = entropy_trajectory(ig.graph)
+    assert [c for c, _ in trajectory] == [1, 2, 3]
+    for cycle, value in trajectory:
+        assert value == pytest.approx(entropy_of_graph(ig.as_of(cycle)))
+
+
+def test_main_goal_of_active_subgoal_survives_save(tmp_path):
+    ig = make_graph(tmp_path)
+    ig.set_active_subgoal("Musik", "Rhythmus")
+    loaded = make_graph(tmp_path)
+    assert loaded.main_goal_of("Rhythmus") == "Musik"
+    assert loaded.main_goal_of("Melodie") == "Melodie"
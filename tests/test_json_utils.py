@@ -0,0 +1,40 @@
+import time
+
+from utils.json_utils import iter_json_candidates, parse_json_safe
+
+
+def test_plain_and_fenced():
+    assert parse_json_safe('{"a": 1}') == {"a": 1}
+    assert parse_json_safe('```json\n["x", "y"]\n```') == ["x", "y"]
+    assert parse_json_safe("keine Daten") is None
+
+
+def test_prose_between_objects():
+    text = 'Erst {"a": 1}, dann Text, dann {"b": 2}.'
+    assert parse_json_safe(text) == {"a": 1}
+    assert list(iter_json_candidates(text)) == [{"a": 1}, {"b": 2}]
+
+
+def test_invalid_group_is_skipped_as_a_whole():
+    assert parse_json_safe("Text {kein json} dann [1, 2]") == [1, 2]
+    # a fragment of a broken group is not the answer
+    assert parse_json_safe("{ Prosa [1, 2] mehr Prosa }") is None
+    broken = 'Ergebnis: {"triplets": [["A", "ist", "B"], [C ist D]]} und {"ok": 1}'
+    assert list(iter_json_candidates(broken)) == [{"ok": 1}]
+
+
+def test_brackets_inside_strings_are_ignored():
+    assert parse_json_safe('Antwort: {"s": "} ]"} Ende') == {"s": "} ]"}
+    assert parse_json_safe('Er sagte "hallo {x}" und [3]') == [3]
+
+
+def test_mismatch_and_unterminated_string_recover():
+    assert parse_json_safe('[1, 2} {"ok": true}') == {"ok": True}
+    assert parse_json_safe('{"a": "offen\n[4]') == [4]
+
+
+def test_adversarial_input_is_linear():
+    for text in ("{" * 200_000, "[" * 100_000 + "]" * 100_000, "x {a} " * 30_000):
+        start = time.perf_counter()
+        assert parse_json_safe(text) is None
+        assert time.perf_counter() - start < 2.0
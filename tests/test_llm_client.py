@@ -0,0 +1,25 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import llm_client
+
+
+def test_track_llm_calls_counts_per_kind():
+    llm_client.record_llm_call()  # outside a block: ignored
+    with llm_client.track_llm_calls() as calls:
+        llm_client.record_llm_call("chat")
+        llm_client.record_llm_call("embedding")
+        with llm_client.track_llm_calls() as inner:
+            llm_client.record_llm_call("chat")
+        llm_client.record_llm_call("chat")
+    assert calls.total == 4
+    assert calls.by_kind == {"chat": 3, "embedding": 1}
+    assert inner.total == 1
+
+
+def test_worker_threads_with_copied_context():
+    with llm_client.track_llm_calls() as calls:
+        with ThreadPoolExecutor(4) as pool:
+            for _ in range(8):
+                pool.submit(contextvars.copy_context().run, llm_client.record_llm_call)
+    assert calls.total == 8
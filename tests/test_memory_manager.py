@@ -0,0 +1,69 @@
+import pytest
+
+from memory.memory_manager import MemoryManager
+from reasoning.entropy_analyzer import entropy_of_graph
+
+
+def make_manager(tmp_path, **kwargs):
+    return MemoryManager(
+        graph_path=str(tmp_path / "graph.gml"),
+        emotion_log=str(tmp_path / "emotions.jsonl"),
+        reflection_path=str(tmp_path / "reflection.txt"),
+        entropy_path=str(tmp_path / "entropy.txt"),
+        **kwargs,
+    )
+
+
+TRIPLETS = [("A", "ist", "B"), ("B", "hat", "C"), ("C", "ist", "A"), ("D", "ist", "A")]
+
+
+def test_exact_mode(tmp_path):
+    mm = make_manager(tmp_path)
+    before, after = mm.store_triplets(TRIPLETS)
+    assert before == 0.0
+    assert after == pytest.approx(entropy_of_graph(mm.graph.graph))
+
+
+def test_approx_mode_tracks_new_edges(tmp_path):
+    mm = make_manager(tmp_path, entropy_mode="approx")
+    mm.store_triplets(TRIPLETS[:2])
+    _, after = mm.store_triplets(TRIPLETS[2:])
+    # small graphs fit completely into the sketch and are exact
+    assert after == pytest.approx(entropy_of_graph(mm.graph.graph))
+
+
+def test_auto_mode_switches(tmp_path):
+    mm = make_manager(tmp_path, entropy_mode="auto", approx_threshold=3)
+    mm.store_triplets(TRIPLETS[:1])
+    assert mm._sketch is None
+    mm.store_triplets(TRIPLETS[1:])
+    assert mm._sketch is not None
+
+
+def test_invalid_mode(tmp_path):
+    with pytest.raises(ValueError):
+        make_manager(tmp_path, entropy_mode="fast")
+
+
+def test_goal_scope_uses_neighbourhood(tmp_path):
+    mm = make_manager(tmp_path, entropy_scope="goal", ego_hops=1)
+    before, after = mm.store_triplets([("Musik", "hat", "Rhythmus")], goal="Untersuche Musik")
+    assert before == 0.0
+    assert after == 0.0  # two nodes of degree one
+    # far away from the goal: the local signal does not move
+    before, after = mm.store_triplets([("X", "ist", "Y"), ("Y", "ist", "Z")], goal="Untersuche Musik")
+    assert before == after
+    _, after = mm.store_triplets([("Musik", "ist", "Kunst")], goal="Untersuche Musik")
+    sub = mm.graph.graph.subgraph(["Musik", "Rhythmus", "Kunst"])
+    assert after == pytest.approx(entropy_of_graph(sub))
+    # without a goal the global entropy is used
+    assert mm.calculate_entropy() == pytest.approx(entropy_of_graph(mm.graph.graph))
+
+
+def test_goal_scope_picks_up_new_goal_nodes(tmp_path):
+    mm = make_manager(tmp_path, entropy_scope="goal", ego_hops=1)
+    goal = "Untersuche Musik und Tanz"
+    mm.store_triplets([("Musik", "hat", "Rhythmus")], goal=goal)
+    _, after = mm.store_triplets([("Tanz", "braucht", "Raum"), ("Raum", "hat", "Licht")], goal=goal)
+    sub = mm.graph.graph.subgraph(["Musik", "Rhythmus", "Tanz", "Raum"])
+    assert after == pytest.approx(entropy_of_graph(sub))
@@ -6,30 +6,40 @@ import networkx as nx
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from control import metabo_cycle
+from goals import goal_updater
+from memory.intention_graph import IntentionGraph
 
 
 def setup(monkeypatch, tmp_path, goal=""):
     class DummyGraph:
         def __init__(self):
             self.goal_graph = nx.DiGraph()
+            self.graph = nx.MultiDiGraph()
         def snapshot(self):
             return nx.MultiDiGraph()
         def add_triplets(self, t):
             pass
         def add_goal_transition(self, a, b):
             self.goal_graph.add_edge(a, b)
+        def resolve_goal(self, goal):
+            return {"Untersuche die Musik": "Alt"}.get(goal, goal)
         def _save_goal_graph(self):
             pass
+        def begin_cycle(self):
+            return 1
+        set_active_subgoal = IntentionGraph.set_active_subgoal
+        main_goal_of = IntentionGraph.main_goal_of
 
-    mem = types.SimpleNamespace(graph=DummyGraph())
+    mem = types.SimpleNamespace(graph=DummyGraph(), calculate_entropy=lambda goal=None: 0.0)
     monkeypatch.setattr(metabo_cycle, "get_memory_manager", lambda: mem)
     monkeypatch.setattr(metabo_cycle, "MetaboLogger", lambda *a, **k: types.SimpleNamespace(log_cycle=lambda **kw: None))
     monkeypatch.setattr(metabo_cycle, "decompose_goal", lambda g, r: [g])
+    monkeypatch.setattr(metabo_cycle, "rank_subgoals", lambda g, s, graph: [])
     monkeypatch.setattr(metabo_cycle, "execute_first_subgoal", lambda g, s: g)
     monkeypatch.setattr(metabo_cycle, "load_context", lambda g, goal: [])
     monkeypatch.setattr(metabo_cycle, "recall_context", lambda scope="goal", limit=5: [])
     monkeypatch.setattr(metabo_cycle, "generate_reflection", lambda **k: {"reflection": ""})
-    monkeypatch.setattr(metabo_cycle, "extract_triplets_via_llm", lambda text: [])
+    monkeypatch.setattr(metabo_cycle, "stream_triplets_via_llm", lambda text: iter([]))
 
     path = tmp_path / "goal.txt"
     refl = tmp_path / "ref.txt"
@@ -43,8 +53,124 @@ def setup(monkeypatch, tmp_path, goal=""):
 
 def test_goal_switch(monkeypatch, tmp_path):
     setup(monkeypatch, tmp_path, goal="Alt")
-    monkeypatch.setattr(metabo_cycle, "propose_goal", lambda ui: "Neu")
-    monkeypatch.setattr(metabo_cycle, "check_goal_shift", lambda a, b: True)
+    monkeypatch.setattr(goal_updater, "get_client", lambda *a, **k: None)
+    monkeypatch.setattr(goal_updater, "propose_goal", lambda ui: "Neu")
+    monkeypatch.setattr(goal_updater, "check_goal_shift", lambda a, b: True)
     res = metabo_cycle.run_metabo_cycle("User input")
     assert res["goal"] == "Neu"
 
+
+def test_paraphrased_goal_is_no_switch(monkeypatch, tmp_path):
+    setup(monkeypatch, tmp_path, goal="Alt")
+    monkeypatch.setattr(goal_updater, "get_client", lambda *a, **k: None)
+    monkeypatch.setattr(goal_updater, "propose_goal", lambda ui: "Untersuche die Musik")
+    monkeypatch.setattr(goal_updater, "check_goal_shift", lambda a, b: True)
+    res = metabo_cycle.run_metabo_cycle("User input")
+    assert res["goal"] == "Alt"
+    assert metabo_cycle.get_memory_manager().graph.goal_graph.number_of_edges() == 0
+
+
+
+def test_triplets_streamed_into_graph(monkeypatch, tmp_path):
+    setup(monkeypatch, tmp_path, goal="Alt")
+    monkeypatch.setattr(goal_updater, "propose_goal", lambda ui: None)
+    mem = metabo_cycle.get_memory_manager()
+    added = []
+    mem.graph.add_triplets = lambda t: added.extend(t)
+    seen_before_second = []
+
+    def fake_stream(text):
+        yield ("A", "ist", "B")
+        seen_before_second.extend(added)
+        yield ("B", "hat", "C")
+
+    monkeypatch.setattr(metabo_cycle, "stream_triplets_via_llm", fake_stream)
+    res = metabo_cycle.run_metabo_cycle("Alt")
+    assert seen_before_second == [("A", "ist", "B")]
+    assert res["triplets"] == added == [("A", "ist", "B"), ("B", "hat", "C")]
+
+
+def test_goal_decided_once_per_cycle(monkeypatch, tmp_path):
+    from utils.llm_client import record_llm_call
+
+    setup(monkeypatch, tmp_path, goal="Alt")
+    monkeypatch.setattr(goal_updater, "get_client", lambda *a, **k: None)
+    decisions = []
+
+    def propose(ui):
+        decisions.append(ui)
+        record_llm_call()
+        return "Neu"
+
+    monkeypatch.setattr(goal_updater, "propose_goal", propose)
+    monkeypatch.setattr(goal_updater, "check_goal_shift", lambda a, b: True)
+    seen = {}
+    monkeypatch.setattr(metabo_cycle, "generate_reflection", lambda **k: seen.update(k) or {"reflection": ""})
+    res = metabo_cycle.run_metabo_cycle("User input")
+    assert seen["goal_context"] is res["goal_context"]
+    assert res["llm_calls"] == 1
+    assert goal_updater.update_goal("User input", res["goal"], "", [], context=res["goal_context"]) == "Neu"
+    assert decisions == ["User input"]
+
+
+def test_exploration_orders_subgoals(monkeypatch, tmp_path):
+    setup(monkeypatch, tmp_path, goal="Alt")
+    monkeypatch.setattr(goal_updater, "propose_goal", lambda ui: None)
+    monkeypatch.setattr(metabo_cycle, "decompose_goal", lambda g, r: ["erst", "dann"])
+    monkeypatch.setitem(metabo_cycle.PLANNING, "explore_subgoals", True)
+    monkeypatch.setattr(
+        metabo_cycle, "explore_subgoals",
+        lambda goal, subgoals, memory, reflection, merge=True: [
+            types.SimpleNamespace(subgoal=s, triplets=[(s, "ist", "Teilziel")]) for s in reversed(subgoals)
+        ],
+    )
+    events = []
+    mem = metabo_cycle.get_memory_manager()
+    mem.graph.add_triplets = lambda t: events.append(("add", list(t)))
+    mem.calculate_entropy = lambda goal=None: events.append(("entropy", goal)) or 0.0
+    chosen = []
+    monkeypatch.setattr(metabo_cycle, "execute_first_subgoal", lambda g, s: chosen.append(s) or s[0])
+    res = metabo_cycle.run_metabo_cycle("User input")
+    assert chosen == [["dann", "erst"]]
+    assert res["goal"] == "dann"
+    # the explored triples are merged after both entropy measurements
+    assert events == [
+        ("entropy", "dann"), ("entropy", "dann"),
+        ("add", [("dann", "ist", "Teilziel"), ("erst", "ist", "Teilziel")]),
+    ]
+
+
+def test_llm_time_recorded_only_for_requests(monkeypatch, tmp_path):
+    from parsing.rule_extractor import FAST_PATH
+    from utils.llm_client import record_llm_call
+
+    setup(monkeypatch, tmp_path, goal="Alt")
+    monkeypatch.setattr(goal_updater, "propose_goal", lambda ui: None)
+    FAST_PATH.reset()
+    metabo_cycle.run_metabo_cycle("Alt")
+    assert FAST_PATH.llm_calls == 0
+
+    def requesting_stream(text):
+        record_llm_call()
+        yield ("A", "ist", "B")
+
+    monkeypatch.setattr(metabo_cycle, "stream_triplets_via_llm", requesting_stream)
+    metabo_cycle.run_metabo_cycle("Alt")
+    assert FAST_PATH.llm_calls == 1
+
+
+def test_plan_cached_for_main_goal_across_cycles(monkeypatch, tmp_path):
+    setup(monkeypatch, tmp_path, goal="Musik")
+    monkeypatch.setattr(goal_updater, "get_client", lambda *a, **k: None)
+    # the subgoal stage stores the executed subgoal as the goal
+    monkeypatch.setattr(
+        metabo_cycle, "execute_first_subgoal", lambda g, s: metabo_cycle.GoalManager().set_goal(s[0]) or s[0]
+    )
+    plans = []
+    monkeypatch.setattr(metabo_cycle, "decompose_goal", lambda g, r: plans.append(g) or ["Rhythmus", "Melodie"])
+    first = metabo_cycle.run_metabo_cycle("Musik")
+    assert first["goal"] == "Rhythmus"
+    assert metabo_cycle.GoalManager().get_goal() == "Rhythmus"
+    metabo_cycle.run_metabo_cycle("Rhythmus")
+    # the second cycle looks up the plan of "Musik", not of the subgoal
+    assert plans == ["Musik"]
@@ -0,0 +1,79 @@
+import threading
+import time
+import types
+
+from goals import multi_goal
+from goals.multi_goal import MultiGoalScheduler, MultiGoalStore
+from memory.intention_graph import IntentionGraph
+
+
+def make_memory(tmp_path, reductions):
+    graph = IntentionGraph(filepath=str(tmp_path / "graph.gml"), goal_path=str(tmp_path / "goals.gml"))
+
+    def store_triplets(triplets, goal=None):
+        graph.add_triplets(triplets)
+        return 1.0, 1.0 - reductions.get(goal, 0.0)
+
+    return types.SimpleNamespace(graph=graph, store_triplets=store_triplets, load_reflection=lambda: "")
+
+
+def test_store_persists_goals(tmp_path):
+    path = tmp_path / "goals.json"
+    store = MultiGoalStore(str(path))
+    store.add("Musik", priority=2.0)
+    store.add("Vulkane")
+    assert store.remove("Vulkane") and not store.remove("Vulkane")
+    reloaded = MultiGoalStore(str(path))
+    assert list(reloaded.slots) == ["Musik"]
+    assert reloaded.slots["Musik"].priority == 2.0
+
+
+def test_round_runs_llm_stages_concurrently(tmp_path, monkeypatch):
+    active, peak = [], []
+    lock = threading.Lock()
+
+    def fake_llm(prompt, api_key=None):
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        time.sleep(0.05)
+        with lock:
+            active.pop()
+        return prompt.splitlines()[0][len("Ziel: "):]
+
+    monkeypatch.setattr(multi_goal, "run_llm_task", fake_llm)
+    monkeypatch.setattr(multi_goal, "try_local_extraction", lambda text: [(text, "ist", "Ziel")])
+    store = MultiGoalStore(str(tmp_path / "multi.json"))
+    for goal in ("A", "B", "C"):
+        store.add(goal)
+    memory = make_memory(tmp_path, {})
+    sched = MultiGoalScheduler(store, memory, concurrency=3, planner=lambda g, r: [f"{g}1", f"{g}2"])
+    res = sched.run_round()
+    assert max(peak) == 3
+    assert [c["goal"] for c in res["cycles"]] == ["A", "B", "C"]
+    assert memory.graph.graph.has_edge("B", "Ziel")
+    assert memory.graph.current_cycle == 1
+    assert {d["cycle"] for _, _, d in memory.graph.graph.edges(data=True)} == {1}
+    assert MultiGoalStore(str(tmp_path / "multi.json")).slots["C"].subgoals == ["C1", "C2"]
+
+
+def test_goals_with_entropy_reduction_are_preferred(tmp_path, monkeypatch):
+    monkeypatch.setattr(multi_goal, "run_llm_task", lambda prompt, api_key=None: "")
+    store = MultiGoalStore(str(tmp_path / "multi.json"))
+    for goal in ("A", "B", "C"):
+        store.add(goal)
+    memory = make_memory(tmp_path, {"A": 0.0, "B": 0.5, "C": 0.1})
+    sched = MultiGoalScheduler(store, memory, concurrency=1, planner=lambda g, r: [g + "1"])
+    picked = [sched.run_round()["cycles"][0]["goal"] for _ in range(6)]
+    assert picked[:3] == ["A", "B", "C"]  # every goal is measured once
+    assert picked[3:] == ["B", "B", "B"]
+    store.slots["A"].last_round -= 20  # long wait: aging lets A run again
+    assert sched.run_round()["cycles"][0]["goal"] == "A"
+
+
+def test_priority_wins_when_entropy_grows():
+    important = multi_goal.GoalSlot("A", priority=3.0, reductions=[-0.2])
+    minor = multi_goal.GoalSlot("B", priority=1.0, reductions=[-0.2])
+    assert important.score(1) > minor.score(1)
+    # a better reduction still counts at equal priority
+    assert multi_goal.GoalSlot("C", reductions=[-0.1]).score(1) > minor.score(1)
@@ -0,0 +1,104 @@
+import threading
+import time
+
+import pytest
+
+from control.pipeline import Pipeline, Stage, StageTimeout
+from utils.llm_client import record_llm_call, track_llm_calls
+
+
+def test_values_flow_between_stages():
+    pipe = Pipeline([
+        Stage("sum", lambda a, b: a + b, inputs=("a", "b"), outputs=("sum",)),
+        Stage("split", lambda sum: {"half": sum / 2, "double": sum * 2},
+              inputs=("sum",), outputs=("half", "double")),
+    ])
+    values = pipe.run(a=1, b=3)
+    assert (values["sum"], values["half"], values["double"]) == (4, 2.0, 8)
+
+
+def test_independent_stages_run_in_parallel():
+    barrier = threading.Barrier(3, timeout=2)
+    stages = [
+        Stage(name, lambda: barrier.wait(), outputs=(name,)) for name in ("x", "y", "z")
+    ]
+    values = Pipeline(stages, workers=3).run()
+    assert {"x", "y", "z"} <= set(values)
+
+
+def test_after_orders_stages_without_values():
+    order = []
+    pipe = Pipeline([
+        Stage("write", lambda: time.sleep(0.05) or order.append("write")),
+        Stage("read", lambda: order.append("read"), after=("write",)),
+    ])
+    pipe.run()
+    assert order == ["write", "read"]
+
+
+def test_fallback_on_error_and_timeout():
+    def fail(x):
+        raise RuntimeError("kaputt")
+
+    pipe = Pipeline([
+        Stage("fail", fail, inputs=("x",), outputs=("a",), fallback=lambda exc, x: x * 10),
+        Stage("slow", lambda: time.sleep(1), outputs=("b",), timeout=0.05, fallback="spät"),
+        Stage("use", lambda a, b: f"{a}-{b}", inputs=("a", "b"), outputs=("c",)),
+    ])
+    started = time.monotonic()
+    assert pipe.run(x=2)["c"] == "20-spät"
+    assert time.monotonic() - started < 0.5
+
+
+def test_errors_without_fallback_propagate():
+    pipe = Pipeline([Stage("slow", lambda: time.sleep(1), outputs=("a",), timeout=0.05)])
+    with pytest.raises(StageTimeout):
+        pipe.run()
+    pipe = Pipeline([Stage("fail", lambda: 1 / 0, outputs=("a",))])
+    with pytest.raises(ZeroDivisionError):
+        pipe.run()
+
+
+def test_cache_reuses_outputs():
+    calls = []
+    stage = Stage("double", lambda x: calls.append(x) or 2 * x, inputs=("x",),
+                  outputs=("y",), cache_key=lambda x: x, cache_size=1)
+    pipe = Pipeline([stage])
+    assert [pipe.run(x=x)["y"] for x in (1, 1, 2, 1)] == [2, 2, 4, 2]
+    assert calls == [1, 2, 1]
+
+
+def test_invalid_graphs_are_rejected():
+    with pytest.raises(ValueError):
+        Pipeline([
+            Stage("a", lambda b: b, inputs=("b",), outputs=("a",)),
+            Stage("b", lambda a: a, inputs=("a",), outputs=("b",)),
+        ])
+    with pytest.raises(ValueError):
+        Pipeline([Stage("a", lambda: 1, after=("nope",))])
+    with pytest.raises(ValueError):
+        Pipeline([Stage("a", lambda x: x, inputs=("x",))]).run()
+
+
+def test_llm_calls_counted_across_stages():
+    stages = [Stage(name, lambda: record_llm_call(), outputs=(name,)) for name in ("a", "b")]
+    with track_llm_calls() as calls:
+        Pipeline(stages).run()
+    assert calls.total == 2
+
+
+def test_graph_writing_stages_are_never_abandoned(monkeypatch):
+    with pytest.raises(ValueError):
+        Stage("write", lambda: None, timeout=0.1, writes_graph=True)
+    from control import pipeline
+
+    monkeypatch.setitem(pipeline.PIPELINE, "timeouts", {"write": 0.01, "read": 0.01})
+    written = []
+    pipe = Pipeline([
+        Stage("write", lambda: time.sleep(0.1) or written.append(1), outputs=("a",),
+              writes_graph=True),
+        Stage("read", lambda: time.sleep(0.1), outputs=("b",), fallback="spät"),
+    ])
+    values = pipe.run()
+    assert written == [1] and "a" in values
+    assert values["b"] == "spät"
@@ -0,0 +1,47 @@
+from goals import plan_cache
+from memory.intention_graph import IntentionGraph
+
+
+def make_graph(tmp_path):
+    return IntentionGraph(
+        filepath=str(tmp_path / "graph.gml"), goal_path=str(tmp_path / "goals.gml")
+    )
+
+
+def counting_planner(calls):
+    def planner(goal, context):
+        calls.append(goal)
+        return [f"{goal} 1", f"{goal} 2"]
+    return planner
+
+
+def test_plan_reused_until_context_diverges(tmp_path):
+    ig = make_graph(tmp_path)
+    cache = plan_cache.PlanCache(ig, min_similarity=0.5)
+    calls = []
+    planner = counting_planner(calls)
+    context = "Musik entsteht aus Rhythmus und Melodie"
+    assert cache.get_or_plan("Untersuche Musik", context, planner) == ["Untersuche Musik 1", "Untersuche Musik 2"]
+    assert cache.get_or_plan("untersuche  musik", context + " heute", planner)
+    assert calls == ["Untersuche Musik"]
+    cache.get_or_plan("Untersuche Musik", "Vulkane speien glühende Lava", planner)
+    assert len(calls) == 2
+    cache.get_or_plan("Untersuche Sport", context, planner)
+    assert len(calls) == 3
+
+
+def test_plans_survive_restart_and_stay_off_goal_path(tmp_path):
+    ig = make_graph(tmp_path)
+    ig.add_goal_transition("A", "B")
+    plan_cache.PlanCache(ig).store("B", "Kontext über Musik", ["x", "y \"z\""])
+    reloaded = make_graph(tmp_path)
+    assert plan_cache.PlanCache(reloaded).lookup("B", "Kontext über Musik") == ["x", "y \"z\""]
+    assert reloaded.get_goal_path() == ["A", "B"]
+    assert reloaded.goal_graph.has_edge("B", plan_cache.plan_node("B"))
+
+
+def test_fallback_plan_not_cached(tmp_path):
+    ig = make_graph(tmp_path)
+    cache = plan_cache.PlanCache(ig)
+    assert cache.get_or_plan("Ziel", "", lambda g, c: [g]) == ["Ziel"]
+    assert cache.lookup("Ziel", "") is None
@@ -48,3 +48,15 @@ def test_no_goal_switch(monkeypatch):
     assert not hasattr(mem, "edge")
     assert res["explanation"] == ""
 
+
+
+def test_decided_goal_context_skips_detection(monkeypatch):
+    from goals.goal_updater import GoalDecision, GoalDecisionContext
+
+    mem, calls = setup_common(monkeypatch)
+    monkeypatch.setattr(reflection_engine, "detect_goal_shift", lambda *a, **k: calls.setdefault("detect", True))
+    ctx = GoalDecisionContext("Hallo")
+    ctx.decision = GoalDecision("Sport", False, "lexical")
+    res = reflection_engine.generate_reflection("Hallo", "Sport", "", [], goal_context=ctx)
+    assert "detect" not in calls
+    assert res["reflection"] == "resp"
@@ -0,0 +1,66 @@
+import pytest
+
+from parsing import rule_extractor
+
+
+@pytest.mark.parametrize(
+    "sentence, expected",
+    [
+        ("Musik ist eine Kunst.", [("Musik", "ist", "Kunst")]),
+        ("Die Musik hat Rhythmus, Melodie und Harmonie.",
+         [("Musik", "hat", "Rhythmus"), ("Musik", "hat", "Melodie"), ("Musik", "hat", "Harmonie")]),
+        ("Musik besteht aus Tönen.", [("Musik", "besteht aus", "Tönen")]),
+        ("Musik ist eine Kunst mit Rhythmus.", [("Musik", "ist", "Kunst"), ("Kunst", "mit", "Rhythmus")]),
+        ("Musik ist schön und teuer.", [("Musik", "ist", "schön"), ("Musik", "ist", "teuer")]),
+        ("Anna kennt Peter.", [("Anna", "kennt", "Peter")]),
+    ],
+)
+def test_patterns(sentence, expected):
+    result = rule_extractor.extract_triplets_local(sentence)
+    assert result.triplets == expected
+    assert result.confidence >= 0.8
+
+
+@pytest.mark.parametrize(
+    "sentence",
+    ["Er liebt Musik.", "Musik ist nicht laut.", "Ich glaube, dass Musik wichtig ist.", "Wie klingt Musik?"],
+)
+def test_complex_sentences_score_zero(sentence):
+    assert rule_extractor.extract_triplets_local(sentence) == ([], 0.0)
+
+
+@pytest.mark.parametrize(
+    "sentence",
+    [
+        "Die Stadt ist groß und Paris ist schön.",
+        "Musik ist schön, aber teuer.",
+        "Am Montag ist Schule.",
+        "Anna kennt Peter seit 2010.",
+        "Musik ist eine Kunst mit Rhythmus seit 1900.",
+    ],
+)
+def test_misleading_sentences_score_zero(sentence):
+    assert rule_extractor.extract_triplets_local(sentence) == ([], 0.0)
+
+
+def test_confidence_is_mean_over_sentences():
+    result = rule_extractor.extract_triplets_local("Musik ist Kunst. Er sagte etwas.")
+    assert result.triplets == [("Musik", "ist", "Kunst")]
+    assert result.confidence == pytest.approx(0.5)
+    assert rule_extractor.extract_triplets_local("Das Gehirn verarbeitet Klänge.").confidence < 0.8
+
+
+def test_fast_path_stats():
+    stats = rule_extractor.FastPathStats()
+    stats.record_local(0.001, skipped=True)
+    stats.record_local(0.001, skipped=False)
+    stats.record_llm(1.0)
+    report = stats.report()
+    assert report["skip_rate"] == 0.5
+    assert report["saved_seconds"] == pytest.approx(0.998)
+
+
+def test_try_local_extraction_threshold():
+    assert rule_extractor.try_local_extraction("Musik ist Kunst.") == [("Musik", "ist", "Kunst")]
+    assert rule_extractor.try_local_extraction("Musik ist Kunst. Er sagte etwas.") is None
+    assert rule_extractor.try_local_extraction("Musik ist Kunst. Er sagte etwas.", threshold=0.5)
@@ -0,0 +1,55 @@
+import json
+import types
+
+from utils import structured_output as so
+
+
+def response(content=None, name=None, arguments=None):
+    call = types.SimpleNamespace(name=name, arguments=arguments) if name else None
+    message = types.SimpleNamespace(content=content, function_call=call)
+    return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+
+def setup_function():
+    so.reset_structured_output_stats()
+
+
+def test_function_call_arguments_are_validated():
+    args = json.dumps({"triplets": [["A", "ist", "B"]]})
+    data = so.extract_structured(response(name="report_triplets", arguments=args), so.TRIPLETS_FUNCTION)
+    assert data == {"triplets": [["A", "ist", "B"]]}
+    assert so.structured_output_stats()["report_triplets"]["valid"] == 1
+
+
+def test_near_misses_are_repaired_locally():
+    content = json.dumps([
+        {"subject": "A", "predicate": "hat", "object": "B"},
+        ["X", "Y", "Z", "W"],
+        ["C", "ist", 3],
+    ])
+    data = so.extract_structured(response(content=content), so.TRIPLETS_FUNCTION)
+    assert data == {"triplets": [["A", "hat", "B"], ["C", "ist", "3"]]}
+
+    data = so.extract_structured(
+        response(content='{"subgoals": "[\\"a\\", \\"b\\"]"}'), so.SUBGOALS_FUNCTION
+    )
+    assert data == {"subgoals": ["a", "b"]}
+    stats = so.structured_output_stats()
+    assert stats["report_triplets"]["repaired"] == 1
+    assert stats["report_subgoals"]["repair_rate"] == 1.0
+
+
+def test_fallback_and_failure_rate():
+    fallback = lambda text: [("Er", "liebt", "Musik")] if "Musik" in text else None
+    data = so.extract_structured(response(content="(Er, liebt, Musik)"), so.TRIPLETS_FUNCTION, fallback)
+    assert data == {"triplets": [["Er", "liebt", "Musik"]]}
+    assert so.extract_structured(response(content="nichts"), so.TRIPLETS_FUNCTION, fallback) is None
+    assert so.extract_structured(response(content='{"subgoals": []}'), so.SUBGOALS_FUNCTION) is None
+    stats = so.structured_output_stats()
+    assert stats["report_triplets"]["failure_rate"] == 0.5
+    assert stats["report_subgoals"]["failed"] == 1
+
+
+def test_validate_reports_paths():
+    errors = so.validate({"triplets": [["A", "B"]]}, so.TRIPLETS_FUNCTION["parameters"])
+    assert errors == ["$.triplets[0]: fewer than 3 items"]
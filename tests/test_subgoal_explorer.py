@@ -0,0 +1,78 @@
+import threading
+import time
+import types
+
+import networkx as nx
+
+from goals import subgoal_explorer
+
+
+def make_memory():
+    graph = nx.MultiDiGraph()
+    graph.add_edge("Musik", "Rhythmus", relation="hat")
+    graph.add_edge("Musik", "Melodie", relation="hat")
+    batches = []
+
+    def add_triplets(triplets):
+        batches.append(list(triplets))
+        for s, r, o in triplets:
+            graph.add_edge(s, o, relation=r)
+
+    return types.SimpleNamespace(graph=types.SimpleNamespace(graph=graph, add_triplets=add_triplets)), batches
+
+
+def test_subgoals_explored_concurrently_and_merged_once(monkeypatch):
+    memory, batches = make_memory()
+    active = []
+    peak = []
+    lock = threading.Lock()
+    facts = {
+        "Rhythmus": [("Rhythmus", "hat", "Takt")],
+        "Harmonie": [("Harmonie", "hat", "Akkord"), ("Akkord", "hat", "Ton")],
+        "Melodie": [("Musik", "hat", "Melodie")],
+    }
+
+    def fake_llm(prompt, api_key=None):
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        time.sleep(0.05)
+        with lock:
+            active.pop()
+        return next(k for k in facts if f"Teilziel: {k}" in prompt)
+
+    monkeypatch.setattr(subgoal_explorer, "run_llm_task", fake_llm)
+    monkeypatch.setattr(subgoal_explorer, "try_local_extraction", lambda text: facts[text])
+    result = subgoal_explorer.explore_subgoals("Musik", list(facts), memory, workers=3)
+
+    assert max(peak) == 3
+    assert len(batches) == 1 and len(batches[0]) == 4
+    assert [e.delta for e in result] == sorted(e.delta for e in result)
+    assert {e.subgoal for e in result} == set(facts)
+    assert memory.graph.graph.has_edge("Akkord", "Ton")
+
+
+def test_failed_mini_cycle_counts_as_empty(monkeypatch):
+    memory, batches = make_memory()
+
+    def fake_llm(prompt, api_key=None):
+        if "Teilziel: B" in prompt:
+            raise RuntimeError("boom")
+        return "ok"
+
+    monkeypatch.setattr(subgoal_explorer, "run_llm_task", fake_llm)
+    monkeypatch.setattr(subgoal_explorer, "try_local_extraction", lambda text: [("Musik", "ist", "Kunst")])
+    result = subgoal_explorer.explore_subgoals("Musik", ["A", "B"], memory)
+    assert {e.subgoal: e.triplets for e in result}["B"] == []
+    assert batches == [[("Musik", "ist", "Kunst")]]
+    assert subgoal_explorer.explore_subgoals("Musik", [" "], memory) == []
+
+
+def test_merge_can_be_deferred(monkeypatch):
+    memory, batches = make_memory()
+    monkeypatch.setattr(subgoal_explorer, "run_llm_task", lambda prompt, api_key=None: "ok")
+    monkeypatch.setattr(subgoal_explorer, "try_local_extraction", lambda text: [("Musik", "ist", "Kunst")])
+    result = subgoal_explorer.explore_subgoals("Musik", ["A", "B"], memory, merge=False)
+    assert batches == []
+    assert subgoal_explorer.merge_explorations(memory, result) == [("Musik", "ist", "Kunst")]
+    assert batches == [[("Musik", "ist", "Kunst")]]
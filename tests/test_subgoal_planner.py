@@ -32,6 +32,22 @@ def test_json_reply(monkeypatch):
     assert res == ["a", "b"]
 
 
+def test_subgoals_are_stripped(monkeypatch):
+    arguments = '{"subgoals": ["  Rhythmus klären ", "", "   ", "Melodie\\n"]}'
+    message = types.SimpleNamespace(
+        content=None,
+        function_call=types.SimpleNamespace(name="report_subgoals", arguments=arguments),
+    )
+    dummy = types.SimpleNamespace(
+        chat=types.SimpleNamespace(
+            completions=types.SimpleNamespace(create=lambda **k: types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)]))
+        )
+    )
+    monkeypatch.setattr(subgoal_planner, "get_client", lambda *a, **k: dummy)
+    monkeypatch.setenv("OPENAI_API_KEY", "x")
+    assert subgoal_planner.decompose_goal("Goal") == ["Rhythmus klären", "Melodie"]
+
+
 def test_line_reply(monkeypatch):
     class Dummy:
         def __init__(self):
@@ -68,3 +84,21 @@ def test_config_defaults():
     sig = inspect.signature(subgoal_planner.decompose_goal)
     assert sig.parameters['model'].default == config.MODELS['subgoal']
 
+
+
+def test_function_call_reply(monkeypatch):
+    calls = {}
+
+    class Dummy:
+        def __init__(self):
+            self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self.create))
+
+        def create(self, **kwargs):
+            calls.update(kwargs)
+            fc = types.SimpleNamespace(name="report_subgoals", arguments='{"subgoals": ["x", "y"]}')
+            msg = types.SimpleNamespace(content=None, function_call=fc)
+            return types.SimpleNamespace(choices=[types.SimpleNamespace(message=msg)])
+
+    monkeypatch.setattr(subgoal_planner, "get_client", lambda *a, **k: Dummy())
+    assert subgoal_planner.decompose_goal("Goal") == ["x", "y"]
+    assert calls["function_call"] == {"name": "report_subgoals"}
@@ -0,0 +1,70 @@
+import networkx as nx
+import numpy as np
+
+from goals import subgoal_scorer
+from reasoning.entropy_analyzer import degree_entropy_deltas, entropy_of_graph
+
+
+def music_graph():
+    g = nx.MultiDiGraph()
+    g.add_edge("Musik", "Rhythmus", relation="hat")
+    g.add_edge("Musik", "Melodie", relation="hat")
+    g.add_edge("Rhythmus", "Takt", relation="hat")
+    return g
+
+
+def test_rank_prefers_relevant_grounded_subgoal():
+    ranked = subgoal_scorer.rank_subgoals(
+        "Untersuche Musik",
+        ["Sammle Daten über Vulkane", "Untersuche den Rhythmus der Musik", " "],
+        music_graph(),
+    )
+    assert [r.subgoal for r in ranked] == ["Untersuche den Rhythmus der Musik", "Sammle Daten über Vulkane"]
+    best = ranked[0]
+    assert best.overlap == 2 / 3
+    assert 0.0 <= best.novelty <= 1.0 and best.relevance > ranked[1].relevance
+
+
+def test_novelty_follows_entropy_of_extended_graph():
+    graph = music_graph()
+    ranked = subgoal_scorer.rank_subgoals(
+        "Musik", ["Musik und Harmonie", "Takt"], graph, use_embeddings=False
+    )
+    # "Harmonie" is new, "Musik" gains an edge; "Takt" only gains an edge
+    novelty = {r.subgoal: r.novelty for r in ranked}
+    assert novelty == {"Musik und Harmonie": 1.0, "Takt": 0.0}
+
+
+def test_degree_entropy_deltas_match_updated_graph():
+    graph = music_graph()
+    base = entropy_of_graph(graph)
+    updates = [{"Musik": 1, "Harmonie": 1}, {"Takt": 1}, {"Takt": 2, "Neu": 3}]
+    deltas = degree_entropy_deltas(graph, updates)
+    assert deltas.shape == (3,)
+    for delta, update in zip(deltas, updates):
+        assert np.isclose(delta, _entropy_with(graph, update) - base)
+    assert degree_entropy_deltas(graph, []).shape == (0,)
+
+
+def _entropy_with(graph, increments):
+    degrees = dict(graph.degree())
+    for node, add in increments.items():
+        degrees[node] = degrees.get(node, 0) + add
+    counts = np.bincount(list(degrees.values()))
+    p = counts[counts > 0] / counts.sum()
+    return float(-(p * np.log2(p)).sum())
+
+
+def test_embeddings_requested_once_for_all_subgoals(monkeypatch):
+    calls = []
+
+    def fake_embed(texts, api_key=None):
+        calls.append(list(texts))
+        return subgoal_scorer.hash_vectors(texts)
+
+    monkeypatch.setattr(subgoal_scorer, "embed_texts", fake_embed)
+    subgoals = [f"Teilziel {i}" for i in range(8)]
+    ranked = subgoal_scorer.rank_subgoals("Ziel", subgoals, use_embeddings=True)
+    assert len(ranked) == 8
+    assert calls == [["Ziel", *subgoals]]
+    assert subgoal_scorer.rank_subgoals("Ziel", []) == []
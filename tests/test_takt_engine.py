@@ -5,14 +5,20 @@ import types
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from control import takt_engine
+from utils.llm_client import record_llm_call
 
 
 class DummyMem:
     def __init__(self):
         self.val = 0.0
-        self.graph = types.SimpleNamespace(add_goal_transition=lambda a,b: None)
+        self.cycles = 0
+        self.graph = types.SimpleNamespace(add_goal_transition=lambda a,b: None, begin_cycle=self.begin_cycle)
 
-    def calculate_entropy(self):
+    def begin_cycle(self):
+        self.cycles += 1
+        return self.cycles
+
+    def calculate_entropy(self, goal=None):
         return 0.4
 
     def load_last_entropy(self):
@@ -56,3 +62,33 @@ def test_metabotakt_goal_change(monkeypatch):
     res = takt_engine.run_metabotakt(api_key=None)
     assert res["goal"] == "B"
     assert "Neues Ziel" in res["goal_update"]
+
+
+def test_batch_reflects_only_when_gate_opens(monkeypatch):
+    mem = setup(monkeypatch)
+    entropies = iter([0.22, 0.24, 0.26, 0.4, 0.41])
+    mem.calculate_entropy = lambda goal=None: next(entropies)
+    mem.load_last_entropy = lambda: mem.val or 0.2
+    reflections = []
+    monkeypatch.setattr(
+        takt_engine, "run_llm_task",
+        lambda *a, **k: record_llm_call("chat") or reflections.append(1) or "ref",
+    )
+    res = takt_engine.run_metabotakt_batch(5, threshold=0.05)
+    # ΔE 0.02, 0.02, 0.02 (sum crosses 0.05), 0.14 (emotion changes), 0.01
+    assert [t["gated"] for t in res["takts"]] == [True, True, False, False, True]
+    assert res["reflections"] == 2 and len(reflections) == 2
+    assert res["llm_calls"] == 2
+    assert res["llm_calls_avoided"] == 3
+    assert mem.cycles == 5
+
+
+def test_gate_emotion_change_opens():
+    gate = takt_engine.TaktGate(threshold=1.0)
+    assert gate.should_reflect(0.0, "neutral") is False
+    # nothing measured yet: the configured cost of a reflection is assumed
+    assert gate.llm_calls_avoided == takt_engine.TAKT['calls_per_reflection']
+    assert gate.should_reflect(-0.06, "positive") is True
+    gate.record_calls(3)
+    assert gate.should_reflect(0.0, "positive") is False
+    assert gate.llm_calls_avoided == 6
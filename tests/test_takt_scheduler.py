@@ -0,0 +1,75 @@
+import threading
+import time
+
+from control import takt_scheduler
+from control.takt_scheduler import TaktScheduler
+from utils.llm_client import record_llm_call
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def fake_takt(deltas, calls=1):
+    results = iter(deltas)
+
+    def takt(api_key=None):
+        for _ in range(calls):
+            record_llm_call("chat")
+        return {"delta": next(results)}
+
+    return takt
+
+
+def test_interval_backs_off_when_stable_and_speeds_up_on_churn():
+    sched = TaktScheduler(fake_takt([0.0, 0.0, 0.5, 0.5, 0.1]), interval=60, min_interval=15,
+                          max_interval=200, calls_per_hour=100)
+    intervals = []
+    for _ in range(5):
+        sched.run_once()
+        intervals.append(sched.interval)
+    assert intervals == [120, 200, 100, 50, 50]
+
+
+def test_hourly_llm_budget():
+    clock = Clock()
+    sched = TaktScheduler(fake_takt([0.0] * 10, calls=2), calls_per_hour=5, clock=clock)
+    assert sched.run_once() is not None
+    assert sched.run_once() is not None
+    assert sched.run_once() is None  # 4 used, the next takt would need 2
+    assert (sched.takts, sched.skipped) == (2, 1)
+    clock.now = 3601
+    assert sched.run_once() is not None
+
+
+def test_default_takt_is_looked_up_at_call_time(monkeypatch):
+    monkeypatch.setattr(takt_scheduler.takt_engine, "run_metabotakt", lambda api_key=None, gate=None: {"delta": 0.2, "gate": gate})
+    sched = TaktScheduler(calls_per_hour=10)
+    assert sched.run_once() == {"delta": 0.2, "gate": sched.gate}
+
+
+def test_background_thread_pauses_during_user_cycle():
+    results = []
+    running = threading.Event()
+
+    def takt(api_key=None):
+        running.set()
+        return {"delta": 0.5}
+
+    sched = TaktScheduler(takt, on_result=results.append, interval=0.01, min_interval=0.01,
+                          max_interval=0.01, calls_per_hour=100)
+    with sched.user_cycle():
+        sched.start()
+        time.sleep(0.1)
+        assert not running.is_set()
+    assert running.wait(2)
+    deadline = time.time() + 2
+    while len(results) < 3 and time.time() < deadline:
+        time.sleep(0.01)
+    sched.stop(timeout=2)
+    assert not sched.running
+    assert len(results) >= 3
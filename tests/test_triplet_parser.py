@@ -13,3 +13,231 @@ def test_parse_newline_brackets():
         ("Es", "bedeutet", "bestehende Verknüpfungen zu überdenken"),
         ("Es", "bedeutet", "durch Reflexion und Anpassung an neue Herausforderungen zu wachsen"),
     ]
+
+
+# (model output, expected triples) pairs for the formats seen in practice
+CORPUS = [
+    ('[["Freiheit", "ist", "Selbstbestimmung"]]', [("Freiheit", "ist", "Selbstbestimmung")]),
+    ("[('Musik', 'hat', 'Rhythmus'), ('Musik', 'ist', 'Kunst')]",
+     [("Musik", "hat", "Rhythmus"), ("Musik", "ist", "Kunst")]),
+    ("```json\n[[\"A\", \"B\", \"C\"]]\n```", [("A", "B", "C")]),
+    ("```python\n[('A', 'B', 'C')]\n```", [("A", "B", "C")]),
+    ("Hier sind die Tripel: [(Er, liebt, Musik)] Viel Spaß!", [("Er", "liebt", "Musik")]),
+    ("[Es, ist's, gut]", [("Es", "ist's", "gut")]),
+    ("[('Es', 'ist's', 'gut')]", [("Es", "ist's", "gut")]),
+    ('[["Zitat", "lautet", "Er sagte \\"Hallo\\""]]', [("Zitat", "lautet", 'Er sagte "Hallo"')]),
+    ('[["Stra\\u00dfe", "ist", "lang"]]', [("Straße", "ist", "lang")]),
+    ('{"triplets": [["A", "B", "C"]]}', [("A", "B", "C")]),
+    ('[{"subject": "A", "predicate": "B", "object": "C"}]', [("A", "B", "C")]),
+    ("[('A', 'B', 'C',)]", [("A", "B", "C")]),
+    ("[('A', 'B'), ('A', 'B', 'C', 'D'), ('X', 'Y', 'Z')]", [("X", "Y", "Z")]),
+    ("[]", []),
+]
+
+
+def test_corpus():
+    for content, expected in CORPUS:
+        assert triplet_parser_llm._parse_response(content) == expected, content
+
+
+def test_no_brackets_returns_none():
+    assert triplet_parser_llm._parse_response("Keine Tripel gefunden.") is None
+
+
+def test_chunked_feed_matches_whole():
+    import random
+
+    rng = random.Random(0)
+    for content, expected in CORPUS:
+        for _ in range(20):
+            scanner = triplet_parser_llm.TripletScanner()
+            cuts = sorted(rng.sample(range(len(content) + 1), k=min(4, len(content))))
+            found = []
+            for a, b in zip([0] + cuts, cuts + [len(content)]):
+                found.extend(scanner.feed(content[a:b]))
+            assert found == expected, content
+
+
+def test_fuzz_never_raises():
+    import random
+
+    rng = random.Random(42)
+    alphabet = "[](){}'\",:\\ \nabcuß0"
+    for _ in range(2000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+        result = triplet_parser_llm._parse_response(text)
+        assert result is None or all(
+            isinstance(t, tuple) and len(t) == 3 and all(isinstance(x, str) for x in t)
+            for t in result
+        )
+
+
+def test_adversarial_input_is_linear():
+    import time
+
+    scanner = triplet_parser_llm.TripletScanner()
+    started = time.perf_counter()
+    scanner.feed("[" + " " * 2000 + "x" + " " * 2000 + "]")
+    scanner.feed("[" + "a'" * 40000 + "]")
+    spaced = "[" + " " * 2000 + "a b" + " " * 2000 + "," + " c ,d]"
+    assert triplet_parser_llm._parse_response(spaced) == [("a b", "c", "d")]
+    assert time.perf_counter() - started < 1.0
+
+
+def test_stream_yields_triples_per_chunk(monkeypatch):
+    import types
+
+    pieces = ['[("Mus', 'ik", "ist", "Kunst"),', ' ("Kunst", "hat"', ', "Form")]']
+
+    def chunk(text):
+        return types.SimpleNamespace(
+            choices=[types.SimpleNamespace(delta=types.SimpleNamespace(content=text))]
+        )
+
+    class Dummy:
+        def __init__(self):
+            self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self.create))
+
+        def create(self, **kwargs):
+            assert kwargs["stream"] is True
+            return iter(chunk(p) for p in pieces)
+
+    monkeypatch.setattr(triplet_parser_llm, "get_client", lambda *a, **k: Dummy())
+    stream = triplet_parser_llm.stream_triplets_via_llm("Text")
+    assert next(stream) == ("Musik", "ist", "Kunst")
+    assert list(stream) == [("Kunst", "hat", "Form")]
+
+
+def test_stream_without_client(monkeypatch):
+    monkeypatch.setattr(triplet_parser_llm, "get_client", lambda *a, **k: None)
+    assert list(triplet_parser_llm.stream_triplets_via_llm("Text")) == []
+
+
+def test_batch_maps_results_and_retries_failures(monkeypatch):
+    import json
+    import re
+    import types
+
+    requests = []
+
+    class Dummy:
+        def __init__(self):
+            self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self.create))
+
+        def create(self, **kwargs):
+            user = kwargs["messages"][1]["content"]
+            ids = re.findall(r"^\[(\d+)\]", user, flags=re.M)
+            requests.append(ids)
+            # the first request "forgets" text 1
+            reply = {i: [[f"S{i}", "ist", f"O{i}"]] for i in ids if len(requests) > 1 or i != "1"}
+            return types.SimpleNamespace(
+                choices=[types.SimpleNamespace(message=types.SimpleNamespace(content=json.dumps(reply)))]
+            )
+
+    monkeypatch.setattr(triplet_parser_llm, "get_client", lambda *a, **k: Dummy())
+    res = triplet_parser_llm.extract_triplets_batch(["a", "b", "", "c"], token_budget=100)
+    assert res == [[("S0", "ist", "O0")], [("S1", "ist", "O1")], [], [("S3", "ist", "O3")]]
+    assert requests == [["0", "1", "3"], ["1"]]
+
+
+def test_batch_packing_respects_budget():
+    items = [(i, "x" * 40) for i in range(5)]
+    batches = triplet_parser_llm._pack_batches(items, budget=25)
+    assert [len(b) for b in batches] == [2, 2, 1]
+
+
+def test_long_input_is_chunked_and_merged(monkeypatch):
+    import threading
+    import types
+
+    monkeypatch.setitem(triplet_parser_llm.EXTRACTION, "chunk_chars", 40)
+    monkeypatch.setitem(triplet_parser_llm.EXTRACTION, "chunk_overlap", 1)
+    requests = []
+    lock = threading.Lock()
+
+    class Dummy:
+        def __init__(self):
+            self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self.create))
+
+        def create(self, **kwargs):
+            user = kwargs["messages"][1]["content"]
+            with lock:
+                requests.append(user)
+            triples = [s.strip(".").split() for s in user.split(". ")]
+            content = repr([tuple(t) for t in triples if len(t) == 3])
+            return types.SimpleNamespace(
+                choices=[types.SimpleNamespace(message=types.SimpleNamespace(content=content))]
+            )
+
+    monkeypatch.setattr(triplet_parser_llm, "get_client", lambda *a, **k: Dummy())
+    text = "Musik ist Kunst. Kunst hat Form. musik  hat Rhythmus. Form ist Ordnung. Rhythmus ist Zeit."
+    triples = triplet_parser_llm.extract_triplets_via_llm(text)
+    assert len(requests) > 1
+    assert all(len(r) <= 40 for r in requests)
+    assert triples == [
+        ("Musik", "ist", "Kunst"),
+        ("Kunst", "hat", "Form"),
+        ("Musik", "hat", "Rhythmus"),
+        ("Form", "ist", "Ordnung"),
+        ("Rhythmus", "ist", "Zeit"),
+    ]
+    requests.clear()
+    # chunks finish in any order, so only the casefolded triples are fixed
+    streamed = triplet_parser_llm.stream_triplets_via_llm(text)
+    assert sorted(tuple(x.casefold() for x in t) for t in streamed) == sorted(
+        tuple(x.casefold() for x in t) for t in triples
+    )
+
+
+def test_stream_reads_function_call_arguments(monkeypatch):
+    import types
+
+    pieces = ['{"triplets": [["Musik", "ist",', ' "Kunst"]]}']
+
+    def chunk(args):
+        call = types.SimpleNamespace(name=None, arguments=args)
+        delta = types.SimpleNamespace(content=None, function_call=call)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(delta=delta)])
+
+    class Dummy:
+        def __init__(self):
+            self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self.create))
+
+        def create(self, **kwargs):
+            assert kwargs["function_call"] == {"name": "report_triplets"}
+            return iter(chunk(p) for p in pieces)
+
+    monkeypatch.setattr(triplet_parser_llm, "get_client", lambda *a, **k: Dummy())
+    assert list(triplet_parser_llm.stream_triplets_via_llm("Text")) == [("Musik", "ist", "Kunst")]
+
+
+def test_batch_raises_on_failure_when_asked(monkeypatch):
+    import pytest
+
+    monkeypatch.setattr(triplet_parser_llm, "get_client", lambda *a, **k: None)
+    assert triplet_parser_llm.extract_triplets_batch(["a"]) == [[]]
+    with pytest.raises(RuntimeError):
+        triplet_parser_llm.extract_triplets_batch(["a"], raise_on_failure=True)
+
+
+def test_function_call_atoms_are_normalized_like_text(monkeypatch):
+    import json
+    import types
+
+    replies = []
+
+    def response(call=None, content=None):
+        message = types.SimpleNamespace(content=content, function_call=call)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+    class Dummy:
+        def __init__(self):
+            self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=lambda **k: replies.pop(0)))
+
+    args = json.dumps({"triplets": [["Musik ", " ist", "Kunst\n"], [" ", "ist", "leer"]]})
+    replies.append(response(call=types.SimpleNamespace(name="report_triplets", arguments=args)))
+    replies.append(response(content="[Musik, ist, Kunst]"))
+    monkeypatch.setattr(triplet_parser_llm, "get_client", lambda *a, **k: Dummy())
+    by_call = triplet_parser_llm.extract_triplets_via_llm("Musik ist Kunst.")
+    by_text = triplet_parser_llm.extract_triplets_via_llm("Musik ist Kunst.")
+    assert by_call == by_text == [("Musik", "ist", "Kunst")]
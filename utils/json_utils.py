@@ -1,13 +1,88 @@
 import json
 import re
-from typing import Any, Optional
+from typing import Any, Iterator, List, Optional
+
+# characters that change the scanner state outside of strings
+_STRUCTURAL_RE = re.compile(r'[\[\]{}"]')
+# remainder of a JSON string after its opening quote (no raw newlines)
+_STRING_BODY_RE = re.compile(r'(?:[^"\\\n]|\\.)*"')
+_CLOSERS = {"[": "]", "{": "}"}
+_DECODER = json.JSONDecoder()
+
+
+def _decode(text: str, start: int, end: int) -> Optional[Any]:
+    try:
+        return json.loads(text[start:end])
+    except (json.JSONDecodeError, RecursionError):
+        return None
+
+
+def iter_json_candidates(text: str) -> Iterator[Any]:
+    """Yield every valid top-level JSON object or array embedded in ``text``.
+
+    A single left-to-right pass tracks bracket depth and skips over string
+    literals, so braces inside strings do not count and prose between two
+    objects does not glue them together. The first top-level group is handed
+    to the C decoder directly. A group that fails to decode is skipped as a
+    whole: a valid fragment inside it (e.g. one triple of a broken list) is
+    not the answer. Mismatched closers or a line break inside a string
+    abandon the open groups.
+    """
+    # start offset and expected closer of every open group
+    stack: List[tuple] = []
+    pos = 0
+    fast_path = True
+    first_start = -1
+    length = len(text)
+    while pos < length:
+        match = _STRUCTURAL_RE.search(text, pos)
+        if match is None:
+            break
+        char = match.group()
+        pos = match.end()
+        if char in _CLOSERS:
+            if not stack and fast_path:
+                # Let the C decoder consume the first group in one go. Only
+                # once: a failed attempt costs O(position) for the error
+                # message, so retrying at every group would be quadratic.
+                fast_path = False
+                try:
+                    value, end = _DECODER.raw_decode(text, match.start())
+                except (json.JSONDecodeError, RecursionError):
+                    # rejected as a whole already; do not decode it again
+                    first_start = match.start()
+                else:
+                    yield value
+                    pos = end
+                    continue
+            stack.append((match.start(), _CLOSERS[char]))
+        elif char == '"':
+            if not stack:
+                continue  # quotes in prose
+            string = _STRING_BODY_RE.match(text, pos)
+            if string is None:
+                # unterminated string: the open groups cannot be valid JSON
+                stack.clear()
+                newline = text.find("\n", pos)
+                pos = length if newline < 0 else newline + 1
+                continue
+            pos = string.end()
+        elif stack and stack[-1][1] == char:
+            start, _ = stack.pop()
+            if not stack and start != first_start:
+                value = _decode(text, start, pos)
+                if value is not None:
+                    yield value
+        elif stack:
+            # mismatched closer: the open groups cannot be valid JSON
+            stack.clear()
 
 
 def parse_json_safe(text: str) -> Optional[Any]:
     """Try to parse JSON from an LLM response string.
 
-    Removes code fences and extracts the first JSON object or array if necessary.
-    Returns ``None`` if no valid JSON could be extracted.
+    Removes code fences and extracts the first valid JSON object or array if
+    necessary. Returns ``None`` if no valid JSON could be extracted.
     """
     stripped = text.strip()
 
@@ -25,11 +100,5 @@ def parse_json_safe(text: str) -> Optional[Any]:
 
     try:
         return json.loads(stripped)
-    except json.JSONDecodeError:
-        match = re.search(r"\{.*\}|\[.*\]", stripped, re.S)
-        if match:
-            try:
-                return json.loads(match.group(0))
-            except json.JSONDecodeError:
-                return None
-    return None
+    except (json.JSONDecodeError, RecursionError):
+        return next(iter_json_candidates(stripped), None)
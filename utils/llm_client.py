@@ -1,7 +1,12 @@
 """Shared OpenAI client utilities."""
 from __future__ import annotations
 
+import contextvars
 import os
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator
 
 try:
     import openai  # type: ignore
@@ -32,3 +37,52 @@ def get_client(api_key: str | None = None):
 def init_client() -> None:
     """Initialize the global client if possible."""
     get_client(os.getenv("OPENAI_API_KEY"))
+
+
+class LLMCallCounter:
+    """Thread-safe count of LLM requests per kind ('chat', 'embedding', ...).
+
+    Requests are also added to the ``parent`` counter of an enclosing block.
+    """
+
+    def __init__(self, parent: "LLMCallCounter | None" = None) -> None:
+        self._lock = threading.Lock()
+        self.by_kind: Counter = Counter()
+        self.parent = parent
+
+    def add(self, kind: str) -> None:
+        with self._lock:
+            self.by_kind[kind] += 1
+        if self.parent is not None:
+            self.parent.add(kind)
+
+    @property
+    def total(self) -> int:
+        return sum(self.by_kind.values())
+
+
+_CALLS: contextvars.ContextVar[LLMCallCounter | None] = contextvars.ContextVar(
+    "llm_calls", default=None
+)
+
+
+def record_llm_call(kind: str = "chat") -> None:
+    """Count one LLM request in the enclosing :func:`track_llm_calls` blocks."""
+    counter = _CALLS.get()
+    if counter is not None:
+        counter.add(kind)
+
+
+@contextmanager
+def track_llm_calls() -> Iterator[LLMCallCounter]:
+    """Count the LLM requests made inside the ``with`` block.
+
+    Worker threads only see the counter when they run in a copy of the
+    caller's context (``contextvars.copy_context().run``).
+    """
+    counter = LLMCallCounter(parent=_CALLS.get())
+    token = _CALLS.set(counter)
+    try:
+        yield counter
+    finally:
+        _CALLS.reset(token)
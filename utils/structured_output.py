@@ -0,0 +1,241 @@
+"""Schema-constrained LLM outputs with local validation and repair.
+
+Extraction and planning request their results through function calling.
+:func:`extract_structured` reads the function arguments (or, for models that
+answer in plain text, the message content), validates them against the
+function's JSON schema and repairs near misses locally – a bare list instead
+of the wrapping object, a JSON string instead of an array, triples given as
+dicts – instead of asking the model again. Every outcome is counted so the
+failure rate per function can be reported.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.json_utils import parse_json_safe
+
+logger = logging.getLogger(__name__)
+
+TRIPLETS_FUNCTION = {
+    "name": "report_triplets",
+    "description": "Semantische Tripel (Subjekt, Relation, Objekt) melden",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "triplets": {
+                "type": "array",
+                "items": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "minItems": 3,
+                    "maxItems": 3,
+                },
+            }
+        },
+        "required": ["triplets"],
+    },
+}
+
+SUBGOALS_FUNCTION = {
+    "name": "report_subgoals",
+    "description": "Konkrete Unterziele für das Ziel melden",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "subgoals": {
+                "type": "array",
+                "items": {"type": "string"},
+                "minItems": 1,
+                "maxItems": 5,
+            }
+        },
+        "required": ["subgoals"],
+    },
+}
+
+# outcome counters per function name
+OUTCOMES = ("valid", "repaired", "failed")
+_STATS: Dict[str, Counter] = {}
+_LOCK = threading.Lock()
+
+_TRIPLE_KEYS = (
+    ("subject", "predicate", "object"),
+    ("subject", "relation", "object"),
+    ("subjekt", "relation", "objekt"),
+)
+
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "boolean": bool,
+    "integer": int,
+    "number": (int, float),
+}
+
+
+def validate(data: Any, schema: dict, path: str = "$") -> List[str]:
+    """Return the violations of ``data`` against ``schema`` (empty if valid).
+
+    Supports the subset used by the function definitions: ``type``,
+    ``properties``, ``required``, ``items``, ``minItems`` and ``maxItems``.
+    """
+    kind = schema.get("type")
+    if kind and not isinstance(data, _TYPES[kind]):
+        return [f"{path}: expected {kind}, got {type(data).__name__}"]
+    errors: List[str] = []
+    if kind == "object":
+        for key in schema.get("required", ()):
+            if key not in data:
+                errors.append(f"{path}: missing '{key}'")
+        for key, sub in schema.get("properties", {}).items():
+            if key in data:
+                errors.extend(validate(data[key], sub, f"{path}.{key}"))
+    elif kind == "array":
+        if len(data) < schema.get("minItems", 0):
+            errors.append(f"{path}: fewer than {schema['minItems']} items")
+        if "maxItems" in schema and len(data) > schema["maxItems"]:
+            errors.append(f"{path}: more than {schema['maxItems']} items")
+        if "items" in schema:
+            for i, item in enumerate(data):
+                errors.extend(validate(item, schema["items"], f"{path}[{i}]"))
+    return errors
+
+
+def repair(data: Any, schema: dict) -> Any:
+    """Coerce a near-miss ``data`` towards ``schema`` without another LLM call."""
+    kind = schema.get("type")
+    if kind == "object":
+        props = schema.get("properties", {})
+        required = schema.get("required", [])
+        if not isinstance(data, dict):
+            # a bare value where the object has exactly one required field
+            if len(required) != 1:
+                return data
+            data = {required[0]: data}
+        return {
+            key: repair(value, props[key]) if key in props else value
+            for key, value in data.items()
+        }
+    if kind == "array":
+        if isinstance(data, str):
+            parsed = parse_json_safe(data)
+            data = parsed if isinstance(parsed, list) else [data]
+        elif isinstance(data, dict):
+            triple = _dict_triple(data)
+            if triple is not None and schema.get("maxItems") == 3:
+                data = triple
+            else:
+                lists = [v for v in data.values() if isinstance(v, list)]
+                data = lists[0] if len(lists) == 1 else list(data.values())
+        elif isinstance(data, tuple):
+            data = list(data)
+        if not isinstance(data, list):
+            return data
+        items = schema.get("items")
+        if items:
+            data = [repair(item, items) for item in data]
+            # drop items that are still invalid rather than the whole result
+            data = [item for item in data if not validate(item, items)]
+        # variable-length lists are truncated, fixed-length tuples are not
+        if "maxItems" in schema and schema.get("minItems") != schema["maxItems"]:
+            data = data[: schema["maxItems"]]
+        return data
+    if kind == "string":
+        if isinstance(data, (int, float)) and not isinstance(data, bool):
+            return str(data)
+        if isinstance(data, str):
+            return data.strip()
+    return data
+
+
+def _dict_triple(data: dict) -> Optional[list]:
+    lowered = {str(k).lower(): v for k, v in data.items()}
+    for keys in _TRIPLE_KEYS:
+        if all(k in lowered for k in keys):
+            return [lowered[k] for k in keys]
+    return None
+
+
+def _message(response) -> Any:
+    try:
+        return response.choices[0].message
+    except AttributeError:
+        # Fallback for older client versions
+        return response["choices"][0]["message"]
+
+
+def _field(obj, name: str):
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def _record(name: str, outcome: str) -> None:
+    with _LOCK:
+        _STATS.setdefault(name, Counter())[outcome] += 1
+
+
+def extract_structured(
+    response,
+    function: dict,
+    fallback: Callable[[str], Any] | None = None,
+) -> Optional[dict]:
+    """Return the validated arguments of ``function`` from ``response``.
+
+    Function-call arguments are preferred; plain content is parsed as JSON
+    or, if that fails, handed to ``fallback``. Invalid data is repaired once
+    locally. Returns ``None`` if nothing valid could be recovered.
+    """
+    name = function["name"]
+    schema = function["parameters"]
+    message = _message(response)
+    call = _field(message, "function_call")
+    data: Any = None
+    if call is not None and _field(call, "name") == name:
+        data = parse_json_safe(_field(call, "arguments") or "")
+    if data is None:
+        content = _field(message, "content") or ""
+        data = parse_json_safe(content)
+        if data is None and fallback is not None and content:
+            data = fallback(content)
+        if data is None:
+            _record(name, "failed")
+            logger.warning("[StructuredOutput] %s: keine auswertbare Antwort", name)
+            return None
+
+    errors = validate(data, schema)
+    if not errors:
+        _record(name, "valid")
+        return data
+    fixed = repair(data, schema)
+    if not validate(fixed, schema):
+        _record(name, "repaired")
+        logger.info("[StructuredOutput] %s lokal repariert: %s", name, "; ".join(errors[:3]))
+        return fixed
+    _record(name, "failed")
+    logger.warning("[StructuredOutput] %s ungültig: %s", name, "; ".join(errors[:3]))
+    return None
+
+
+def structured_output_stats() -> Dict[str, Dict[str, float]]:
+    """Return outcome counts and the failure rate per function."""
+    with _LOCK:
+        report = {}
+        for name, counts in _STATS.items():
+            total = sum(counts[o] for o in OUTCOMES)
+            entry: Dict[str, float] = {o: counts[o] for o in OUTCOMES}
+            entry["total"] = total
+            entry["failure_rate"] = counts["failed"] / total if total else 0.0
+            entry["repair_rate"] = counts["repaired"] / total if total else 0.0
+            report[name] = entry
+        return report
+
+
+def reset_structured_output_stats() -> None:
+    """Clear all outcome counters."""
+    with _LOCK:
+        _STATS.clear()
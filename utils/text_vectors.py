@@ -0,0 +1,69 @@
+"""Vector representations of short texts such as goals and subgoals.
+
+:func:`hash_vectors` is a local vectorizer: character trigrams of the
+casefolded text are hashed into a fixed number of dimensions, so no
+vocabulary has to be fitted and vectors of new texts are comparable with
+stored ones. It catches paraphrases that differ by articles, inflection or
+word order. :func:`embed_texts` fetches model embeddings for a whole batch
+in one request. Both return L2-normalized rows, so a matrix product yields
+cosine similarities.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import zlib
+from typing import Optional, Sequence
+
+import numpy as np
+
+from cfg.config import MODELS
+from utils.llm_client import get_client, record_llm_call
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = 1024
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _trigrams(text: str):
+    padded = f" {' '.join(text.casefold().split())} "
+    return (padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def hash_vectors(texts: Sequence[str], dim: int = DIMENSIONS) -> np.ndarray:
+    """Return an ``(len(texts), dim)`` matrix of hashed trigram counts."""
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for gram in _trigrams(text):
+            matrix[row, zlib.crc32(gram.encode("utf-8")) % dim] += 1.0
+    return _normalize_rows(matrix)
+
+
+def embed_texts(texts: Sequence[str], api_key: str | None = None) -> Optional[np.ndarray]:
+    """Return model embeddings of ``texts`` from a single request.
+
+    ``None`` if no client is available or the request failed.
+    """
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    client = get_client(api_key or os.getenv("OPENAI_API_KEY"))
+    if client is None:
+        return None
+    try:
+        record_llm_call("embedding")
+        if hasattr(client, "embeddings"):
+            resp = client.embeddings.create(model=MODELS['embedding'], input=list(texts))
+            vectors = [item.embedding for item in resp.data]
+        else:
+            resp = client.Embedding.create(model=MODELS['embedding'], input=list(texts))
+            vectors = [item["embedding"] for item in resp["data"]]
+    except Exception as exc:  # pragma: no cover - network errors
+        logger.error("embedding request failed: %s", exc)
+        return None
+    return _normalize_rows(np.asarray(vectors, dtype=np.float32))